@@ -1,11 +1,11 @@
-import inspect
+import pkgutil
+import sys
 from collections.abc import Callable
 from importlib import import_module
-from pathlib import Path
+from types import ModuleType
 from typing import Any, Optional, TypeVar, Union, overload
 
-from streamlit.runtime.metrics_util import gather_metrics as _gather_metrics
-
+from streamlit_extras._profiling import profiled as _profiled
 from streamlit_extras.version import (
     STREAMLIT_EXTRAS_VERSION_STRING as _STREAMLIT_EXTRAS_VERSION_STRING,
 )
@@ -13,6 +13,31 @@ from streamlit_extras.version import (
 __version__ = _STREAMLIT_EXTRAS_VERSION_STRING
 
 
+def __getattr__(name: str) -> ModuleType:
+    """Import extras on first access (PEP 562), e.g. `streamlit_extras.grid`.
+
+    Importing the package itself stays cheap: neither Streamlit nor the extras'
+    dependencies are loaded until an extra is used.
+
+    Returns:
+        ModuleType: The extra's module.
+
+    Raises:
+        AttributeError: If there is no extra with this name.
+    """
+    if name.startswith("_") or name not in _extra_names():
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return import_module(f"{__name__}.{name}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | _extra_names())
+
+
+def _extra_names() -> set[str]:
+    return {module.name for module in pkgutil.iter_modules(__path__) if module.ispkg}
+
+
 F = TypeVar("F", bound=Callable[..., Any])
 
 # Typing overloads here are actually required so that you can correctly (= with correct typing) use the decorator in different ways:
@@ -37,18 +62,18 @@ def extra(
     func: F | None = None,
 ) -> Callable[[F], F] | F:
     if func:
-        filename = inspect.stack()[1].filename
-        submodule = Path(filename).parent.name
-        extra_name = "streamlit_extras." + submodule
-        module = import_module(extra_name)
+        # The extra's module is still being imported when its functions are decorated,
+        # so it is already in sys.modules. This avoids walking the stack (which reads
+        # source lines from disk) and re-importing the half-initialized module.
+        module = sys.modules[func.__module__]
+        submodule = func.__module__.rpartition(".")[2]
+        module.__dict__.setdefault("__funcs__", []).append(func)
 
-        if hasattr(module, "__funcs__"):
-            module.__funcs__ += [func]  # type: ignore[attr-defined]
-        else:
-            module.__funcs__ = [func]  # type: ignore[attr-defined]
+        # Imported here so that importing the package doesn't import Streamlit
+        from streamlit.runtime.metrics_util import gather_metrics as _gather_metrics
 
         profiling_name = f"{submodule}.{func.__name__}"
-        return _gather_metrics(name=profiling_name, func=func)
+        return _profiled(profiling_name, _gather_metrics(name=profiling_name, func=func))
 
     def wrapper(f: F) -> F:
         return f
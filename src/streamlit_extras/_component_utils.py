@@ -1,19 +1,209 @@
 """Shared utilities for CCv2 component registration.
 
-This module provides helpers for Type D extras (CCv2 with dedicated files),
+Components are registered lazily, on their first render, through `lazy_component`,
+so importing an extra that is never rendered doesn't register anything. Their CSS
+and JS are minified once per process, so each session receives smaller payloads.
+This module also provides helpers for Type D extras (CCv2 with dedicated files),
 which store frontend assets in an `assets/` subdirectory.
 """
 
-from pathlib import Path
-from typing import Any
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Literal
 
 import streamlit as st
 import streamlit.components.v2
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+_REGISTRY_LOCK = threading.Lock()
+# Component name -> seconds spent registering it, filled as components are first rendered
+_REGISTRATION_TIMES: dict[str, float] = {}
+
+_ASSETS_LOCK = threading.Lock()
+# Asset path -> (modification time, size, contents), so files are read once per process
+_LOADED_ASSETS: dict[Path, tuple[int, int, str]] = {}
+# (kind, SHA-256 of the source) -> minified source
+_MINIFIED_ASSETS: dict[tuple[str, str], str] = {}
+
+# Strings are kept as-is, comments and indentation are dropped. Line breaks are kept,
+# so automatic semicolon insertion still works. Telling regex literals from divisions,
+# and finding the code nested in template literals, takes a real parser: sources with
+# a template literal or a slash outside of strings and comments are left unchanged.
+_JS_TOKENS = re.compile(
+    r"""(?P<keep>'(?:\\.|[^'\\\n])*'|"(?:\\.|[^"\\\n])*")|(?P<template>`)"""
+    r"""|(?P<line_comment>//[^\n]*)|(?P<block_comment>/\*.*?\*/)|(?P<space>[ \t]*\n\s*)""",
+    re.DOTALL,
+)
+_CSS_TOKENS = re.compile(
+    r"""(?P<keep>'(?:\\.|[^'\\])*'|"(?:\\.|[^"\\])*")|(?P<block_comment>/\*.*?\*/)"""
+    r"""|\s*(?P<punctuation>[{};,])\s*|(?P<space>\s+)""",
+    re.DOTALL,
+)
+
+
+class LazyComponent:
+    """A CCv2 component that is registered on its first use.
+
+    Calling it mounts the component, like the callable returned by
+    st.components.v2.component(). The registered callable is memoized.
+    """
+
+    def __init__(self, name: str, register: Callable[[], Any]) -> None:
+        self.name = name
+        self._register = register
+        self._component: Any = None
+
+    @property
+    def registered(self) -> bool:
+        return self._component is not None
+
+    def get(self) -> Any:
+        """Register the component if needed.
+
+        Returns:
+            The component mount callable from st.components.v2.component().
+        """
+        if self._component is None:
+            with _REGISTRY_LOCK:
+                # Another session may have registered it while we were waiting
+                if self._component is None:
+                    start = time.perf_counter()
+                    self._component = self._register()
+                    _REGISTRATION_TIMES[self.name] = time.perf_counter() - start
+        return self._component
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.get()(*args, **kwargs)
+
+
+def _minify_js(source: str) -> str:
+    pieces: list[str] = []
+    position = 0
+    for match in _JS_TOKENS.finditer(source):
+        code = source[position : match.start()]
+        position = match.end()
+        if match["template"] is not None or "/" in code:
+            return source
+        if match["keep"] is not None:
+            pieces.extend((code, match["keep"]))
+        elif match["space"] is not None or "\n" in (match["block_comment"] or ""):
+            pieces.append(code.rstrip(" \t"))
+            # Don't leave empty lines behind removed comments
+            if "".join(pieces[-2:]).strip(" \t")[-1:] not in ("", "\n"):
+                pieces.append("\n")
+        elif match["block_comment"] is not None:
+            pieces.extend((code, " "))
+        else:
+            pieces.append(code.rstrip(" \t"))
+    if "/" in source[position:]:
+        return source
+    pieces.append(source[position:])
+    return "".join(pieces).strip()
+
+
+def _minify_css_token(match: re.Match[str]) -> str:
+    if match["keep"] is not None:
+        return match["keep"]
+    if match["punctuation"] is not None:
+        # One rule per line
+        return "}\n" if match["punctuation"] == "}" else match["punctuation"]
+    if match["space"] is not None:
+        return " "
+    return ""
+
+
+def _minify_css(source: str) -> str:
+    return _CSS_TOKENS.sub(_minify_css_token, source).strip()
+
+
+def minify_asset(source: str, kind: Literal["css", "js"]) -> str:
+    """Minify inline CSS or JS, conservatively: comments and insignificant whitespace are removed.
+
+    JS with template literals, regex literals or divisions is returned unchanged.
+
+    Results are cached by content hash for the lifetime of the process.
+
+    Args:
+        source: The CSS or JS source.
+        kind: The kind of source.
+
+    Returns:
+        The minified source.
+    """
+    key = (kind, hashlib.sha256(source.encode("utf-8")).hexdigest())
+    with _ASSETS_LOCK:
+        minified = _MINIFIED_ASSETS.get(key)
+    if minified is None:
+        minified = _minify_js(source) if kind == "js" else _minify_css(source)
+        if "\n" not in minified:
+            # st.components.v2 treats single-line css and js without a line break as file paths
+            minified = source
+        with _ASSETS_LOCK:
+            _MINIFIED_ASSETS[key] = minified
+    return minified
+
+
+def _minify_inline(value: Any, kind: Literal["css", "js"]) -> Any:
+    # Single-line values are file paths or globs inside the component's asset_dir
+    if isinstance(value, str) and "\n" in value:
+        return minify_asset(value, kind)
+    return value
+
+
+def lazy_component(name: str, *, minify: bool = True, **kwargs: Any) -> LazyComponent:
+    """Declare a CCv2 component, registered with st.components.v2.component() on first use.
+
+    Args:
+        name: The component registration name (e.g. "streamlit_extras.great_tables").
+        minify: Whether to minify inline css and js when the component is registered.
+            Defaults to True.
+        **kwargs: Arguments passed to st.components.v2.component() (html, css, js, ...).
+
+    Returns:
+        The lazy component, to be called like the component mount callable.
+
+    Example:
+        ```python
+        from streamlit_extras._component_utils import lazy_component
+
+        _COMPONENT = lazy_component("streamlit_extras.my_extra", html="<div></div>", js=_JS)
+        ```
+    """
+
+    def register() -> Any:
+        options = dict(kwargs)
+        if minify:
+            if "css" in options:
+                options["css"] = _minify_inline(options["css"], "css")
+            if "js" in options:
+                options["js"] = _minify_inline(options["js"], "js")
+        return st.components.v2.component(name, **options)
+
+    return LazyComponent(name, register)
+
+
+def get_registration_times() -> dict[str, float]:
+    """Return the time spent registering each component rendered so far.
+
+    Returns:
+        A mapping of component names to registration times, in seconds.
+    """
+    with _REGISTRY_LOCK:
+        return dict(_REGISTRATION_TIMES)
+
 
 def _load_asset(assets_dir: Path, filename: str) -> str:
     """Load a text file from the assets directory.
 
+    Files are cached for the lifetime of the process, until they are modified.
+
     Args:
         assets_dir: Path to the assets directory.
         filename: Name of the file to load.
@@ -27,7 +217,15 @@ def _load_asset(assets_dir: Path, filename: str) -> str:
     path = assets_dir / filename
     if not path.exists():
         raise FileNotFoundError(f"Component asset not found: {path}")
-    return path.read_text(encoding="utf-8")
+    stat = path.stat()
+    with _ASSETS_LOCK:
+        cached = _LOADED_ASSETS.get(path)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+    contents = path.read_text(encoding="utf-8")
+    with _ASSETS_LOCK:
+        _LOADED_ASSETS[path] = (stat.st_mtime_ns, stat.st_size, contents)
+    return contents
 
 
 def register_file_component(
@@ -37,12 +235,14 @@ def register_file_component(
     html_file: str = "component.html",
     css_file: str | None = "component.css",
     js_file: str | None = "component.js",
+    minify: bool = True,
     **kwargs: Any,
-) -> Any:
+) -> LazyComponent:
     """Register a CCv2 component from files in the extra's assets/ directory.
 
     Loads file contents and passes them as inline strings to
-    st.components.v2.component(). Returns the mount callable.
+    st.components.v2.component(). The files are only read, and the component
+    registered, on first use.
 
     Args:
         name: The component registration name (e.g. "streamlit_extras.radial_menu").
@@ -50,10 +250,11 @@ def register_file_component(
         html_file: Name of the HTML file in assets/. Defaults to "component.html".
         css_file: Name of the CSS file in assets/, or None to skip. Defaults to "component.css".
         js_file: Name of the JS file in assets/, or None to skip. Defaults to "component.js".
+        minify: Whether to minify the CSS and JS. Defaults to True.
         **kwargs: Additional arguments passed to st.components.v2.component().
 
     Returns:
-        The component mount callable from st.components.v2.component().
+        The lazy component, to be called like the component mount callable.
 
     Example:
         ```python
@@ -67,8 +268,14 @@ def register_file_component(
         ```
     """
     assets_dir = package_dir / "assets"
-    html = _load_asset(assets_dir, html_file)
-    css = _load_asset(assets_dir, css_file) if css_file else None
-    js = _load_asset(assets_dir, js_file) if js_file else None
 
-    return st.components.v2.component(name, html=html, css=css, js=js, **kwargs)
+    def register() -> Any:
+        html = _load_asset(assets_dir, html_file)
+        css = _load_asset(assets_dir, css_file) if css_file else None
+        js = _load_asset(assets_dir, js_file) if js_file else None
+        if minify:
+            css = css and minify_asset(css, "css")
+            js = js and minify_asset(js, "js")
+        return st.components.v2.component(name, html=html, css=css, js=js, **kwargs)
+
+    return LazyComponent(name, register)
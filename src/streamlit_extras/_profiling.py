@@ -0,0 +1,196 @@
+"""Opt-in profiling of @extra functions.
+
+Every function decorated with `@extra` goes through `profiled`, which costs a
+single flag check until profiling is enabled (see `streamlit_extras.profiler`).
+When enabled, each call records its wall time, the Python memory it allocated
+(with tracemalloc, if requested), and the number and size of the messages it sent
+to the frontend. Calls are aggregated per extra, for the current rerun of each session.
+"""
+
+from __future__ import annotations
+
+import functools
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, TypeVar, cast
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+F = TypeVar("F", bound="Callable[..., Any]")
+
+_ENABLED = False
+_TRACE_MEMORY = False
+_STARTED_TRACEMALLOC = False
+_LOCK = threading.Lock()
+# Calls being profiled on each thread, innermost last
+_ACTIVE = threading.local()
+
+_PROFILE_ATTR_NAME = "_streamlit_extras_profile"
+
+
+@dataclass
+class ExtraProfile:
+    """What the calls to one extra cost during a rerun."""
+
+    name: str
+    calls: int = 0
+    wall_time: float = 0.0
+    # Highest Python memory allocated by a call, on top of what was allocated when it started
+    peak_memory_bytes: int = 0
+    deltas: int = 0
+    payload_bytes: int = 0
+
+
+@dataclass
+class _Call:
+    deltas: int = 0
+    payload_bytes: int = 0
+    peak_memory_bytes: int = 0
+    start_memory_bytes: int = 0
+
+
+@dataclass
+class _RunProfile:
+    # The script run context replaces its cursors on every rerun
+    cursors: Any
+    extras: dict[str, ExtraProfile] = field(default_factory=dict)
+
+
+class _CountingEnqueue:
+    """Wraps a session's enqueue function to count the messages sent by profiled calls.
+
+    It's only installed while profiled calls of the session are running.
+    """
+
+    def __init__(self, enqueue: Callable[[Any], None]) -> None:
+        self.enqueue = enqueue
+        # Profiled calls running in the session, the original function is restored after the last one
+        self.calls = 0
+
+    def __call__(self, msg: Any) -> None:
+        for call in getattr(_ACTIVE, "calls", ()):
+            call.deltas += 1
+            call.payload_bytes += msg.ByteSize()
+        self.enqueue(msg)
+
+
+def enable(trace_memory: bool = False) -> None:
+    global _ENABLED, _TRACE_MEMORY, _STARTED_TRACEMALLOC  # noqa: PLW0603
+    with _LOCK:
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _STARTED_TRACEMALLOC = True
+        _TRACE_MEMORY = trace_memory
+        _ENABLED = True
+
+
+def disable() -> None:
+    global _ENABLED, _TRACE_MEMORY, _STARTED_TRACEMALLOC  # noqa: PLW0603
+    with _LOCK:
+        if _STARTED_TRACEMALLOC:
+            tracemalloc.stop()
+            _STARTED_TRACEMALLOC = False
+        _TRACE_MEMORY = False
+        _ENABLED = False
+
+
+def is_enabled() -> bool:
+    return _ENABLED
+
+
+def get_run_profile(ctx: Any) -> dict[str, ExtraProfile]:
+    """Return the profiles of the extras called during the current rerun of a session.
+
+    Returns:
+        dict[str, ExtraProfile]: The profile of each extra, by name.
+    """
+    with _LOCK:
+        run_profile: _RunProfile | None = getattr(ctx, _PROFILE_ATTR_NAME, None)
+        if run_profile is None or run_profile.cursors is not ctx.cursors:
+            return {}
+        return dict(run_profile.extras)
+
+
+def _record(ctx: Any, name: str, wall_time: float, call: _Call) -> None:
+    with _LOCK:
+        run_profile: _RunProfile | None = getattr(ctx, _PROFILE_ATTR_NAME, None)
+        if run_profile is None or run_profile.cursors is not ctx.cursors:
+            run_profile = _RunProfile(ctx.cursors)
+            setattr(ctx, _PROFILE_ATTR_NAME, run_profile)
+        profile = run_profile.extras.setdefault(name, ExtraProfile(name))
+        profile.calls += 1
+        profile.wall_time += wall_time
+        profile.peak_memory_bytes = max(profile.peak_memory_bytes, call.peak_memory_bytes)
+        profile.deltas += call.deltas
+        profile.payload_bytes += call.payload_bytes
+
+
+def _install_counting_enqueue(ctx: Any) -> None:
+    with _LOCK:
+        if not isinstance(ctx._enqueue, _CountingEnqueue):
+            ctx._enqueue = _CountingEnqueue(ctx._enqueue)
+        ctx._enqueue.calls += 1
+
+
+def _uninstall_counting_enqueue(ctx: Any) -> None:
+    with _LOCK:
+        counting_enqueue = ctx._enqueue
+        if not isinstance(counting_enqueue, _CountingEnqueue):
+            return
+        counting_enqueue.calls -= 1
+        if not counting_enqueue.calls:
+            ctx._enqueue = counting_enqueue.enqueue
+
+
+def _track_memory(calls: list[_Call]) -> None:
+    """Fold the peak traced since the last reset into the running calls, and reset it."""
+    _, peak = tracemalloc.get_traced_memory()
+    for call in calls:
+        call.peak_memory_bytes = max(call.peak_memory_bytes, peak - call.start_memory_bytes)
+    tracemalloc.reset_peak()
+
+
+def _call_profiled(name: str, func: Callable[..., Any], args: Any, kwargs: Any) -> Any:
+    from streamlit.runtime.scriptrunner_utils.script_run_context import get_script_run_ctx
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return func(*args, **kwargs)
+    _install_counting_enqueue(ctx)
+
+    calls: list[_Call] = _ACTIVE.__dict__.setdefault("calls", [])
+    trace_memory = _TRACE_MEMORY and tracemalloc.is_tracing()
+    call = _Call()
+    if trace_memory:
+        _track_memory(calls)
+        call.start_memory_bytes = tracemalloc.get_traced_memory()[0]
+    calls.append(call)
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        wall_time = time.perf_counter() - start
+        if trace_memory:
+            _track_memory(calls)
+        calls.pop()
+        _uninstall_counting_enqueue(ctx)
+        _record(ctx, name, wall_time, call)
+
+
+def profiled(name: str, func: F) -> F:
+    """Wrap an extra's function so its calls are profiled while profiling is enabled.
+
+    Returns:
+        F: The wrapped function.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not _ENABLED:
+            return func(*args, **kwargs)
+        return _call_profiled(name, func, args, kwargs)
+
+    return cast("F", wrapper)
@@ -12,12 +12,12 @@ from typing import TYPE_CHECKING, Any, Literal
 from uuid import uuid4
 
 import streamlit as st
-import streamlit.components.v2
 from streamlit.elements.lib.image_utils import image_to_url
 from streamlit.elements.lib.layout_utils import LayoutConfig
 from streamlit.errors import StreamlitAPIException
 
 from streamlit_extras import extra
+from streamlit_extras._component_utils import lazy_component
 
 if TYPE_CHECKING:
     from collections.abc import Callable
@@ -29,7 +29,7 @@ if TYPE_CHECKING:
 
     ImageLike = str | bytes | BytesIO | Path | Image.Image | npt.NDArray[Any]
 
-_AVATAR_COMPONENT = st.components.v2.component(
+_AVATAR_COMPONENT = lazy_component(
     name="streamlit_extras.avatar",
     html="""
     <style>
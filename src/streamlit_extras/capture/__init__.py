@@ -1,15 +1,27 @@
 from __future__ import annotations
 
+import codecs
 import logging
+import math
+import os
 import sys
+import threading
+import time
+from collections import deque
 from contextlib import contextmanager
 from datetime import date
-from io import StringIO
-from typing import TYPE_CHECKING, Any, TextIO
+from queue import SimpleQueue
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, TextIO, cast
 from unittest import mock
 
 import streamlit as st
-from streamlit.runtime.scriptrunner_utils.script_run_context import get_script_run_ctx
+from streamlit.errors import StreamlitAPIException
+from streamlit.runtime.scriptrunner_utils.script_run_context import (
+    SCRIPT_RUN_CONTEXT_ATTR_NAME,
+    add_script_run_ctx,
+    get_script_run_ctx,
+)
 
 from streamlit_extras import extra
 
@@ -18,32 +30,209 @@ if TYPE_CHECKING:
 
 __all__ = ["logcapture", "redirect", "stderr", "stdout"]
 
+_LOGGER = logging.getLogger(__name__)
+
+_PIPE_CHUNK_SIZE = 65536
+# How long exiting a file descriptor capture waits for the last output to be read
+_READER_JOIN_TIMEOUT_SECONDS = 1.0
+# File descriptors are process-wide, so only one capture of each can be active at a time
+_CAPTURED_FDS: set[int] = set()
+_CAPTURED_FDS_LOCK = threading.Lock()
+
+
+class _CaptureBuffer:
+    """Accumulates captured text and passes it to `dst`, at most every `interval` seconds.
+
+    Text written within `interval` of the previous update is passed on by a timer
+    thread of the script run `ctx` once the interval is over, if no other write does it first.
+    With `max_lines`, only the last `max_lines` lines are kept. With `append`, `dst`
+    only receives the text captured since its previous call (at most its last `max_lines`
+    lines), so the cost of each update is proportional to the new output rather than
+    to the whole history.
+    """
+
+    def __init__(
+        self, dst: Callable[..., Any], interval: float, max_lines: int | None, append: bool, ctx: Any = None
+    ) -> None:
+        self.dst = dst
+        self.interval = interval
+        self.append = append
+        self._ctx = ctx
+        self._pending: list[str] = []
+        self._text = ""
+        self._lines: deque[str] | None = deque(maxlen=max_lines) if max_lines else None
+        self._last_flush = -math.inf
+        self._timer: threading.Timer | None = None
+        # Writes can come from worker threads and from the reader thread of captured file descriptors
+        self._lock = threading.RLock()
+
+    def write(self, text: str) -> None:
+        with self._lock:
+            self._pending.append(text)
+            wait = self._last_flush + self.interval - time.monotonic()
+            if wait <= 0:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(wait, self.flush)
+                self._timer.daemon = True
+                if self._ctx is not None:
+                    add_script_run_ctx(self._timer, self._ctx)
+                self._timer.start()
+
+    def flush(self) -> None:
+        """Pass the pending text to `dst`."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            new_text = "".join(self._pending)
+            self._pending.clear()
+            self._last_flush = time.monotonic()
+            if self.append:
+                if self._lines is not None:
+                    # Text that was already passed on can't be taken back, only the new text is limited
+                    keep = cast("int", self._lines.maxlen) + new_text.endswith("\n")
+                    new_text = "\n".join(new_text.split("\n")[-keep:])
+                self.dst(new_text)
+            elif self._lines is None:
+                self._text += new_text
+                self.dst(self._text)
+            else:
+                # Complete lines go to the ring buffer, a trailing partial line is kept aside
+                lines = (self._text + new_text).split("\n")
+                self._text = lines.pop()
+                self._lines.extend(lines)
+                self.dst("".join(line + "\n" for line in self._lines) + self._text)
+
 
 @extra
 @contextmanager
-def redirect(src: TextIO, dst: Callable[..., Any], terminator: str = "\n") -> Generator[None, None, None]:
+def redirect(
+    src: TextIO,
+    dst: Callable[..., Any],
+    terminator: str = "\n",
+    interval: float = 0,
+    max_lines: int | None = None,
+    append: bool = False,
+    capture_fd: bool = False,
+) -> Generator[None, None, None]:
     """Redirect STDOUT and STDERR to streamlit functions."""
-    with StringIO() as buffer:
+    # Test if we are actually running in the streamlit script thread before we redirect
+    ctx = get_script_run_ctx()
+    buffer = _CaptureBuffer(dst, interval, max_lines, append, ctx)
+    if ctx is None:
+        yield
+    elif capture_fd:
+        with _redirect_fd(src, buffer, ctx):
+            yield
+    else:
+        old_write = src.write
 
-        def new_write(b: str) -> None:
+        def new_write(b: str) -> Any:
+            # Only capture writes of this script run, and of threads it attached its context to
+            if get_script_run_ctx(suppress_warning=True) is not ctx:
+                return old_write(b)
             buffer.write(b + terminator)
-            dst(buffer.getvalue())
-
-        # Test if we are actually running in the streamlit script thread before we redirect
-        if get_script_run_ctx() is not None:
-            old_write = src.write
-            try:
-                src.write = new_write  # type: ignore
-                yield
-            finally:
-                src.write = old_write  # type: ignore
-        else:
+            return len(b)
+
+        try:
+            src.write = new_write  # type: ignore
             yield
+        finally:
+            src.write = old_write  # type: ignore
+            buffer.flush()
+
+
+def _forward_fd(read_fd: int, buffer: _CaptureBuffer, encoding: str) -> None:
+    """Pass the output read from a pipe on to `buffer` line by line, until all its writers are closed."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    partial = ""
+    with os.fdopen(read_fd, "rb", buffering=0) as pipe:
+        while chunk := pipe.read(_PIPE_CHUNK_SIZE):
+            lines, newline, partial = (partial + decoder.decode(chunk)).rpartition("\n")
+            if newline:
+                buffer.write(lines + newline)
+    partial += decoder.decode(b"", final=True)
+    if partial:
+        buffer.write(partial)
+    buffer.flush()
+
+
+@contextmanager
+def _redirect_fd(src: TextIO, buffer: _CaptureBuffer, ctx: Any) -> Generator[None, None, None]:
+    """Point the file descriptor of `src` to a pipe read by a thread of the script run.
+
+    This captures everything written to the descriptor: by any thread, by native
+    extensions and by subprocesses inheriting it.
+
+    Raises:
+        StreamlitAPIException: If the descriptor is already captured, e.g. by another session.
+    """
+    # Test runners and notebooks replace the standard streams, possibly with in-memory ones
+    standard_fds = {id(sys.stdout): 1, id(sys.stderr): 2}
+    fd = standard_fds.get(id(src)) or src.fileno()
+
+    # Captures exiting out of order would leave the descriptor pointing to a closed pipe
+    with _CAPTURED_FDS_LOCK:
+        if fd in _CAPTURED_FDS:
+            msg = (
+                f"File descriptor {fd} is already captured with capture_fd=True, "
+                "possibly by another session. Only one such capture can run at a time."
+            )
+            raise StreamlitAPIException(msg)
+        _CAPTURED_FDS.add(fd)
+    try:
+        with _pipe_fd(src, fd, buffer, ctx):
+            yield
+    finally:
+        with _CAPTURED_FDS_LOCK:
+            _CAPTURED_FDS.discard(fd)
+
+
+@contextmanager
+def _pipe_fd(src: TextIO, fd: int, buffer: _CaptureBuffer, ctx: Any) -> Generator[None, None, None]:
+    src.flush()
+    saved_fd = os.dup(fd)
+    read_fd, write_fd = os.pipe()
+    reader = threading.Thread(
+        target=_forward_fd,
+        args=(read_fd, buffer, getattr(src, "encoding", None) or "utf-8"),
+        name=f"streamlit_extras_capture_fd{fd}",
+        daemon=True,
+    )
+    add_script_run_ctx(reader, ctx)
+    reader.start()
+    os.dup2(write_fd, fd)
+    os.close(write_fd)
+
+    # Send Python level writes to the pipe right away rather than when the stream's buffer is full
+    line_buffering = getattr(src, "line_buffering", None)
+    if line_buffering is False:
+        src.reconfigure(line_buffering=True)  # type: ignore[attr-defined]
+    try:
+        yield
+    finally:
+        src.flush()
+        if line_buffering is False:
+            src.reconfigure(line_buffering=False)  # type: ignore[attr-defined]
+        os.dup2(saved_fd, fd)
+        os.close(saved_fd)
+        # Subprocesses that are still running keep the pipe open, their output is shown as it comes
+        reader.join(_READER_JOIN_TIMEOUT_SECONDS)
 
 
 @extra
 @contextmanager
-def stdout(dst: Callable[..., Any], terminator: str = "\n") -> Generator[None, None, None]:
+def stdout(
+    dst: Callable[..., Any],
+    terminator: str = "\n",
+    interval: float = 0,
+    max_lines: int | None = None,
+    append: bool = False,
+    capture_fd: bool = False,
+) -> Generator[None, None, None]:
     """
     Capture STDOUT and redirect it to a callable `dst`
 
@@ -54,14 +243,33 @@ def stdout(dst: Callable[..., Any], terminator: str = "\n") -> Generator[None, N
         terminator (str, optional): If a `terminator` is specified, it is added onto each call to stdout.write/print.
             This defaults to a newline which causes them to display on separate lines within an st.empty.write `dst.
             If using this with st.empty.code as `dst` it is recommended to set `terminator` to empty string. Defaults to "\n".
+        interval (float, optional): Minimum number of seconds between two calls to `dst`. Writes in between are
+            coalesced, and passed on once the interval is over. Use it for chatty code, e.g. training loops
+            printing thousands of lines. Defaults to 0 (call `dst` on every write).
+        max_lines (int, optional): Only pass the last `max_lines` lines to `dst`. Defaults to None (all lines).
+        append (bool, optional): If True, `dst` only receives the text written since its previous call instead
+            of the entire contents, e.g. to add it to a container. With `max_lines`, each call receives at most
+            the last `max_lines` lines of the new text. Defaults to False.
+        capture_fd (bool, optional): If True, capture file descriptor 1 itself through a pipe read by a
+            background thread, instead of only `print` calls of the script thread. This also captures output of
+            worker threads, native extensions and subprocesses (forwarded line by line), but of the whole server
+            process, so only one such capture of STDOUT can run at a time: starting another one, e.g. from another
+            session, raises a StreamlitAPIException. `terminator` is not added to the raw output. Defaults to False.
     """
-    with redirect(sys.stdout, dst, terminator):
+    with redirect(sys.stdout, dst, terminator, interval, max_lines, append, capture_fd):
         yield
 
 
 @extra
 @contextmanager
-def stderr(dst: Callable[..., Any], terminator: str = "\n") -> Generator[None, None, None]:
+def stderr(
+    dst: Callable[..., Any],
+    terminator: str = "\n",
+    interval: float = 0,
+    max_lines: int | None = None,
+    append: bool = False,
+    capture_fd: bool = False,
+) -> Generator[None, None, None]:
     """
     Capture STDERR and redirect it to a callable `dst`.
 
@@ -72,23 +280,131 @@ def stderr(dst: Callable[..., Any], terminator: str = "\n") -> Generator[None, N
         terminator (optional, str): If a `terminator` is specified, it is added onto each call to stdout.write/print.
             This defaults to a newline which causes them to display on separate lines within an st.empty.write `dst.
             If using this with st.empty.code as `dst` it is recommended to set `terminator` to empty string.
+        interval (optional, float): Minimum number of seconds between two calls to `dst`. Writes in between are
+            coalesced, and passed on once the interval is over. Defaults to 0 (call `dst` on every write).
+        max_lines (optional, int): Only pass the last `max_lines` lines to `dst`. Defaults to None (all lines).
+        append (optional, bool): If True, `dst` only receives the text written since its previous call instead
+            of the entire contents, limited to its last `max_lines` lines. Defaults to False.
+        capture_fd (optional, bool): If True, capture file descriptor 2 itself through a pipe, including output
+            of worker threads, native extensions and subprocesses. See `stdout`. Defaults to False.
     """
-    with redirect(sys.stderr, dst, terminator):
+    with redirect(sys.stderr, dst, terminator, interval, max_lines, append, capture_fd):
         yield
 
 
-class StreamlitLoggingHandler(logging.StreamHandler):
-    """Extension of Stream Handler that passes the value of the stream IO buffer to a callback function on every log."""
+class QueuedStreamlitLoggingHandler(logging.Handler):
+    """Logging handler that queues records, and passes the formatted history to a callback in batches.
+
+    Emitting a record only puts it in a queue. Records are formatted and passed
+    on when flushed: on every record if `interval` is 0, otherwise every
+    `interval` seconds by a background thread of the script run that created
+    the handler, so logging in hot loops stays cheap. Records logged by other
+    script runs are dropped, and the callback always runs in the script run of the handler.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[..., Any],
+        terminator: str = "\n",
+        interval: float = 0,
+        max_records: int | None = None,
+        level: int | str = logging.NOTSET,
+    ) -> None:
+        super().__init__(level)
+        self.callback = callback
+        self.terminator = terminator
+        self.interval = interval
+        self._queue: SimpleQueue[logging.LogRecord] = SimpleQueue()
+        self._history: deque[str] = deque(maxlen=max_records)
+        self._text = ""
+        self._flush_lock = threading.Lock()
+        # Records logged by worker threads are shown in the script run that created the handler
+        self._ctx = get_script_run_ctx(suppress_warning=True)
+        self._stopped = threading.Event()
+        self._flusher: threading.Thread | None = None
+        if interval > 0:
+            self._flusher = threading.Thread(
+                target=self._flush_periodically, name="streamlit_extras_logcapture", daemon=True
+            )
+            if self._ctx is not None:
+                add_script_run_ctx(self._flusher, self._ctx)
+            self._flusher.start()
 
-    def set_callback(self, func: Callable[..., Any]) -> None:
-        """Set the callback to be used on this record."""
-        # pylint: disable=attribute-defined-outside-init
-        self.callback = func
+    def handle(self, record: logging.LogRecord) -> bool:
+        # Queueing is thread-safe on its own, there's no need for the handler lock
+        if not self.filter(record) or self._is_foreign_thread():
+            return False
+        self.emit(record)
+        return True
 
     def emit(self, record: logging.LogRecord) -> None:
-        """Emit a record but also call a function on the full buffer."""
-        super().emit(record)
-        self.callback(self.stream.getvalue())
+        """Queue a record, and flush it right away if there is no flush interval."""
+        self._queue.put(record)
+        if self._flusher is None:
+            self.flush()
+
+    @property
+    def text(self) -> str:
+        """The formatted history, as passed to the callback."""
+        return self._text
+
+    def flush(self) -> None:
+        """Format the queued records and pass the history to the callback."""
+        with self._flush_lock:
+            records = []
+            while not self._queue.empty():
+                records.append(self._queue.get())
+            if not records:
+                return
+            self._history.extend(self._format_record(record) for record in records)
+            self._text = "".join(self._history)
+            self._call_callback()
+
+    def _format_record(self, record: logging.LogRecord) -> str:
+        try:
+            return self.format(record) + self.terminator
+        except Exception:
+            self.handleError(record)
+            return ""
+
+    def _is_foreign_thread(self) -> bool:
+        # Loggers are shared by all sessions, records of the other script runs aren't shown in this one
+        ctx = get_script_run_ctx(suppress_warning=True)
+        return self._ctx is not None and ctx is not None and ctx is not self._ctx
+
+    def _call_callback(self) -> None:
+        if self._ctx is None or get_script_run_ctx(suppress_warning=True) is self._ctx:
+            self.callback(self._text)
+            return
+        thread = threading.current_thread()
+        previous_ctx = getattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, None)
+        add_script_run_ctx(thread, self._ctx)
+        try:
+            self.callback(self._text)
+        finally:
+            if previous_ctx is None:
+                delattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME)
+            else:
+                setattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, previous_ctx)
+
+    def _flush_periodically(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self._flush_logging_errors()
+
+    def _flush_logging_errors(self) -> None:
+        # Keep flushing: a failing callback shouldn't silence the logs captured after it
+        try:
+            self.flush()
+        except Exception:
+            _LOGGER.exception("Failed to pass captured logs to %r", self.callback)
+
+    def close(self) -> None:
+        """Stop the background flushes, and pass on the records still queued."""
+        self._stopped.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+        super().close()
 
 
 @extra
@@ -98,6 +414,9 @@ def logcapture(
     terminator: str = "\n",
     from_logger: logging.Logger | None = None,
     formatter: logging.Formatter | None = None,
+    interval: float = 0,
+    max_records: int | None = None,
+    level: int | str = logging.NOTSET,
 ) -> Generator[None, None, None]:
     """
     Redirect logging to a streamlit function call `dst`.
@@ -113,6 +432,12 @@ def logcapture(
             Defaults to `logging.root`.
         formatter (optional, logging.Formatter): If specified, the specified formatter will be added to the logging
             handler to control how logs are displayed.
+        interval (optional, float): If positive, logs are queued and passed to `dst` in batches every `interval`
+            seconds by a background thread, instead of on every log. Use it when logging in hot loops. Records are
+            formatted when flushed, so their arguments shouldn't be mutated after logging. Defaults to 0.
+        max_records (optional, int): Only pass the last `max_records` logs to `dst`. Defaults to None (all logs).
+        level (optional, int or str): Minimum level of the logs to capture. Defaults to `logging.NOTSET` (all logs
+            let through by the logger).
     """
 
     if not from_logger:
@@ -121,33 +446,31 @@ def logcapture(
     # Special-case loguru
     using_loguru = "loguru" in sys.modules and sys.modules["loguru"].logger is from_logger
 
-    with StringIO() as buffer:
-        new_handler = StreamlitLoggingHandler(buffer)
-        new_handler.set_callback(dst)
-        new_handler.terminator = terminator
-        if formatter:
-            new_handler.setFormatter(formatter)
-        elif using_loguru:
-            pass
-        else:
-            new_handler.setFormatter(
-                logging.Formatter(
-                    "%(asctime)s - %(levelname)s %(message)s",
-                    datefmt="%m/%d/%Y %I:%M:%S %p",
-                )
+    new_handler = QueuedStreamlitLoggingHandler(dst, terminator, interval, max_records, level)
+    if formatter:
+        new_handler.setFormatter(formatter)
+    elif using_loguru:
+        pass
+    else:
+        new_handler.setFormatter(
+            logging.Formatter(
+                "%(asctime)s - %(levelname)s %(message)s",
+                datefmt="%m/%d/%Y %I:%M:%S %p",
             )
-        handler_id = None
+        )
+    handler_id = None
+    if using_loguru:
+        handler_id = from_logger.add(new_handler)  # type: ignore[attr-defined]
+    else:
+        from_logger.addHandler(new_handler)
+    try:
+        yield
+    finally:
         if using_loguru:
-            handler_id = from_logger.add(new_handler)  # type: ignore[attr-defined]
+            from_logger.remove(handler_id)  # type: ignore[attr-defined]
         else:
-            from_logger.addHandler(new_handler)
-        try:
-            yield
-        finally:
-            if using_loguru:
-                from_logger.remove(handler_id)  # type: ignore[attr-defined]
-            else:
-                from_logger.removeHandler(new_handler)
+            from_logger.removeHandler(new_handler)
+        new_handler.close()
 
 
 # EXAMPLES ----------------------------------------------------------------------------------
@@ -267,4 +590,141 @@ def test_st_logging() -> None:
     assert mock_loguru.logger.remove.call_args[0][0] == 54
 
 
-__tests__ = [test_st_stdout, test_st_stderr, test_st_logging]
+# This patch makes the test _think_ it's running in stremalit
+@mock.patch("streamlit_extras.capture.get_script_run_ctx", return_value="not none")
+def test_st_stdout_throttled(_: mock.MagicMock) -> None:
+    fake_callback = mock.MagicMock()
+    with stdout(fake_callback, terminator="", interval=60, max_lines=2):
+        for i in range(1000):
+            print(i)
+        # Only the first write went through, the rest is coalesced
+        fake_callback.assert_called_once_with("0")
+    fake_callback.assert_called_with("998\n999\n")
+    assert fake_callback.call_count == 2
+
+    fake_callback.reset_mock()
+    with stdout(fake_callback, terminator="", append=True):
+        print("Hello")
+        print("World")
+    # Each call only receives the new text
+    assert [call.args[0] for call in fake_callback.call_args_list] == ["Hello", "\n", "World", "\n"]
+
+    fake_callback.reset_mock()
+    with stdout(fake_callback, terminator="", interval=60, append=True, max_lines=2):
+        for i in range(5):
+            print(i)
+    assert [call.args[0] for call in fake_callback.call_args_list] == ["0", "3\n4\n"]
+
+    fake_callback.reset_mock()
+    with stdout(fake_callback, terminator="", interval=0.2):
+        print("first")
+        print("last")
+        time.sleep(0.5)
+        # Trailing output is shown once the interval is over, without waiting for another write
+        fake_callback.assert_called_with("first\nlast\n")
+
+
+# This patch makes the test _think_ it's running in stremalit
+@mock.patch("streamlit_extras.capture.get_script_run_ctx", return_value="not none")
+def test_st_stdout_fd(_: mock.MagicMock) -> None:
+    fake_callback = mock.MagicMock()
+    with stdout(fake_callback, capture_fd=True):
+        os.write(1, b"native\n")
+        child = os.posix_spawn(sys.executable, [sys.executable, "-c", "print('child')"], os.environ)
+        assert os.waitstatus_to_exitcode(os.waitpid(child, 0)[1]) == 0
+        worker = threading.Thread(target=os.write, args=(1, b"thread\n"))
+        worker.start()
+        worker.join()
+        # A second capture of the same descriptor would be restored out of order
+        try:
+            with stdout(mock.MagicMock(), capture_fd=True):
+                pass
+        except StreamlitAPIException:
+            pass
+        else:
+            msg = "Capturing file descriptor 1 twice should fail"
+            raise AssertionError(msg)
+    fake_callback.assert_called_with("native\nchild\nthread\n")
+
+    # The descriptor can be captured again once released
+    with stdout(fake_callback, capture_fd=True):
+        os.write(1, b"again\n")
+    fake_callback.assert_called_with("again\n")
+
+
+def test_st_logging_queued() -> None:
+    fake_callback = mock.MagicMock()
+    testlogger = logging.getLogger("test_queued_logger")
+    testlogger.setLevel(logging.DEBUG)
+    formatter = logging.Formatter("%(message)s")
+
+    with logcapture(fake_callback, "", testlogger, formatter, interval=60, max_records=2, level=logging.INFO):
+        for i in range(1000):
+            testlogger.info("line %d", i)
+        testlogger.debug("filtered out")
+        # Nothing is rendered while logging
+        fake_callback.assert_not_called()
+    fake_callback.assert_called_once_with("line 998line 999")
+
+    # Without an interval, records are rendered right away
+    fake_callback.reset_mock()
+    with logcapture(fake_callback, "", testlogger, formatter, max_records=2):
+        testlogger.info("first")
+        fake_callback.assert_called_once_with("first")
+    assert not testlogger.handlers
+
+    # A failing callback is logged, and doesn't stop the background flushes
+    fake_callback.reset_mock()
+    fake_callback.side_effect = lambda text: None if "second" in text else 1 / 0
+    with (
+        mock.patch(f"{__name__}._LOGGER") as fake_logger,
+        logcapture(fake_callback, "", testlogger, formatter, interval=0.05),
+    ):
+        testlogger.info("first")
+        time.sleep(0.3)
+        fake_logger.exception.assert_called_once()
+        testlogger.info("second")
+        time.sleep(0.3)
+        fake_callback.assert_called_with("firstsecond")
+
+
+def test_st_logging_foreign_ctx() -> None:
+    def fake_ctx() -> SimpleNamespace:
+        return SimpleNamespace(pages_manager=SimpleNamespace(main_script_hash=""), gather_usage_stats=False)
+
+    own_ctx, foreign_ctx = fake_ctx(), fake_ctx()
+    calls = []
+
+    def callback(text: str) -> None:
+        calls.append((text, get_script_run_ctx(suppress_warning=True)))
+
+    def log_from(ctx: SimpleNamespace | None, message: str) -> None:
+        worker = threading.Thread(target=testlogger.warning, args=(message,))
+        if ctx is not None:
+            setattr(worker, SCRIPT_RUN_CONTEXT_ATTR_NAME, ctx)
+        worker.start()
+        worker.join()
+
+    testlogger = logging.getLogger("test_foreign_logger")
+    thread = threading.current_thread()
+    setattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, own_ctx)
+    try:
+        with logcapture(callback, "", testlogger, logging.Formatter("%(message)s")):
+            testlogger.warning("own")
+            log_from(foreign_ctx, "foreign")
+            log_from(None, "worker")
+    finally:
+        delattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME)
+    # Records of another session are dropped, the callback runs in the script run of the handler
+    assert calls == [("own", own_ctx), ("ownworker", own_ctx)]
+
+
+__tests__ = [
+    test_st_stdout,
+    test_st_stderr,
+    test_st_stdout_throttled,
+    test_st_stdout_fd,
+    test_st_logging,
+    test_st_logging_queued,
+    test_st_logging_foreign_ctx,
+]
@@ -4,9 +4,9 @@ from datetime import date
 from typing import TYPE_CHECKING, Literal, TypedDict, overload
 
 import streamlit as st
-import streamlit.components.v2
 
 from streamlit_extras import extra
+from streamlit_extras._component_utils import lazy_component
 
 if TYPE_CHECKING:
     from collections.abc import Sequence
@@ -164,7 +164,7 @@ export default function(component) {
 }
 """
 
-_CARD_SELECTOR_COMPONENT = st.components.v2.component(
+_CARD_SELECTOR_COMPONENT = lazy_component(
     name="streamlit_extras.card_selector",
     html='<div id="card-selector-root" class="card-selector-root"></div>',
     css=_CSS,
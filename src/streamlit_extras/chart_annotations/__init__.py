@@ -1,13 +1,10 @@
 from __future__ import annotations
 
 from datetime import date
-from functools import partial
+from functools import cache, partial
 from typing import TYPE_CHECKING
 
-import altair as alt
-import pandas as pd
 import streamlit as st
-from altair.utils.plugin_registry import NoSuchEntryPoint
 from streamlit import cache_data
 
 from .. import extra
@@ -15,20 +12,35 @@ from .. import extra
 if TYPE_CHECKING:
     from collections.abc import Iterable
 
-try:
-    alt.themes.enable("streamlit")
-except NoSuchEntryPoint:
-    st.altair_chart = partial(st.altair_chart, theme="streamlit")  # type: ignore[assignment]
+    import altair as alt
+    import pandas as pd
+
+
+@cache
+def _enable_streamlit_theme() -> None:
+    # altair and pandas are slow to import, so they are only imported once the extra is used
+    import altair as alt
+    from altair.utils.plugin_registry import NoSuchEntryPoint
+
+    try:
+        alt.themes.enable("streamlit")
+    except NoSuchEntryPoint:
+        st.altair_chart = partial(st.altair_chart, theme="streamlit")  # type: ignore[assignment]
 
 
 @cache_data
 def get_data() -> pd.DataFrame:
+    import pandas as pd
+
     source = pd.read_csv("https://raw.githubusercontent.com/vega/vega-datasets/next/data/stocks.csv")
     return source[source.date.gt("2004-01-01")]
 
 
 @cache_data(ttl=60 * 60 * 24)
 def get_chart(data: pd.DataFrame) -> alt.Chart:
+    import altair as alt
+
+    _enable_streamlit_theme()
     hover = alt.selection_single(
         fields=["date"],
         nearest=True,
@@ -100,6 +112,11 @@ def get_annotations_chart(
         alt.Chart: Altair Chart with annotation markers on the horizontal axis
     """
 
+    import altair as alt
+    import pandas as pd
+
+    _enable_streamlit_theme()
+
     # Make a DataFrame for annotations
     annotations_df = pd.DataFrame(
         annotations,
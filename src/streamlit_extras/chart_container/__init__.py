@@ -1,15 +1,19 @@
-from collections.abc import Callable, Generator, Sequence
+from __future__ import annotations
+
 from contextlib import contextmanager
 from datetime import date
-from typing import TypedDict
+from typing import TYPE_CHECKING, TypedDict
 
-import numpy as np
-import pandas as pd
 import streamlit as st
 from streamlit import cache_data
 
 from .. import extra
 
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator, Sequence
+
+    import pandas as pd
+
 
 class ExportConfig(TypedDict, total=False):
     function: Callable[[pd.DataFrame], bytes]
@@ -97,6 +101,9 @@ def chart_container(
 
 
 def get_random_data() -> pd.DataFrame:
+    import numpy as np
+    import pandas as pd
+
     np.random.seed(42)
     return pd.DataFrame(np.random.randn(20, 3), columns=list("abc"))
 
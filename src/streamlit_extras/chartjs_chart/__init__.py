@@ -6,28 +6,19 @@ and beautiful out-of-the-box charts with smooth animations.
 """
 
 from datetime import date
-from functools import cache
 from typing import Any, Literal
 
 import streamlit as st
-import streamlit.components.v2
 import streamlit.errors
 
 from streamlit_extras import extra
+from streamlit_extras._component_utils import lazy_component
 
-
-@cache
-def _get_component() -> Any:
-    """Lazily initialize the CCv2 component.
-
-    Returns:
-        The component callable.
-    """
-    return streamlit.components.v2.component(
-        "streamlit-extras.chartjs_chart",
-        js="index-*.js",
-        html='<div class="react-root"></div>',
-    )
+_COMPONENT = lazy_component(
+    "streamlit-extras.chartjs_chart",
+    js="index-*.js",
+    html='<div class="react-root"></div>',
+)
 
 
 @extra
@@ -92,8 +83,7 @@ def chartjs_chart(
     if "data" not in spec:
         raise streamlit.errors.StreamlitAPIException("spec must contain a 'data' field with labels and datasets")
 
-    component = _get_component()
-    component(
+    _COMPONENT(
         key=key,
         data={
             "spec": spec,
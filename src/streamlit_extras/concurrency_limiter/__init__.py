@@ -1,28 +1,678 @@
 from __future__ import annotations
 
+import bisect
+import gc
 import hashlib
-import inspect
+import heapq
+import itertools
+import logging
+import math
+import os
+import pickle  # noqa: S403 - only used to hash arguments, never to load data
+import sqlite3
 import sys
+import tempfile
+import textwrap
+import threading
 import time
+import uuid
+import weakref
+from abc import ABC, abstractmethod
 from collections import Counter
-from collections.abc import Callable
-from dataclasses import dataclass
+from collections.abc import Callable, Generator
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
 from datetime import date
 from functools import partial, wraps
-from threading import Condition, Lock, Semaphore
-from typing import Any, TypeVar
+from importlib import import_module
+from multiprocessing import get_context
+from pathlib import Path
+from threading import Event, Lock
+from types import CodeType
+from typing import TYPE_CHECKING, Any, Literal, TypeVar
 
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
+from streamlit.runtime.scriptrunner_utils.exceptions import RerunException, ScriptControlException, StopException
+from streamlit.runtime.scriptrunner_utils.script_requests import ScriptRequestType
+from streamlit.runtime.scriptrunner_utils.script_run_context import ScriptRunContext, get_script_run_ctx
 
 from .. import extra
 
+if TYPE_CHECKING:
+    from streamlit.delta_generator import DeltaGenerator
+
 F = TypeVar("F", bound=Callable[..., Any])
 
+_LOGGER = logging.getLogger(__name__)
+
+# Waiters block on their own event, this only bounds how quickly they notice
+# timeouts, stopped script runs and queue position changes
+_POLL_INTERVAL_SECONDS = 0.1
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: float
+    sequence: int
+    event: Event = field(default_factory=Event, compare=False)
+
+
+class QueuedSemaphore:
+    """Counting semaphore that hands free slots to waiters one at a time.
+
+    Waiters are served by ascending priority, and first-come first-served among
+    equal priorities. Each waiter blocks on its own event, so releasing a slot
+    wakes up exactly one waiter.
+    """
+
+    def __init__(self, value: int) -> None:
+        self._value = value
+        self._lock = Lock()
+        self._waiters: list[_Waiter] = []
+        self._sequence = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        """Number of calls waiting for a slot."""
+        return len(self._waiters)
+
+    def enqueue(self, priority: float = 0) -> _Waiter:
+        """Request a slot. The returned waiter's event is set once the slot is granted.
+
+        Returns:
+            The waiter, already granted if a slot was free and nobody was queued.
+        """
+        waiter = _Waiter(priority, next(self._sequence))
+        with self._lock:
+            if self._value > 0 and not self._waiters:
+                self._value -= 1
+                waiter.event.set()
+            else:
+                heapq.heappush(self._waiters, waiter)
+        return waiter
+
+    def position(self, waiter: _Waiter) -> int:
+        """Return the 1-based queue position of a waiter, or 0 if it holds a slot.
+
+        Returns:
+            The number of waiters served before and including this one.
+        """
+        with self._lock:
+            if waiter.event.is_set():
+                return 0
+            return 1 + sum(1 for other in self._waiters if other < waiter)
+
+    def cancel(self, waiter: _Waiter) -> bool:
+        """Leave the queue.
+
+        Returns:
+            True if the waiter was removed, False if it had already been granted
+            a slot (which the caller then owns and must release).
+        """
+        with self._lock:
+            if waiter.event.is_set():
+                return False
+            self._waiters.remove(waiter)
+            heapq.heapify(self._waiters)
+            return True
+
+    def release(self) -> None:
+        """Release a slot, handing it over to the next waiter if there is one."""
+        with self._lock:
+            if self._waiters:
+                heapq.heappop(self._waiters).event.set()
+            else:
+                self._value += 1
+
+
+class LimiterBackend(ABC):
+    """Shares concurrency limits between Streamlit server processes.
+
+    The in-process queue always orders and limits the calls of one process.
+    A backend additionally makes the call that is next in line hold one of
+    `max_concurrency` leases shared by all processes using the same backend,
+    so the limit holds across the whole deployment.
+    """
+
+    #: Seconds to wait between two attempts to get a lease
+    poll_interval: float = 0.2
+
+    @abstractmethod
+    def try_acquire(self, key: str, max_concurrency: int) -> Any | None:
+        """Try to get one of the `max_concurrency` leases of a function without blocking.
+
+        Returns:
+            An opaque lease, or None if all leases are held.
+        """
+
+    @abstractmethod
+    def release(self, key: str, lease: Any) -> None:
+        """Give back a lease obtained from `try_acquire`."""
+
+
+class FileLockBackend(LimiterBackend):
+    """Backend for several server processes on the same host, based on file locks.
+
+    Each of a function's `max_concurrency` slots is a lock file in `directory`.
+    Locks are released by the OS when a process dies, so slots can't leak.
+    Only available on POSIX systems.
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        if sys.platform == "win32":
+            raise StreamlitAPIException(
+                "FileLockBackend relies on POSIX file locks (fcntl), which are not available on Windows. "
+                "Use SQLiteLeaseBackend instead."
+            )
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def try_acquire(self, key: str, max_concurrency: int) -> Any | None:
+        import fcntl
+
+        for slot in range(max_concurrency):
+            fd = os.open(self.directory / f"{key}.{slot}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                continue
+            return fd
+        return None
+
+    def release(self, key: str, lease: Any) -> None:  # noqa: ARG002
+        import fcntl
+
+        try:
+            fcntl.flock(lease, fcntl.LOCK_UN)
+        finally:
+            os.close(lease)
+
+
+class SQLiteLeaseBackend(LimiterBackend):
+    """Backend based on a lease table in a SQLite database shared by all processes.
+
+    Leases expire after `lease_ttl` seconds unless they are renewed by the
+    heartbeat thread of the process holding them, so slots held by a crashed
+    process are freed automatically. A lease that expired anyway (e.g. the
+    process was suspended) is claimed again if a slot is free, otherwise a
+    warning is logged, as the running call then exceeds `max_concurrency`.
+    The database must be on storage that supports SQLite locking, and clocks
+    must be in sync between hosts.
+    """
+
+    def __init__(self, path: str | Path, lease_ttl: float = 30, heartbeat_interval: float = 10) -> None:
+        self.path = str(path)
+        self.lease_ttl = lease_ttl
+        self.heartbeat_interval = heartbeat_interval
+        # Lease id -> (function key, max_concurrency) of the leases held by this process
+        self._held: dict[str, tuple[str, int]] = {}
+        self._lost: set[str] = set()
+        self._held_lock = Lock()
+        self._heartbeat: threading.Thread | None = None
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS leases (lease_id TEXT PRIMARY KEY, key TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS leases_by_key ON leases (key)")
+
+    @contextmanager
+    def _connect(self) -> Generator[sqlite3.Connection, None, None]:
+        # Connections can't be shared between threads, and are cheap to open
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def try_acquire(self, key: str, max_concurrency: int) -> Any | None:
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute("DELETE FROM leases WHERE key = ? AND expires_at < ?", (key, now))
+                (held,) = connection.execute("SELECT COUNT(*) FROM leases WHERE key = ?", (key,)).fetchone()
+                lease_id = None
+                if held < max_concurrency:
+                    lease_id = uuid.uuid4().hex
+                    connection.execute(
+                        "INSERT INTO leases (lease_id, key, expires_at) VALUES (?, ?, ?)",
+                        (lease_id, key, now + self.lease_ttl),
+                    )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+        if lease_id is not None:
+            with self._held_lock:
+                self._held[lease_id] = (key, max_concurrency)
+                if self._heartbeat is None:
+                    self._heartbeat = threading.Thread(
+                        target=self._renew_leases, name="concurrency_limiter_heartbeat", daemon=True
+                    )
+                    self._heartbeat.start()
+        return lease_id
+
+    def release(self, key: str, lease: Any) -> None:  # noqa: ARG002
+        with self._held_lock:
+            self._held.pop(lease, None)
+            self._lost.discard(lease)
+        with self._connect() as connection:
+            connection.execute("DELETE FROM leases WHERE lease_id = ?", (lease,))
+
+    def _renew_leases(self) -> None:
+        while True:
+            time.sleep(self.heartbeat_interval)
+            with self._held_lock:
+                held = dict(self._held)
+            try:
+                with self._connect() as connection:
+                    for lease_id, (key, max_concurrency) in held.items():
+                        self._renew_lease(connection, lease_id, key, max_concurrency)
+            except sqlite3.Error:
+                # Try again on the next beat, leases only expire after lease_ttl
+                pass
+
+    def _renew_lease(self, connection: sqlite3.Connection, lease_id: str, key: str, max_concurrency: int) -> bool:
+        """Extend a lease, or claim it again if it expired and a slot is free.
+
+        Returns:
+            False if the lease is lost, i.e. its call runs without holding a slot.
+        """
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            renewed = connection.execute(
+                "UPDATE leases SET expires_at = ? WHERE lease_id = ?", (now + self.lease_ttl, lease_id)
+            ).rowcount
+            if not renewed:
+                connection.execute("DELETE FROM leases WHERE key = ? AND expires_at < ?", (key, now))
+                (held,) = connection.execute("SELECT COUNT(*) FROM leases WHERE key = ?", (key,)).fetchone()
+                if held < max_concurrency:
+                    connection.execute(
+                        "INSERT INTO leases (lease_id, key, expires_at) VALUES (?, ?, ?)",
+                        (lease_id, key, now + self.lease_ttl),
+                    )
+                    renewed = 1
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+        with self._held_lock:
+            released = lease_id not in self._held
+            if not released and not renewed and lease_id not in self._lost:
+                self._lost.add(lease_id)
+                _LOGGER.warning(
+                    "Lost the lease of a running call to function %s, which now exceeds its max_concurrency. "
+                    "It will be claimed again once a slot is free.",
+                    key,
+                )
+            elif renewed:
+                self._lost.discard(lease_id)
+        if released:
+            # Released while it was being renewed, don't leave it behind
+            connection.execute("DELETE FROM leases WHERE lease_id = ?", (lease_id,))
+        return bool(renewed) or released
+
+
+@dataclass
+class _Flight:
+    """An in-flight (or recently finished) call that identical calls can wait on."""
+
+    done: Event = field(default_factory=Event)
+    result: Any = None
+    error: BaseException | None = None
+    finished_at: float | None = None
+
+    def is_fresh(self, result_ttl: float, now: float) -> bool:
+        """Whether identical calls can still reuse this flight at time `now`.
+
+        Returns:
+            True while the call is running, or while its result is within `result_ttl`.
+        """
+        if self.finished_at is None:
+            return True
+        return self.error is None and now - self.finished_at < result_ttl
+
+
+class TokenBucket:
+    """Token bucket allowing `rate` calls per second on average, with bursts of up to `capacity` calls."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def try_acquire(self, now: float | None = None) -> float:
+        """Take a token if one is available.
+
+        Returns:
+            0 if a token was taken, otherwise the number of seconds until one is available.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def is_full(self, now: float | None = None) -> bool:
+        """Whether the bucket has refilled completely, i.e. it hasn't been used recently.
+
+        Returns:
+            True if the bucket holds `capacity` tokens.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._refill(now)
+            return self._tokens >= self.capacity
+
+
+@dataclass(frozen=True)
+class Throttled:
+    """Returned instead of the function's result when a call exceeds its rate limit.
+
+    Falsy, so callers can check the outcome with `if not result: ...`.
+    """
+
+    func_name: str
+    retry_after: float
+    scope: str
+
+    def __bool__(self) -> bool:
+        return False
+
+
+class LimitedFuture(Future[Any]):
+    """Future of a call offloaded to a `concurrency_limiter` executor.
+
+    Waiting for the result from the app script shows the call's queue position
+    and progress in the placeholder created where the call was made.
+    """
+
+    def __init__(
+        self,
+        executor: _LimitedExecutor | None = None,
+        func_name: str = "",
+        placeholder: DeltaGenerator | None = None,
+    ) -> None:
+        super().__init__()
+        self._executor = executor
+        self.func_name = func_name
+        self._placeholder = placeholder
+
+    @property
+    def position(self) -> int:
+        """1-based queue position of the call, or 0 once it has started."""
+        return 0 if self._executor is None else self._executor.position(self)
+
+    def result(self, timeout: float | None = None) -> Any:
+        """Wait for the call to finish.
+
+        Returns:
+            The call's result.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if self._placeholder is not None and not self.done():
+            self._show_progress(self._placeholder, deadline)
+        return super().result(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    def _show_progress(self, placeholder: DeltaGenerator, deadline: float | None) -> None:
+        ctx = get_script_run_ctx(suppress_warning=True)
+        try:
+            while not self.done():
+                position = self.position
+                if position:
+                    text = f"Function {self.func_name} is waiting in queue at position {position}..."
+                else:
+                    text = f"Running {self.func_name}..."
+                with placeholder.container(), st.spinner(text):
+                    while not self.done() and self.position == position:
+                        if deadline is not None and time.monotonic() >= deadline:
+                            return
+                        _check_script_run_interrupted(ctx)
+                        time.sleep(_POLL_INTERVAL_SECONDS)
+        finally:
+            placeholder.empty()
+
+
+# Upper bounds in seconds of the wait and run time histogram buckets
+_HISTOGRAM_BOUNDS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, math.inf)
+
+
+@dataclass
+class Histogram:
+    """Distribution of durations, counted in buckets with the upper bounds of `_HISTOGRAM_BOUNDS`."""
+
+    counts: list[int] = field(default_factory=lambda: [0] * len(_HISTOGRAM_BOUNDS))
+    count: int = 0
+    sum: float = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(_HISTOGRAM_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket it falls in.
+
+        Returns:
+            The estimate in seconds, 0 if nothing was observed.
+        """
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(_HISTOGRAM_BOUNDS, self.counts, strict=True):
+            seen += count
+            if count and seen >= rank:
+                return bound
+        return 0.0
+
+
+@dataclass(frozen=True)
+class LimiterStats:
+    """Snapshot of a limited function's metrics, see `get_limiter_stats`."""
+
+    function: str
+    max_concurrency: int
+    in_flight: int
+    queued: int
+    calls: int
+    rejections: int
+    timeouts: int
+    wait_time: Histogram
+    run_time: Histogram
+
+
+@dataclass
+class _FuncStats:
+    """Metrics of a limited function, updated from script and worker threads."""
+
+    function: str = ""
+    max_concurrency: int = 1
+    in_flight: int = 0
+    calls: int = 0
+    rejections: int = 0
+    timeouts: int = 0
+    wait_time: Histogram = field(default_factory=Histogram)
+    run_time: Histogram = field(default_factory=Histogram)
+    lock: Lock = field(default_factory=Lock)
+
+    def record_rejection(self) -> None:
+        with self.lock:
+            self.rejections += 1
+
+    @contextmanager
+    def counting_timeouts(self) -> Generator[None, None, None]:
+        """Count TimeoutErrors raised while waiting in this block.
+
+        Raises:
+            TimeoutError: Re-raised after counting it.
+        """
+        try:
+            yield
+        except TimeoutError:
+            with self.lock:
+                self.timeouts += 1
+            raise
+
+    @contextmanager
+    def running(self, queued_at: float) -> Generator[None, None, None]:
+        """Record a call that waited since `queued_at` and runs in this block."""
+        started_at = time.monotonic()
+        with self.lock:
+            self.in_flight += 1
+            self.calls += 1
+            self.wait_time.observe(started_at - queued_at)
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+                self.run_time.observe(time.monotonic() - started_at)
+
+
+@dataclass(order=True)
+class _Job:
+    priority: float
+    sequence: int
+    run: Callable[[], Any] = field(compare=False)
+    future: LimitedFuture = field(compare=False)
+    deadline: float | None = field(compare=False)
+
+
+def _call_in_process(module: str, qualname: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+    """Look up a decorated function in a worker process and call it.
+
+    Returns:
+        The function's result.
+    """
+    target: Any = import_module(module)
+    for name in qualname.split("."):
+        target = getattr(target, name)
+    # The module attribute is the concurrency_limiter wrapper, call the function it wraps
+    target = getattr(target, "__wrapped__", target)
+    return target(*args, **kwargs)
+
+
+class _LimitedExecutor:
+    """Runs submitted calls on up to `max_workers` threads, by ascending priority.
+
+    With `processes`, each thread hands its call over to a process pool of the
+    same size, so CPU-bound functions can use several cores.
+    """
+
+    def __init__(self, max_workers: int, processes: bool, stats: _FuncStats) -> None:
+        self._stats = stats
+        self._threads = ThreadPoolExecutor(max_workers, thread_name_prefix="concurrency_limiter")
+        # Forking a multi-threaded server can deadlock, so workers are spawned
+        self._processes = ProcessPoolExecutor(max_workers, get_context("spawn")) if processes else None
+        self._jobs: list[_Job] = []
+        self._lock = Lock()
+        self._sequence = itertools.count()
+
+    def submit(
+        self,
+        run: Callable[[], Any],
+        priority: float,
+        deadline: float | None,
+        func_name: str,
+        placeholder: DeltaGenerator | None,
+    ) -> LimitedFuture:
+        """Queue a call. Calls that haven't started by `deadline` fail with a TimeoutError.
+
+        Returns:
+            The call's future.
+        """
+        future = LimitedFuture(self, func_name, placeholder)
+        with self._lock:
+            heapq.heappush(self._jobs, _Job(priority, next(self._sequence), run, future, deadline))
+        # Every job gets a thread task, which runs whichever job is first in line
+        self._threads.submit(self._run_next)
+        return future
+
+    def position(self, future: LimitedFuture) -> int:
+        """Return the 1-based queue position of a call, or 0 if it has started.
+
+        Returns:
+            The number of queued calls served before and including this one.
+        """
+        with self._lock:
+            job = next((job for job in self._jobs if job.future is future), None)
+            if job is None:
+                return 0
+            return 1 + sum(1 for other in self._jobs if other < job)
+
+    def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a function in the process pool if there is one, else in the current thread.
+
+        Returns:
+            The function's result.
+        """
+        if self._processes is None:
+            return func(*args, **kwargs)
+        return self._processes.submit(_call_in_process, func.__module__, func.__qualname__, args, kwargs).result()
+
+    def shutdown(self) -> None:
+        """Stop the worker threads and processes once they are idle."""
+        self._threads.shutdown(wait=False)
+        if self._processes is not None:
+            self._processes.shutdown(wait=False)
+
+    def _run_next(self) -> None:
+        with self._lock:
+            job = heapq.heappop(self._jobs)
+        if not job.future.set_running_or_notify_cancel():
+            return
+        if job.deadline is not None and time.monotonic() > job.deadline:
+            with self._stats.lock:
+                self._stats.timeouts += 1
+            job.future.set_exception(TimeoutError(f"Timed out waiting to run {job.future.func_name}."))
+            return
+        try:
+            result = job.run()
+        except BaseException as error:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(result)
+
 
 @dataclass
 class FuncConcurrencyInfo:
-    semaphore: Semaphore
-    condition: Condition
+    semaphore: QueuedSemaphore
+    flights: dict[str, _Flight] = field(default_factory=dict)
+    flights_lock: Lock = field(default_factory=Lock)
+    # Rate limit scope ("" for global, or a session / user id) -> token bucket
+    buckets: dict[str, TokenBucket] = field(default_factory=dict)
+    buckets_lock: Lock = field(default_factory=Lock)
+    executor: _LimitedExecutor | None = None
+    stats: _FuncStats = field(default_factory=_FuncStats)
+
+    def get_bucket(self, scope: str, rate: float, capacity: int) -> TokenBucket:
+        """Return the token bucket of a rate limit scope, creating it if needed.
+
+        Returns:
+            The scope's token bucket.
+        """
+        with self.buckets_lock:
+            bucket = self.buckets.get(scope)
+            if bucket is None:
+                # Full buckets behave exactly like new ones, so idle scopes can be dropped
+                for idle in [key for key, other in self.buckets.items() if other.is_full()]:
+                    del self.buckets[idle]
+                bucket = self.buckets[scope] = TokenBucket(rate, capacity)
+            return bucket
 
 
 SEMAPHORES_LOCK = Lock()
@@ -31,94 +681,701 @@ CONCURRENCY_MAP: dict[str, FuncConcurrencyInfo] = {}
 COUNTERS: Counter = Counter()
 
 
+# (module, qualname, code, max_concurrency) -> function key. Code objects compare
+# by value, so reruns re-decorating an unchanged function hit this memo
+_FUNCTION_KEYS: dict[tuple[str, str, CodeType | None, int], str] = {}
+# Function key -> its keys in _FUNCTION_KEYS, to forget evicted versions without a scan
+_FUNCTION_MEMO_KEYS: dict[str, set[tuple[str, str, CodeType | None, int]]] = {}
+# (module, qualname) -> keys of the function's versions in CONCURRENCY_MAP
+_FUNCTION_VERSIONS: dict[tuple[str, str], set[str]] = {}
+# Function key -> decorated wrappers that can still call that version of the function
+_WRAPPERS: dict[str, weakref.WeakSet[Callable[..., Any]]] = {}
+
+
+def _hash_code(hasher: Any, code: CodeType) -> None:
+    """Hash a code object, leaving out the parts that depend on where its file is.
+
+    `marshal.dumps(code)` would include `co_filename`, so the same app deployed at
+    two paths would get different keys, and replicas sharing a backend wouldn't share limits.
+    """
+    hasher.update(code.co_name.encode("utf-8"))
+    hasher.update(code.co_code)
+    hasher.update(repr(code.co_names).encode("utf-8"))
+    for const in code.co_consts:
+        _hash_const(hasher, const)
+
+
+def _hash_const(hasher: Any, const: Any) -> None:
+    if isinstance(const, CodeType):
+        _hash_code(hasher, const)
+    elif isinstance(const, tuple):
+        hasher.update(b"(")
+        for item in const:
+            _hash_const(hasher, item)
+        hasher.update(b")")
+    elif isinstance(const, frozenset):
+        # The iteration order of sets of strings changes between processes
+        hasher.update(repr(sorted(repr(item) for item in const)).encode("utf-8"))
+    else:
+        hasher.update(f"{type(const).__name__}:{const!r}".encode())
+
+
 def _make_function_key(func: Callable[..., Any], max_concurrency: int) -> str:
     """Create the unique key for a function's cache.
 
     A function's key is stable across reruns of the app, and changes when
-    the function's source code changes.
+    the function's code changes.
 
     Returns:
         str: A hex digest uniquely identifying the function.
     """
+    code = getattr(func, "__code__", None)
+    memo_key = (func.__module__, func.__qualname__, code, max_concurrency)
+    function_key = _FUNCTION_KEYS.get(memo_key)
+    if function_key is not None:
+        return function_key
 
-    hashlib_kwargs: dict[str, Any] = {"usedforsecurity": False} if sys.version_info >= (3, 9) else {}
-    func_hasher = hashlib.new("md5", **hashlib_kwargs)
-
+    func_hasher = hashlib.md5(usedforsecurity=False)
     func_hasher.update(func.__module__.encode("utf-8"))
     func_hasher.update(func.__qualname__.encode("utf-8"))
+    if code is not None:
+        # Covers the bytecode, constants and nested functions, without reading the source file
+        _hash_code(func_hasher, code)
+    func_hasher.update(max_concurrency.to_bytes(4, byteorder="big"))
+
+    function_key = func_hasher.hexdigest()
+    # Guarded like every other write, as `_register_function` evicts memo keys of other sessions' reruns
+    with SEMAPHORES_LOCK:
+        _FUNCTION_KEYS[memo_key] = function_key
+        _FUNCTION_MEMO_KEYS.setdefault(function_key, set()).add(memo_key)
+    return function_key
+
+
+def _count_call(function_key: str, delta: int) -> None:
+    with SEMAPHORES_LOCK:
+        COUNTERS.update({function_key: delta})
+
 
+def _register_function(
+    func: Callable[..., Any],
+    function_key: str,
+    create: Callable[[], FuncConcurrencyInfo],
+    wrapper: Callable[..., Any],
+) -> FuncConcurrencyInfo:
+    """Return the function's entry in CONCURRENCY_MAP, creating it if needed, for use by `wrapper`.
+
+    Registering a function (e.g. on every rerun) evicts the entries of its other
+    versions (e.g. before its source was edited during development) that can't be
+    called anymore: once all their wrappers were garbage collected, and none of their
+    calls are queued or running.
+
+    Returns:
+        The function's entry.
+    """
+    with SEMAPHORES_LOCK:
+        versions = _FUNCTION_VERSIONS.setdefault((func.__module__, func.__qualname__), set())
+        unreachable = [key for key in versions if key != function_key and not COUNTERS[key] and not _WRAPPERS.get(key)]
+        for stale_key in unreachable:
+            versions.discard(stale_key)
+            _WRAPPERS.pop(stale_key, None)
+            COUNTERS.pop(stale_key, None)
+            stale_info = CONCURRENCY_MAP.pop(stale_key)
+            if stale_info.executor is not None:
+                stale_info.executor.shutdown()
+            for memo_key in _FUNCTION_MEMO_KEYS.pop(stale_key, ()):
+                _FUNCTION_KEYS.pop(memo_key, None)
+
+        versions.add(function_key)
+        _WRAPPERS.setdefault(function_key, weakref.WeakSet()).add(wrapper)
+        func_info = CONCURRENCY_MAP.get(function_key)
+        if func_info is None:
+            func_info = CONCURRENCY_MAP[function_key] = create()
+        return func_info
+
+
+def _make_call_key(args: tuple[Any, ...], kwargs: dict[str, Any]) -> str | None:
+    """Hash a call's arguments to find identical calls.
+
+    Returns:
+        A hex digest of the pickled arguments, or None if they can't be pickled.
+    """
     try:
-        source_code = inspect.getsource(func).encode("utf-8")
-    except OSError:
-        source_code = func.__code__.co_code
+        payload = pickle.dumps((args, sorted(kwargs.items())), protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return None
+    return hashlib.sha256(payload).hexdigest()
 
-    func_hasher.update(source_code)
-    func_hasher.update(max_concurrency.to_bytes(4, byteorder="big"))
 
-    return func_hasher.hexdigest()
+def _get_rate_limit_scope(scope: Literal["global", "session", "user"]) -> str:
+    """Identify who a call's rate limit applies to.
+
+    Returns:
+        "" for the global scope, otherwise an id of the current user or session.
+        Users that aren't logged in are limited per session.
+    """
+    if scope == "global":
+        return ""
+    if scope == "user":
+        try:
+            if st.user.get("is_logged_in"):
+                user_id = st.user.get("sub") or st.user.get("email")
+                if user_id:
+                    return f"user:{user_id}"
+        except Exception:
+            pass
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return f"session:{ctx.session_id if ctx else ''}"
+
+
+def _check_script_run_interrupted(ctx: ScriptRunContext | None) -> None:
+    """Raise the script control exception if the waiting script run was stopped or rerun.
+
+    Streamlit only checks for these requests when a script sends a message to the
+    frontend, which never happens while it is blocked waiting for a slot.
+
+    Raises:
+        RerunException: If a rerun was requested.
+        StopException: If the script run was stopped, e.g. when the session disconnected.
+    """
+    if ctx is None or ctx.script_requests is None:
+        return
+    request = ctx.script_requests.on_scriptrunner_yield()
+    if request is None:
+        return
+    if request.type == ScriptRequestType.RERUN:
+        raise RerunException(request.rerun_data)
+    raise StopException
+
+
+def _wait_for_slot(
+    semaphore: QueuedSemaphore,
+    waiter: _Waiter,
+    func_name: str,
+    deadline: float | None,
+    show_spinner: bool,
+) -> None:
+    """Block until the waiter has been granted a slot, leaving the queue on failure.
+
+    Raises:
+        TimeoutError: If `deadline` passed before a slot was granted.
+    """
+    if waiter.event.is_set():
+        return
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    placeholder = st.empty() if show_spinner else None
+    try:
+        while not waiter.event.is_set():
+            position = semaphore.position(waiter)
+            if placeholder is None:
+                position_changed = _wait_until_position_changes(semaphore, waiter, position, deadline, ctx, track=False)
+            else:
+                text = f"Function {func_name} is waiting in queue at position {position}..."
+                with placeholder.container(), st.spinner(text):
+                    position_changed = _wait_until_position_changes(semaphore, waiter, position, deadline, ctx)
+            if not position_changed and not waiter.event.is_set():
+                raise TimeoutError(f"Timed out waiting to run {func_name}.")
+    except BaseException:
+        if not semaphore.cancel(waiter):
+            # The slot was granted while giving up, pass it on to the next waiter
+            semaphore.release()
+        raise
+    finally:
+        if placeholder is not None:
+            placeholder.empty()
+
+
+def _wait_until_position_changes(
+    semaphore: QueuedSemaphore,
+    waiter: _Waiter,
+    position: int,
+    deadline: float | None,
+    ctx: ScriptRunContext | None,
+    track: bool = True,
+) -> bool:
+    """Wait until the waiter is granted a slot or, if `track` is set, moves in the queue.
+
+    Returns:
+        False if the deadline passed, True otherwise.
+    """
+    while not waiter.event.wait(_POLL_INTERVAL_SECONDS):
+        if deadline is not None and time.monotonic() >= deadline:
+            return False
+        _check_script_run_interrupted(ctx)
+        if track and semaphore.position(waiter) != position:
+            return True
+    return True
+
+
+@contextmanager
+def _waiting_spinner(show_spinner: bool, text: str) -> Generator[None, None, None]:
+    """Show a spinner while waiting, and remove it afterwards."""
+    if not show_spinner:
+        yield
+        return
+    placeholder = st.empty()
+    try:
+        with placeholder.container(), st.spinner(text):
+            yield
+    finally:
+        placeholder.empty()
+
+
+def _wait_for_token(bucket: TokenBucket, func_name: str, deadline: float | None, show_spinner: bool) -> None:
+    """Block until the token bucket lets the call through.
+
+    Raises:
+        TimeoutError: If no token will be available before `deadline`.
+    """
+    retry_after = bucket.try_acquire()
+    if not retry_after:
+        return
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    with _waiting_spinner(show_spinner, f"Function {func_name} is rate limited, waiting to run..."):
+        while retry_after:
+            if deadline is not None and time.monotonic() + retry_after > deadline:
+                raise TimeoutError(f"Timed out waiting for the rate limit of {func_name}.")
+            time.sleep(min(retry_after, _POLL_INTERVAL_SECONDS))
+            _check_script_run_interrupted(ctx)
+            retry_after = bucket.try_acquire()
+
+
+def _wait_for_lease(
+    backend: LimiterBackend,
+    function_key: str,
+    max_concurrency: int,
+    func_name: str,
+    deadline: float | None,
+    show_spinner: bool,
+) -> Any:
+    """Block until the backend grants a lease for the function.
+
+    Returns:
+        The lease, to be passed to `backend.release`.
+
+    Raises:
+        TimeoutError: If `deadline` passed before a lease was granted.
+    """
+    lease = backend.try_acquire(function_key, max_concurrency)
+    if lease is not None:
+        return lease
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    with _waiting_spinner(show_spinner, f"Function {func_name} is waiting for a free slot on another server..."):
+        while lease is None:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Timed out waiting to run {func_name}.")
+            time.sleep(backend.poll_interval)
+            _check_script_run_interrupted(ctx)
+            lease = backend.try_acquire(function_key, max_concurrency)
+    return lease
+
+
+def _wait_for_flight(flight: _Flight, func_name: str, deadline: float | None, show_spinner: bool) -> None:
+    """Block until an identical in-flight call has finished.
+
+    Raises:
+        TimeoutError: If `deadline` passed before the call finished.
+    """
+    if flight.done.is_set():
+        return
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    with _waiting_spinner(show_spinner, f"Waiting for an identical call to {func_name} to finish..."):
+        finished = _wait_until_done(flight.done, deadline, ctx)
+    if not finished:
+        raise TimeoutError(f"Timed out waiting for {func_name}.")
+
+
+def _wait_until_done(done: Event, deadline: float | None, ctx: ScriptRunContext | None) -> bool:
+    """Wait until `done` is set.
+
+    Returns:
+        False if the deadline passed, True otherwise.
+    """
+    while not done.wait(_POLL_INTERVAL_SECONDS):
+        if deadline is not None and time.monotonic() >= deadline:
+            return False
+        _check_script_run_interrupted(ctx)
+    return True
+
+
+def _run_coalesced(
+    func_info: FuncConcurrencyInfo,
+    call_key: str,
+    run: Callable[[], Any],
+    func_name: str,
+    deadline: float | None,
+    show_spinner: bool,
+    result_ttl: float,
+) -> Any:
+    """Run a call, or share the result of an identical call that is running or fresh.
+
+    Exceptions raised by the shared call are raised again in every caller.
+
+    Returns:
+        The call's result.
+    """
+    while True:
+        now = time.monotonic()
+        with func_info.flights_lock:
+            # Drop finished flights whose result can't be reused anymore
+            for key in [key for key, flight in func_info.flights.items() if not flight.is_fresh(result_ttl, now)]:
+                del func_info.flights[key]
+            flight = func_info.flights.get(call_key)
+            leader = flight is None
+            if flight is None:
+                flight = func_info.flights[call_key] = _Flight()
+
+        if leader:
+            break
+
+        with func_info.stats.counting_timeouts():
+            _wait_for_flight(flight, func_name, deadline, show_spinner)
+        if isinstance(flight.error, ScriptControlException):
+            # The call was abandoned because its own script run stopped,
+            # so there is no result to share: run it again instead
+            continue
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = run()
+        return flight.result
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        flight.finished_at = time.monotonic()
+        flight.done.set()
+        if flight.error is not None or result_ttl <= 0:
+            with func_info.flights_lock:
+                if func_info.flights.get(call_key) is flight:
+                    del func_info.flights[call_key]
 
 
 @extra
 def concurrency_limiter(
-    func: F | None = None, max_concurrency: int = 1, show_spinner: bool = True
+    func: F | None = None,
+    max_concurrency: int = 1,
+    show_spinner: bool = True,
+    timeout: float | None = None,
+    priority: Callable[..., float] | None = None,
+    coalesce: bool = False,
+    result_ttl: float = 0,
+    rate_limit: float | None = None,
+    burst: int | None = None,
+    rate_limit_scope: Literal["global", "session", "user"] = "global",
+    on_rate_limit: Literal["wait", "reject"] = "wait",
+    backend: LimiterBackend | None = None,
+    executor: Literal["thread", "process"] | None = None,
 ) -> F | Callable[[F], F]:
     """Decorator that limits function concurrent execution in Stremalit app.
 
+    Calls that can't run right away wait in a queue and are served in order.
+    A waiting call leaves the queue when its script run is stopped or rerun.
+
     Args:
         max_concurrency (int): The number of allowed instances of the decorated function
             to be run simultaneously. Defaults to 1.
-        show_spinner (bool): If True, a spinner will be shown while waiting for the
-            function to be executed.
+        show_spinner (bool): If True, a spinner showing the call's position in the
+            queue will be shown while waiting for the function to be executed.
+        timeout (float, optional): Maximum number of seconds a call waits before it
+            starts, for its rate limit, queue slot and backend lease altogether, before
+            raising a TimeoutError. Defaults to None (wait indefinitely).
+        priority (Callable, optional): Called with the decorated function's arguments
+            to compute the call's priority. Calls with lower values are served first,
+            calls with equal priority in FIFO order. Defaults to None (FIFO).
+        coalesce (bool): If True, calls with the same arguments as a call that is already
+            queued or running don't run again, they wait for it and receive its result
+            (or exception). Arguments must be picklable, other calls are never coalesced.
+            Defaults to False.
+        result_ttl (float): With `coalesce`, the number of seconds a finished call's
+            result keeps being returned to identical calls. The same result object is
+            shared between sessions, so it shouldn't be mutated. Defaults to 0.
+        rate_limit (float, optional): Maximum average number of calls per second,
+            enforced with a token bucket before calls enter the queue. Defaults to
+            None (no rate limit).
+        burst (int, optional): Number of calls that can run back to back before
+            the rate limit kicks in. Defaults to `rate_limit` rounded up (at least 1).
+        rate_limit_scope (str): Who the rate limit applies to: "global" (all calls),
+            "session" (each browser session) or "user" (each logged in `st.user`,
+            falling back to the session for anonymous users). Defaults to "global".
+        on_rate_limit (str): What to do with calls over the rate limit: "wait" until
+            they are allowed (subject to `timeout`), or "reject" them by returning a
+            `Throttled` object instead of calling the function. Defaults to "wait".
+        backend (LimiterBackend, optional): Shares `max_concurrency` between several
+            Streamlit server processes, e.g. `FileLockBackend` for processes on the same
+            host or `SQLiteLeaseBackend` for a database shared by several replicas.
+            Defaults to None (the limit only holds within this process).
+        executor (str, optional): Run calls in the background on a shared pool of
+            `max_concurrency` workers instead of blocking the script: "thread" for
+            threads, or "process" for processes so CPU-bound functions can use several
+            cores (the function must then be defined in an importable module, not in
+            the app script). Calls return a `LimitedFuture` right away, and waiting for
+            its `result()` shows the call's queue position. `coalesce` doesn't apply.
+            Defaults to None (run on the script thread).
 
     Returns:
         Callable: The decorated function with concurrency limiting applied.
+
+    Raises:
+        ValueError: If `rate_limit` or `burst` is not positive.
+        StreamlitAPIException: If `executor` is "process" and the function can't be
+            imported by worker processes.
     """
+    if rate_limit is not None and rate_limit <= 0:
+        raise ValueError(f"rate_limit must be a positive number of calls per second, got {rate_limit}.")
+    if burst is not None and burst < 1:
+        raise ValueError(f"burst must be a positive number of calls, got {burst}.")
 
     if func is None:
         return partial(  # type: ignore[return-value]
             concurrency_limiter,
             max_concurrency=max_concurrency,
             show_spinner=show_spinner,
+            timeout=timeout,
+            priority=priority,
+            coalesce=coalesce,
+            result_ttl=result_ttl,
+            rate_limit=rate_limit,
+            burst=burst,
+            rate_limit_scope=rate_limit_scope,
+            on_rate_limit=on_rate_limit,
+            backend=backend,
+            executor=executor,
         )
 
     function_key = _make_function_key(func, max_concurrency)
 
-    with SEMAPHORES_LOCK:
-        if function_key not in CONCURRENCY_MAP:
-            CONCURRENCY_MAP[function_key] = FuncConcurrencyInfo(
-                semaphore=Semaphore(max_concurrency),
-                condition=Condition(),
-            )
+    if executor == "process" and (func.__module__ == "__main__" or "<locals>" in func.__qualname__):
+        raise StreamlitAPIException(
+            f"executor='process' needs {func.__qualname__} to be importable from its module by worker "
+            "processes. Move it out of the app script into a module, or use executor='thread'."
+        )
 
-    @wraps(func)
-    def wrapper(*args: Any, **kwargs: Any) -> Any:
-        func_info = CONCURRENCY_MAP[function_key]
-        acquired = False
+    def create_func_info() -> FuncConcurrencyInfo:
+        stats = _FuncStats(f"{func.__module__}.{func.__qualname__}", max_concurrency)
+        return FuncConcurrencyInfo(
+            semaphore=QueuedSemaphore(max_concurrency),
+            executor=_LimitedExecutor(max_concurrency, executor == "process", stats) if executor else None,
+            stats=stats,
+        )
 
-        COUNTERS.update({function_key: 1})
+    bucket_capacity = burst if burst is not None else max(1, math.ceil(rate_limit or 1))
 
+    def throttle(deadline: float | None) -> Throttled | None:
+        if rate_limit is None:
+            return None
+        scope = _get_rate_limit_scope(rate_limit_scope)
+        bucket = func_info.get_bucket(scope, rate_limit, bucket_capacity)
+        if on_rate_limit == "reject":
+            retry_after = bucket.try_acquire()
+            if not retry_after:
+                return None
+            func_info.stats.record_rejection()
+            return Throttled(func.__name__, retry_after, scope)
+        with func_info.stats.counting_timeouts():
+            _wait_for_token(bucket, func.__name__, deadline, show_spinner)
+        return None
+
+    def run_func(
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        queued_at: float,
+        deadline: float | None,
+        show_lease_spinner: bool,
+    ) -> Any:
+        run = func if func_info.executor is None else partial(func_info.executor.call, func)
+        if backend is None:
+            with func_info.stats.running(queued_at):
+                return run(*args, **kwargs)
+        with func_info.stats.counting_timeouts():
+            lease = _wait_for_lease(backend, function_key, max_concurrency, func.__name__, deadline, show_lease_spinner)
         try:
-            with func_info.condition:
-                while not (acquired := func_info.semaphore.acquire(blocking=False)):
-                    if show_spinner:
-                        num_of_instances = COUNTERS[function_key] - max_concurrency
-                        text = f"""Function {func.__name__} has approximately {num_of_instances} instances waiting..."""
-                        with st.spinner(text):
-                            func_info.condition.wait()
-                    else:
-                        func_info.condition.wait()
+            with func_info.stats.running(queued_at):
+                return run(*args, **kwargs)
+        finally:
+            backend.release(function_key, lease)
 
-            return func(*args, **kwargs)
+    def run_queued(args: tuple[Any, ...], kwargs: dict[str, Any], deadline: float | None) -> Any:
+        call_priority = priority(*args, **kwargs) if priority is not None else 0
+        _count_call(function_key, 1)
+
+        try:
+            queued_at = time.monotonic()
+            waiter = func_info.semaphore.enqueue(call_priority)
+            with func_info.stats.counting_timeouts():
+                _wait_for_slot(func_info.semaphore, waiter, func.__name__, deadline, show_spinner)
+            try:
+                return run_func(args, kwargs, queued_at, deadline, show_spinner)
+            finally:
+                func_info.semaphore.release()
         finally:
-            COUNTERS.update({function_key: -1})
-            with func_info.condition:
-                if acquired:
-                    func_info.semaphore.release()
-                func_info.condition.notify_all()
+            _count_call(function_key, -1)
+
+    def submit_limited(args: tuple[Any, ...], kwargs: dict[str, Any], deadline: float | None) -> LimitedFuture:
+        assert func_info.executor is not None
+        call_priority = priority(*args, **kwargs) if priority is not None else 0
+        throttled = throttle(deadline)
+        if throttled is not None:
+            future = LimitedFuture(func_name=func.__name__)
+            future.set_result(throttled)
+            return future
+
+        _count_call(function_key, 1)
+        future = func_info.executor.submit(
+            # Worker threads have no script run to show a spinner in
+            partial(run_func, args, kwargs, time.monotonic(), deadline, False),
+            call_priority,
+            deadline,
+            func.__name__,
+            st.empty() if show_spinner else None,
+        )
+        future.add_done_callback(lambda _: _count_call(function_key, -1))
+        return future
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        # A single deadline covers all the waits of a call
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if executor is not None:
+            return submit_limited(args, kwargs, deadline)
+        # Every call is rate limited in its own scope, before it can join an identical call
+        throttled = throttle(deadline)
+        if throttled is not None:
+            return throttled
+        call_key = _make_call_key(args, kwargs) if coalesce else None
+        if call_key is None:
+            return run_queued(args, kwargs, deadline)
+        return _run_coalesced(
+            func_info,
+            call_key,
+            partial(run_queued, args, kwargs, deadline),
+            func.__name__,
+            deadline,
+            show_spinner,
+            result_ttl,
+        )
 
+    # Registered along with the wrapper, which looks up func_info when it is called
+    func_info = _register_function(func, function_key, create_func_info, wrapper)
     return wrapper
 
 
+def get_limiter_stats() -> list[LimiterStats]:
+    """Return a snapshot of the metrics of all functions decorated with `concurrency_limiter`.
+
+    Returns:
+        One `LimiterStats` per limited function, sorted by function name.
+    """
+    with SEMAPHORES_LOCK:
+        items = list(CONCURRENCY_MAP.items())
+        counters = dict(COUNTERS)
+
+    snapshots = []
+    for function_key, func_info in items:
+        stats = func_info.stats
+        with stats.lock:
+            snapshots.append(
+                LimiterStats(
+                    function=stats.function,
+                    max_concurrency=stats.max_concurrency,
+                    in_flight=stats.in_flight,
+                    # COUNTERS counts calls from the moment they queue up until they finish
+                    queued=max(0, counters.get(function_key, 0) - stats.in_flight),
+                    calls=stats.calls,
+                    rejections=stats.rejections,
+                    timeouts=stats.timeouts,
+                    wait_time=replace(stats.wait_time, counts=list(stats.wait_time.counts)),
+                    run_time=replace(stats.run_time, counts=list(stats.run_time.counts)),
+                )
+            )
+    return sorted(snapshots, key=lambda snapshot: snapshot.function)
+
+
+def _format_prometheus_histogram(name: str, labels: str, histogram: Histogram) -> list[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in zip(_HISTOGRAM_BOUNDS, histogram.counts, strict=True):
+        cumulative += count
+        le = "+Inf" if bound == math.inf else repr(bound)
+        lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+    lines.extend((f"{name}_sum{{{labels}}} {histogram.sum!r}", f"{name}_count{{{labels}}} {histogram.count}"))
+    return lines
+
+
+def limiter_metrics_text(prefix: str = "streamlit_concurrency_limiter") -> str:
+    """Render the metrics of `get_limiter_stats` in the Prometheus text exposition format.
+
+    Serve the text from an endpoint scraped by Prometheus, or push it to a gateway.
+
+    Args:
+        prefix (str): Prefix of the metric names. Defaults to "streamlit_concurrency_limiter".
+
+    Returns:
+        str: The metrics, one sample per line.
+    """
+    all_stats = get_limiter_stats()
+    metrics: list[tuple[str, str, str, Callable[[LimiterStats], int]]] = [
+        ("in_flight", "gauge", "Calls currently running.", lambda stats: stats.in_flight),
+        ("queued", "gauge", "Calls waiting for a slot.", lambda stats: stats.queued),
+        ("max_concurrency", "gauge", "Maximum number of concurrent calls.", lambda stats: stats.max_concurrency),
+        ("calls_total", "counter", "Calls that started running.", lambda stats: stats.calls),
+        ("rejections_total", "counter", "Calls rejected by the rate limit.", lambda stats: stats.rejections),
+        ("timeouts_total", "counter", "Calls that timed out while waiting.", lambda stats: stats.timeouts),
+    ]
+
+    lines = []
+    for suffix, kind, help_text, value in metrics:
+        lines += [f"# HELP {prefix}_{suffix} {help_text}", f"# TYPE {prefix}_{suffix} {kind}"]
+        lines += [f'{prefix}_{suffix}{{function="{stats.function}"}} {value(stats)}' for stats in all_stats]
+    for suffix, help_text in (
+        ("wait_seconds", "Time calls waited before running."),
+        ("run_seconds", "Time calls took to run."),
+    ):
+        lines += [f"# HELP {prefix}_{suffix} {help_text}", f"# TYPE {prefix}_{suffix} histogram"]
+        for stats in all_stats:
+            histogram = stats.wait_time if suffix == "wait_seconds" else stats.run_time
+            lines += _format_prometheus_histogram(f"{prefix}_{suffix}", f'function="{stats.function}"', histogram)
+    return "\n".join(lines) + "\n"
+
+
+@extra
+def limiter_stats_panel() -> None:
+    """Show the metrics of all functions decorated with `concurrency_limiter` in a table.
+
+    Meant for an admin page, to help size `max_concurrency` from real traffic.
+    Wait and run time quantiles are estimated from histogram buckets.
+    """
+    all_stats = get_limiter_stats()
+    if not all_stats:
+        st.info("No function decorated with concurrency_limiter has been called yet.")
+        return
+
+    st.dataframe(
+        [
+            {
+                "Function": stats.function,
+                "Max concurrency": stats.max_concurrency,
+                "In flight": stats.in_flight,
+                "Queued": stats.queued,
+                "Calls": stats.calls,
+                "Rejections": stats.rejections,
+                "Timeouts": stats.timeouts,
+                "Wait p50 (s)": stats.wait_time.quantile(0.5),
+                "Wait p95 (s)": stats.wait_time.quantile(0.95),
+                "Run p50 (s)": stats.run_time.quantile(0.5),
+                "Run p95 (s)": stats.run_time.quantile(0.95),
+            }
+            for stats in all_stats
+        ],
+        hide_index=True,
+    )
+
+
 def example() -> None:
     @concurrency_limiter(max_concurrency=1)  # type: ignore[arg-type]
     def heavy_computation() -> int:
@@ -138,10 +1395,399 @@ def example() -> None:
         heavy_computation()
 
 
+def example_stats_panel() -> None:
+    limiter_stats_panel()
+
+
 __title__ = "Concurrency limiter "
 __desc__ = """This decorator limit function execution concurrency with max_concurrency param."""
 __icon__ = "🚦"
-__examples__ = [example]
+__examples__ = {
+    example: [concurrency_limiter],
+    example_stats_panel: [limiter_stats_panel],
+}
 __author__ = "Karen Javadyan"
 __created_at__ = date(2024, 3, 22)
 __experimental_playground__ = False
+
+
+def test_queued_semaphore_order() -> None:
+    semaphore = QueuedSemaphore(1)
+    holder = semaphore.enqueue()
+    assert holder.event.is_set()
+
+    first = semaphore.enqueue()
+    second = semaphore.enqueue()
+    urgent = semaphore.enqueue(priority=-1)
+    assert [semaphore.position(w) for w in (urgent, first, second)] == [1, 2, 3]
+
+    # Each release hands the slot to exactly one waiter, by priority then FIFO
+    semaphore.release()
+    assert urgent.event.is_set()
+    assert not first.event.is_set()
+    assert not second.event.is_set()
+    semaphore.release()
+    assert first.event.is_set()
+    assert semaphore.position(second) == 1
+
+    # A waiter that was already granted its slot can't cancel it
+    assert semaphore.cancel(second)
+    assert not semaphore.cancel(first)
+    assert semaphore.waiting == 0
+
+
+def test_concurrency_limiter_timeout() -> None:
+    started = Event()
+    finish = Event()
+
+    @concurrency_limiter(max_concurrency=1, show_spinner=False, timeout=0.2)  # type: ignore[arg-type]
+    def limited(block: bool) -> str:
+        if block:
+            started.set()
+            finish.wait()
+        return "done"
+
+    blocker = threading.Thread(target=limited, args=(True,))
+    blocker.start()
+    started.wait()
+    try:
+        limited(False)
+    except TimeoutError:
+        pass
+    else:
+        raise AssertionError("Expected the queued call to time out")
+    finally:
+        finish.set()
+        blocker.join()
+
+    # The timed out call left the queue, so the slot is free again
+    assert limited(False) == "done"
+
+
+def test_timeout_covers_all_waits() -> None:
+    started = Event()
+    finish = Event()
+
+    # The second call waits 0.4s for a token, then for the slot held by the first one
+    @concurrency_limiter(max_concurrency=1, show_spinner=False, timeout=0.6, rate_limit=2.5, burst=1)  # type: ignore[arg-type]
+    def limited(block: bool) -> None:
+        if block:
+            started.set()
+            finish.wait()
+
+    blocker = threading.Thread(target=limited, args=(True,))
+    blocker.start()
+    started.wait()
+    start = time.monotonic()
+    try:
+        limited(False)
+    except TimeoutError:
+        pass
+    else:
+        raise AssertionError("Expected the call to time out")
+    finally:
+        finish.set()
+        blocker.join()
+    # Each wait used to get the full timeout, i.e. 0.4s + 0.6s here
+    assert time.monotonic() - start < 0.85
+
+
+def test_stopped_script_run_leaves_queue() -> None:
+    from unittest import mock
+
+    from streamlit.runtime.scriptrunner_utils.script_requests import ScriptRequests
+
+    semaphore = QueuedSemaphore(1)
+    semaphore.enqueue()
+    waiter = semaphore.enqueue()
+
+    requests = ScriptRequests()
+    requests.request_stop()
+    fake_ctx = mock.MagicMock(script_requests=requests)
+    with mock.patch("streamlit_extras.concurrency_limiter.get_script_run_ctx", return_value=fake_ctx):
+        try:
+            _wait_for_slot(semaphore, waiter, "limited", deadline=None, show_spinner=False)
+        except StopException:
+            pass
+        else:
+            raise AssertionError("Expected the stopped script run to leave the queue")
+    assert semaphore.waiting == 0
+
+
+def test_coalesced_calls_share_result() -> None:
+    calls: Counter = Counter()
+    release = Event()
+
+    @concurrency_limiter(max_concurrency=2, show_spinner=False, coalesce=True, result_ttl=60)  # type: ignore[arg-type]
+    def inference(prompt: str) -> str:
+        calls.update([prompt])
+        release.wait()
+        return prompt.upper()
+
+    results: list[str] = []
+    threads = [threading.Thread(target=lambda: results.append(inference("hello"))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    # Wait until the leader is running and the others have joined its flight
+    while not calls:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["HELLO"] * 5
+    # Reused from the cached result, different arguments run again
+    assert inference("hello") == "HELLO"
+    assert inference("bye") == "BYE"
+    assert calls == Counter({"hello": 1, "bye": 1})
+
+
+def test_token_bucket() -> None:
+    bucket = TokenBucket(rate=10, capacity=2)
+    now = time.monotonic()
+    assert bucket.try_acquire(now) == 0
+    assert bucket.try_acquire(now) == 0
+    assert 0 < bucket.try_acquire(now) <= 0.1
+    assert bucket.try_acquire(now + 0.11) == 0
+    assert bucket.is_full(now + 1)
+
+
+def test_rate_limit_reject() -> None:
+    @concurrency_limiter(max_concurrency=5, show_spinner=False, rate_limit=0.5, on_rate_limit="reject")  # type: ignore[arg-type]
+    def call_api() -> str:
+        return "ok"
+
+    assert call_api() == "ok"
+    throttled: Any = call_api()
+    assert isinstance(throttled, Throttled)
+    assert not throttled
+    assert 0 < throttled.retry_after <= 2
+
+
+def test_rate_limit_before_coalescing() -> None:
+    from unittest import mock
+
+    @concurrency_limiter(  # type: ignore[arg-type]
+        max_concurrency=2, show_spinner=False, coalesce=True, rate_limit=1, burst=1, rate_limit_scope="session"
+    )
+    def shared(prompt: str) -> str:
+        return prompt
+
+    elapsed: dict[str, float] = {}
+
+    def call(session: str) -> None:
+        start = time.monotonic()
+        shared("hello")
+        elapsed[session] = time.monotonic() - start
+
+    # Each thread plays a session, "a" has used up its rate limit and "b" hasn't
+    with mock.patch(f"{__name__}._get_rate_limit_scope", side_effect=lambda _: threading.current_thread().name):
+        first = threading.Thread(target=shared, args=("warmup",), name="a")
+        first.start()
+        first.join()
+        session_a = threading.Thread(target=call, args=("a",), name="a")
+        session_b = threading.Thread(target=call, args=("b",), name="b")
+        session_a.start()
+        time.sleep(0.1)
+        session_b.start()
+        for thread in (session_a, session_b):
+            thread.join()
+    # "b" doesn't wait for the rate limit of "a"
+    assert elapsed["b"] < 0.5 < elapsed["a"]
+
+    def rejects(**options: Any) -> bool:
+        try:
+            concurrency_limiter(**options)
+        except ValueError:
+            return True
+        return False
+
+    assert rejects(rate_limit=0)
+    assert rejects(rate_limit=-1)
+    assert rejects(rate_limit=1, burst=0)
+
+
+def test_thread_executor() -> None:
+    gate = Event()
+    order: list[str] = []
+    ranks = {"low": 2, "high": 1}
+
+    @concurrency_limiter(  # type: ignore[arg-type]
+        max_concurrency=1, show_spinner=False, executor="thread", priority=lambda name: ranks.get(name, 0)
+    )
+    def job(name: str) -> str:
+        gate.wait(5)
+        order.append(name)
+        return name
+
+    first: Any = job("first")
+    while first.position:
+        time.sleep(0.01)
+    low: Any = job("low")
+    high: Any = job("high")
+    assert (high.position, low.position) == (1, 2)
+
+    gate.set()
+    assert [future.result(timeout=5) for future in (first, low, high)] == ["first", "low", "high"]
+    assert order == ["first", "high", "low"]
+
+
+def test_process_executor() -> None:
+    limit: Any = concurrency_limiter(max_concurrency=2, show_spinner=False, executor="process")
+    dedent = limit(textwrap.dedent)
+    futures = [dedent(f"  {i}\n  x") for i in range(3)]
+    assert [future.result(timeout=60) for future in futures] == [f"{i}\nx" for i in range(3)]
+
+    def local() -> None:
+        pass
+
+    try:
+        concurrency_limiter(local, executor="process")
+    except StreamlitAPIException:
+        pass
+    else:
+        raise AssertionError("Expected functions defined in a function to be rejected")
+
+
+def test_limiter_stats() -> None:
+    @concurrency_limiter(max_concurrency=3, show_spinner=False, rate_limit=0.5, burst=2, on_rate_limit="reject")  # type: ignore[arg-type]
+    def measured() -> None:
+        time.sleep(0.02)
+
+    for _ in range(3):
+        measured()
+
+    (stats,) = [
+        stats for stats in get_limiter_stats() if stats.function.endswith("test_limiter_stats.<locals>.measured")
+    ]
+    assert (stats.max_concurrency, stats.in_flight, stats.queued) == (3, 0, 0)
+    assert (stats.calls, stats.rejections, stats.timeouts) == (2, 1, 0)
+    assert stats.run_time.count == 2
+    assert 0.02 <= stats.run_time.sum < 1
+    assert stats.run_time.quantile(0.5) == _HISTOGRAM_BOUNDS[1]
+
+    text = limiter_metrics_text()
+    label = f'function="{stats.function}"'
+    assert f"streamlit_concurrency_limiter_calls_total{{{label}}} 2" in text
+    assert f"streamlit_concurrency_limiter_rejections_total{{{label}}} 1" in text
+    assert f'streamlit_concurrency_limiter_run_seconds_bucket{{{label},le="+Inf"}} 2' in text
+
+
+def test_function_versions() -> None:
+    def versioned() -> int:
+        return 1
+
+    first_key = _make_function_key(versioned, 1)
+    assert _make_function_key(versioned, 1) == first_key
+    assert _make_function_key(versioned, 2) != first_key
+    concurrency_limiter(versioned, show_spinner=False)
+    assert first_key in CONCURRENCY_MAP
+
+    # Editing the function during development replaces its entry
+    def versioned() -> int:  # type: ignore[no-redef]
+        return 2
+
+    second_key = _make_function_key(versioned, 1)
+    assert second_key != first_key
+    concurrency_limiter(versioned, show_spinner=False)
+    assert second_key in CONCURRENCY_MAP
+    assert first_key not in CONCURRENCY_MAP
+    assert first_key not in _FUNCTION_KEYS.values()
+    assert first_key not in _FUNCTION_MEMO_KEYS
+
+    # Versions are only evicted once none of their wrappers can be called anymore
+    def versioned() -> int:  # type: ignore[no-redef]
+        return 3
+
+    third_key = _make_function_key(versioned, 2)
+    third: Any = concurrency_limiter(versioned, max_concurrency=2, show_spinner=False, executor="thread")
+    concurrency_limiter(versioned, show_spinner=False)
+    assert third_key in CONCURRENCY_MAP
+    assert third().result(timeout=5) == 3
+    del third
+    gc.collect()
+    concurrency_limiter(versioned, show_spinner=False)
+    assert third_key not in CONCURRENCY_MAP
+
+
+def test_function_key_ignores_file_path() -> None:
+    source = "def limited(name):\n    return name in {'a', 'b', 'c'}\n"
+    keys = set()
+    for path in ("/srv/replica-a/app.py", "/srv/replica-b/app.py"):
+        namespace: dict[str, Any] = {"__name__": "app"}
+        exec(compile(source, path, "exec"), namespace)  # noqa: S102
+        keys.add(_make_function_key(namespace["limited"], 1))
+    assert len(keys) == 1
+
+
+def _check_backend_limits(backend: LimiterBackend) -> None:
+    first = backend.try_acquire("key", 2)
+    second = backend.try_acquire("key", 2)
+    assert first is not None
+    assert second is not None
+    assert backend.try_acquire("key", 2) is None
+    other = backend.try_acquire("other", 2)
+    assert other is not None
+
+    backend.release("key", first)
+    third = backend.try_acquire("key", 2)
+    assert third is not None
+    for lease in (second, third):
+        backend.release("key", lease)
+    backend.release("other", other)
+
+
+def test_file_lock_backend() -> None:
+    if sys.platform == "win32":
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        _check_backend_limits(FileLockBackend(directory))
+
+
+def test_sqlite_lease_backend() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "leases.sqlite"
+        _check_backend_limits(SQLiteLeaseBackend(path))
+
+        # Leases of a replica that stopped heartbeating expire
+        crashed = SQLiteLeaseBackend(path, lease_ttl=0.05, heartbeat_interval=60)
+        assert crashed.try_acquire("key", 1) is not None
+        replica = SQLiteLeaseBackend(path)
+        assert replica.try_acquire("key", 1) is None
+        time.sleep(0.1)
+        lease = replica.try_acquire("key", 1)
+        assert lease is not None
+        replica.release("key", lease)
+
+        # An expired lease is claimed again while its slot is free, and lost once it's taken
+        lease = crashed.try_acquire("key", 1)
+        assert lease is not None
+        time.sleep(0.1)
+        with crashed._connect() as connection:
+            assert crashed._renew_lease(connection, lease, "key", 1)
+            assert replica.try_acquire("key", 1) is None
+            time.sleep(0.1)
+            other = replica.try_acquire("key", 1)
+            assert other is not None
+            assert not crashed._renew_lease(connection, lease, "key", 1)
+        replica.release("key", other)
+        crashed.release("key", lease)
+
+
+__tests__ = [
+    test_queued_semaphore_order,
+    test_concurrency_limiter_timeout,
+    test_timeout_covers_all_waits,
+    test_stopped_script_run_leaves_queue,
+    test_coalesced_calls_share_result,
+    test_token_bucket,
+    test_rate_limit_reject,
+    test_rate_limit_before_coalescing,
+    test_thread_executor,
+    test_limiter_stats,
+    test_function_versions,
+    test_function_key_ignores_file_path,
+    test_process_executor,
+    test_file_lock_backend,
+    test_sqlite_lease_backend,
+]
@@ -13,16 +13,16 @@ from typing import Literal, cast
 from urllib.parse import quote
 
 import streamlit as st
-import streamlit.components.v2
 from streamlit.errors import StreamlitAPIException
 
 from streamlit_extras import extra
+from streamlit_extras._component_utils import lazy_component
 
 _MAX_COOKIE_SIZE_BYTES = 4096
 _VALID_SAMESITE_VALUES = {"strict", "lax", "none"}
 
 
-_COOKIE_MANAGER_COMPONENT = st.components.v2.component(
+_COOKIE_MANAGER_COMPONENT = lazy_component(
     name="streamlit_extras.cookie_manager",
     html="<div aria-hidden='true'></div>",
     js="""
@@ -1,17 +1,16 @@
+from __future__ import annotations
+
 import contextlib
 from datetime import date
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-import pandas as pd
 import streamlit as st
-from pandas.api.types import (
-    is_datetime64_any_dtype,
-    is_numeric_dtype,
-    is_object_dtype,
-)
 
 from .. import extra
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 @extra
 def dataframe_explorer(df: pd.DataFrame, case: bool = True) -> pd.DataFrame:
@@ -25,6 +24,13 @@ def dataframe_explorer(df: pd.DataFrame, case: bool = True) -> pd.DataFrame:
     Returns:
         pd.DataFrame: Filtered dataframe
     """
+    # pandas is slow to import, so it is only imported once the extra is used
+    import pandas as pd
+    from pandas.api.types import (
+        is_datetime64_any_dtype,
+        is_numeric_dtype,
+        is_object_dtype,
+    )
 
     random_key_base = pd.util.hash_pandas_object(df)
 
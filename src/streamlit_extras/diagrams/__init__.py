@@ -1,16 +1,22 @@
 from __future__ import annotations
 
 import base64
+import hashlib
+import os
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import date
+from functools import cache, lru_cache
 from io import BytesIO
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Literal
 
 import streamlit as st
-import streamlit.components.v2
 
 from .. import extra
+from .._component_utils import lazy_component
 
 if TYPE_CHECKING:
     from diagrams import Diagram as DiagramType
@@ -23,7 +29,19 @@ _DARK_COLOR_MAP = {
     "#7B8894": "#A3ABB5",
 }
 
-_DIAGRAM_COMPONENT = st.components.v2.component(
+# All dark mode colors are swapped in a single pass over the text
+_DARK_COLOR_RE = re.compile("|".join(re.escape(color) for color in _DARK_COLOR_MAP), re.IGNORECASE)
+_DARK_COLOR_LOOKUP = {color.lower(): replacement for color, replacement in _DARK_COLOR_MAP.items()}
+
+# Graphviz output keyed by (hash of the DOT source, engine, format), and final SVG
+# markup keyed by (hash of the DOT source, engine, dark). The dark SVG is derived
+# from the light render, so toggling the theme doesn't re-invoke Graphviz.
+_RENDER_CACHE_SIZE = 64
+_RENDER_CACHE: OrderedDict[tuple[str, str, str], bytes] = OrderedDict()
+_SVG_CACHE: OrderedDict[tuple[str, str, bool, tuple[tuple[str, int], ...]], str] = OrderedDict()
+_RENDER_CACHE_LOCK = threading.Lock()
+
+_DIAGRAM_COMPONENT = lazy_component(
     name="streamlit_extras.diagram",
     html="""
     <style>
@@ -112,6 +130,23 @@ _DIAGRAM_COMPONENT = st.components.v2.component(
 )
 
 _IMAGE_HREF_RE = re.compile(r'xlink:href="([^"]+)"')
+_IMAGE_ATTR_RE = re.compile(r'\bimage\s*=\s*(?:"((?:[^"\\]|\\.)*)"|([^\s,;\]]+))')
+
+
+@lru_cache(maxsize=256)
+def _icon_data_uri(path: str, mtime_ns: int) -> str:  # noqa: ARG001
+    """Base64-encode an icon as a data URI.
+
+    The modification time is only part of the cache key, so that an icon
+    is re-read when it changes on disk.
+
+    Returns:
+        The ``data:`` URI of the icon.
+    """
+    p = Path(path)
+    b64 = base64.b64encode(p.read_bytes()).decode()
+    suffix = p.suffix.lstrip(".")
+    return f"data:image/{suffix};base64,{b64}"
 
 
 def _inline_images(svg: str) -> str:
@@ -119,17 +154,108 @@ def _inline_images(svg: str) -> str:
         href = match.group(1)
         if href.startswith("data:"):
             return match.group(0)
-        p = Path(href)
-        if p.exists():
-            b64 = base64.b64encode(p.read_bytes()).decode()
-            suffix = p.suffix.lstrip(".")
-            mime = f"image/{suffix}"
-            return f'xlink:href="data:{mime};base64,{b64}"'
-        return match.group(0)
+        try:
+            mtime_ns = Path(href).stat().st_mtime_ns
+        except OSError:
+            return match.group(0)
+        return f'xlink:href="{_icon_data_uri(href, mtime_ns)}"'
 
     return _IMAGE_HREF_RE.sub(_replacer, svg)
 
 
+def _icon_versions(source: str) -> tuple[tuple[str, int], ...]:
+    """Return the modification time of each icon used by a DOT source.
+
+    They are part of the SVG cache key, since icons are inlined into the cached SVG.
+
+    Returns:
+        Tuple of (icon path, mtime_ns), with -1 for icons that can't be read.
+    """
+    versions = []
+    for quoted, bare in _IMAGE_ATTR_RE.findall(source):
+        path = quoted or bare
+        try:
+            mtime_ns = Path(path).stat().st_mtime_ns
+        except OSError:
+            mtime_ns = -1
+        versions.append((path, mtime_ns))
+    return tuple(versions)
+
+
+def _cache_get(cache: OrderedDict[Any, Any], key: Any) -> Any:
+    with _RENDER_CACHE_LOCK:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+
+def _cache_put(cache: OrderedDict[Any, Any], key: Any, value: Any) -> None:
+    with _RENDER_CACHE_LOCK:
+        cache[key] = value
+        while len(cache) > _RENDER_CACHE_SIZE:
+            cache.popitem(last=False)
+
+
+def _source_digest(source: str) -> str:
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def _pipe(engine: str, source: str, format: str) -> bytes:
+    """Render a DOT source with Graphviz, reusing previous renders of the same source.
+
+    Safe to call from worker threads.
+
+    Returns:
+        The rendered diagram.
+    """
+    import graphviz
+
+    cache_key = (_source_digest(source), engine, format)
+    raw: bytes | None = _cache_get(_RENDER_CACHE, cache_key)
+    if raw is None:
+        raw = graphviz.pipe(engine, format, source.encode("utf-8"))
+        _cache_put(_RENDER_CACHE, cache_key, raw)
+    return raw
+
+
+def _render(engine: str, source: str, format: Literal["svg", "png"], dark: bool) -> str | bytes:
+    """Render a DOT source for the given theme.
+
+    SVG output is rendered once and recolored for dark mode, PNG output
+    can't be recolored, so its colors are swapped in the DOT source instead.
+
+    Safe to call from worker threads.
+
+    Returns:
+        The SVG markup with inlined images, or the PNG bytes.
+    """
+    if format == "png":
+        return _pipe(engine, _swap_colors(source) if dark else source, format)
+
+    cache_key = (_source_digest(source), engine, dark, _icon_versions(source))
+    svg: str | None = _cache_get(_SVG_CACHE, cache_key)
+    if svg is None:
+        svg = _pipe(engine, source, format).decode("utf-8")
+        if dark:
+            svg = _swap_colors(svg)
+        svg = _inline_images(svg)
+        _cache_put(_SVG_CACHE, cache_key, svg)
+    return svg
+
+
+@cache
+def _get_executor() -> ThreadPoolExecutor:
+    """Lazily create the pool used to render diagrams concurrently.
+
+    Graphviz runs in a subprocess, so threads are enough to render in parallel.
+
+    Returns:
+        The shared thread pool.
+    """
+    return ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix="st_diagram")
+
+
 def _is_dark_mode() -> bool:
     try:
         theme = st.context.theme
@@ -141,9 +267,7 @@ def _is_dark_mode() -> bool:
 
 
 def _swap_colors(text: str) -> str:
-    for old, new in _DARK_COLOR_MAP.items():
-        text = re.sub(re.escape(old), new, text, flags=re.IGNORECASE)
-    return text
+    return _DARK_COLOR_RE.sub(lambda match: _DARK_COLOR_LOOKUP[match.group(0).lower()], text)
 
 
 def StreamlitNode(label: str = "Streamlit", **kwargs: object) -> Any:  # noqa: N802
@@ -164,6 +288,39 @@ def StreamlitNode(label: str = "Streamlit", **kwargs: object) -> Any:  # noqa: N
     return Custom(label, _STREAMLIT_ICON_PATH, **kwargs)
 
 
+def _diagram_source(diagram: DiagramType) -> tuple[str, str]:
+    """Build the DOT source to render for a diagram, with a transparent background.
+
+    Returns:
+        Tuple of (layout engine, DOT source).
+    """
+    # Work on a copy so the user's diagram is left untouched
+    dot = diagram.dot.copy()
+    dot.graph_attr["bgcolor"] = "transparent"
+    return dot.engine, dot.source
+
+
+def prerender_diagrams(*diagrams: DiagramType, format: Literal["svg", "png"] = "svg") -> None:
+    """Render several diagrams concurrently ahead of displaying them.
+
+    Graphviz renders are cached, so calling this at the top of a page with
+    many diagrams lets the following ``st_diagram`` calls display them
+    without waiting on each render in turn.
+
+    Args:
+        *diagrams: ``diagrams.Diagram`` objects to render.
+        format: Output format the diagrams will be displayed with.
+    """
+    dark = _is_dark_mode()
+    sources = [_diagram_source(diagram) for diagram in diagrams]
+    executor = _get_executor()
+    futures = [executor.submit(_render, engine, source, format, dark) for engine, source in sources]
+    wait(futures)
+    # Surface rendering errors (e.g. Graphviz not installed) to the caller
+    for future in futures:
+        future.result()
+
+
 @extra
 def st_diagram(
     diagram: DiagramType,
@@ -184,42 +341,13 @@ def st_diagram(
             a fixed pixel width.
         caption: Optional caption displayed below the diagram.
     """
-    dot = diagram.dot
-    dark = _is_dark_mode()
-
-    saved_graph = dict(dot.graph_attr)
-    saved_node = dict(dot.node_attr)
-    saved_edge = dict(dot.edge_attr)
-    saved_body = list(dot.body)
-
-    dot.graph_attr["bgcolor"] = "transparent"
-
-    if dark:
-        for key in ("fontcolor",):
-            if key in dot.graph_attr:
-                dot.graph_attr[key] = _swap_colors(dot.graph_attr[key])
-            if key in dot.node_attr:
-                dot.node_attr[key] = _swap_colors(dot.node_attr[key])
-        for key in ("color", "fontcolor"):
-            if key in dot.edge_attr:
-                dot.edge_attr[key] = _swap_colors(dot.edge_attr[key])
-        dot.body[:] = [_swap_colors(line) for line in dot.body]
+    engine, source = _diagram_source(diagram)
+    rendered = _render(engine, source, format, _is_dark_mode())
 
-    try:
-        raw = dot.pipe(format=format)
-    finally:
-        dot.graph_attr.clear()
-        dot.graph_attr.update(saved_graph)
-        dot.node_attr.clear()
-        dot.node_attr.update(saved_node)
-        dot.edge_attr.clear()
-        dot.edge_attr.update(saved_edge)
-        dot.body[:] = saved_body
-
-    if format == "png":
+    if isinstance(rendered, bytes):
         from PIL import Image
 
-        img = Image.open(BytesIO(raw))
+        img = Image.open(BytesIO(rendered))
         use_cw = width == "stretch"
         kw: dict[str, object] = {"caption": caption, "use_container_width": use_cw}
         if isinstance(width, int):
@@ -227,12 +355,9 @@ def st_diagram(
         st.image(img, **kw)  # type: ignore[arg-type]
         return
 
-    svg_str = raw.decode("utf-8")
-    svg_str = _inline_images(svg_str)
-
     component_width = width if isinstance(width, str) else "content"
     _DIAGRAM_COMPONENT(
-        data={"svg": svg_str, "width": width, "caption": caption or ""},
+        data={"svg": rendered, "width": width, "caption": caption or ""},
         width=component_width,
     )
 
@@ -270,3 +395,73 @@ __examples__ = [example]
 __author__ = "Arnaud Miribel"
 __created_at__ = date(2026, 3, 27)
 __github_repo__ = "https://github.com/mingrammer/diagrams"
+
+
+def _test_pipe_is_cached() -> None:
+    from unittest import mock
+
+    try:
+        import graphviz
+    except ImportError:
+        return
+
+    # Only the underlying Digraph is needed, and building a real Diagram requires Graphviz
+    dot = graphviz.Digraph("Cached")
+    dot.node("frontend", "Frontend", fontcolor="#2D3436")
+    diag: Any = mock.MagicMock(dot=dot)
+
+    _RENDER_CACHE.clear()
+    _SVG_CACHE.clear()
+    light_svg = b'<svg><text fill="#2d3436">Frontend</text><path stroke="#7B8894"/></svg>'
+    with mock.patch("graphviz.pipe", return_value=light_svg) as fake_pipe:
+        prerender_diagrams(diag)
+        engine, source = _diagram_source(diag)
+        assert _render(engine, source, "svg", dark=False) == light_svg.decode()
+        # The dark variant is recolored from the cached light render
+        assert _render(engine, source, "svg", dark=True) == (
+            '<svg><text fill="#F0F2F6">Frontend</text><path stroke="#A3ABB5"/></svg>'
+        )
+        assert fake_pipe.call_count == 1
+        # The diagram itself is left untouched
+        assert "bgcolor" not in dot.graph_attr
+
+
+def _test_swap_colors() -> None:
+    assert _swap_colors('color="#2d3436" fontcolor="#7B8894" fill="#000000"') == (
+        'color="#F0F2F6" fontcolor="#A3ABB5" fill="#000000"'
+    )
+
+
+def _test_inline_images() -> None:
+    svg = f'<image xlink:href="{_STREAMLIT_ICON_PATH}"/><image xlink:href="missing.png"/>'
+    inlined = _inline_images(svg)
+    assert 'xlink:href="data:image/png;base64,' in inlined
+    assert 'xlink:href="missing.png"' in inlined
+    assert _inline_images(svg) == inlined
+
+
+def _test_svg_cache_tracks_icons() -> None:
+    import os
+    import tempfile
+    from unittest import mock
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        icon = Path(tmp_dir) / "icon.png"
+        icon.write_bytes(b"first")
+        source = f'digraph {{ a [image="{icon}" label=""] }}'
+        svg = f'<svg><image xlink:href="{icon}"/></svg>'.encode()
+
+        _SVG_CACHE.clear()
+        with mock.patch(f"{__name__}._pipe", return_value=svg):
+            first = _render("dot", source, "svg", dark=False)
+            assert _render("dot", source, "svg", dark=False) is first
+
+            # The inlined icon is refreshed once the file changes on disk
+            icon.write_bytes(b"second")
+            os.utime(icon, ns=(icon.stat().st_atime_ns, icon.stat().st_mtime_ns + 1_000_000_000))
+            second = _render("dot", source, "svg", dark=False)
+        assert base64.b64encode(b"first").decode() in first
+        assert base64.b64encode(b"second").decode() in second
+
+
+__tests__ = [_test_pipe_is_cached, _test_swap_colors, _test_inline_images, _test_svg_cache_tracks_icons]
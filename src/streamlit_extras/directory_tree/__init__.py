@@ -7,33 +7,25 @@ client-side (no reruns). Selection can optionally trigger a rerun.
 
 from collections.abc import Callable
 from datetime import date
-from functools import cache
 from typing import Any, Literal
 
 import streamlit as st
-import streamlit.components.v2
 import streamlit.errors
 
 from streamlit_extras import extra
+from streamlit_extras._component_utils import lazy_component
 
 
 def _on_select_change() -> None:
     """Callback function for when a node is selected."""
 
 
-@cache
-def _get_component() -> Any:
-    """Lazily initialize the CCv2 component.
-
-    Returns:
-        The component callable.
-    """
-    return streamlit.components.v2.component(
-        "streamlit-extras.directory_tree",
-        js="index-*.js",
-        html='<div class="react-root"></div>',
-        isolate_styles=False,
-    )
+_COMPONENT = lazy_component(
+    "streamlit-extras.directory_tree",
+    js="index-*.js",
+    html='<div class="react-root"></div>',
+    isolate_styles=False,
+)
 
 
 @extra
@@ -103,8 +95,6 @@ def directory_tree(
     else:
         expand_depth = int(expanded)
 
-    component = _get_component()
-
     data = {
         "tree": tree,
         "expand_depth": expand_depth,
@@ -115,7 +105,7 @@ def directory_tree(
     }
 
     if on_select == "rerun":
-        result = component(
+        result = _COMPONENT(
             key=key,
             data=data,
             default={"selected": ""},
@@ -124,7 +114,7 @@ def directory_tree(
         selected: str = result.get("selected", "")
         return selected or None
 
-    component(key=key, data=data)
+    _COMPONENT(key=key, data=data)
     return None
 
 
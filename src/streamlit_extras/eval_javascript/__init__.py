@@ -8,11 +8,11 @@ from datetime import date
 from typing import Any
 
 import streamlit as st
-import streamlit.components.v2
 
 from streamlit_extras import extra
+from streamlit_extras._component_utils import lazy_component
 
-_JAVASCRIPT_EVAL_COMPONENT = st.components.v2.component(
+_JAVASCRIPT_EVAL_COMPONENT = lazy_component(
     name="streamlit_extras.eval_javascript",
     html="<div aria-hidden='true'></div>",
     js="""
@@ -3,7 +3,6 @@ from collections.abc import Callable
 from datetime import date
 from typing import Any, get_args
 
-import pandas as pd
 import streamlit as st
 
 from .. import extra
@@ -34,6 +33,8 @@ def function_explorer(func: Callable[..., Any]) -> None:
     Raises:
         Exception: If a type hint is encountered that is not supported.
     """
+    # pandas is slow to import, so it is only imported once the extra is used
+    import pandas as pd
 
     args = get_arg_details(func)
     inputs: dict[str, Any] = {}
@@ -4,9 +4,9 @@ from datetime import date
 from typing import TYPE_CHECKING, Literal
 
 import streamlit as st
-import streamlit.components.v2
 
 from .. import extra
+from .._component_utils import lazy_component
 
 if TYPE_CHECKING:
     from great_tables import GT
@@ -157,7 +157,7 @@ export default function(component) {
 }
 """
 
-_GREAT_TABLES_COMPONENT = streamlit.components.v2.component(
+_GREAT_TABLES_COMPONENT = lazy_component(
     name="streamlit_extras.great_tables",
     html='<div id="gt-container"></div>',
     css=_THEME_CSS,
@@ -4,8 +4,6 @@ from collections.abc import Sequence
 from datetime import date
 from typing import TYPE_CHECKING, Any, Literal
 
-import numpy as np
-import pandas as pd
 import streamlit as st
 from streamlit.errors import StreamlitAPIException
 
@@ -108,6 +106,9 @@ def grid(
 
 
 def example() -> None:
+    import numpy as np
+    import pandas as pd
+
     random_df = pd.DataFrame(np.random.randn(20, 3), columns=["a", "b", "c"])
 
     my_grid = grid(2, [2, 4, 1], 1, 4, vertical_align="bottom")
@@ -8,17 +8,16 @@ and visual diffs.
 from __future__ import annotations
 
 from datetime import date
-from functools import cache
 from typing import TYPE_CHECKING, Any, Literal
 from uuid import uuid4
 
 import streamlit as st
-import streamlit.components.v2
 from streamlit.elements.lib.image_utils import image_to_url
 from streamlit.elements.lib.layout_utils import LayoutConfig
 from streamlit.errors import StreamlitAPIException
 
 from streamlit_extras import extra
+from streamlit_extras._component_utils import lazy_component
 
 if TYPE_CHECKING:
     from collections.abc import Callable
@@ -35,18 +34,11 @@ def _on_position_change() -> None:
     """Callback function for when the slider position changes."""
 
 
-@cache
-def _get_component() -> Any:
-    """Lazily initialize the CCv2 component.
-
-    Returns:
-        The component callable.
-    """
-    return streamlit.components.v2.component(
-        "streamlit-extras.image_compare_slider",
-        js="index-*.js",
-        html='<div class="react-root"></div>',
-    )
+_COMPONENT = lazy_component(
+    "streamlit-extras.image_compare_slider",
+    js="index-*.js",
+    html='<div class="react-root"></div>',
+)
 
 
 def _convert_image_to_url(image: ImageLike) -> str:
@@ -195,8 +187,7 @@ def image_compare_slider(
         else:  # on_change == "rerun"
             component_kwargs["on_position_change"] = _on_position_change
 
-    component = _get_component()
-    result = component(**component_kwargs)
+    result = _COMPONENT(**component_kwargs)
 
     # Return None when ignoring changes, otherwise return the position
     if on_change == "ignore":
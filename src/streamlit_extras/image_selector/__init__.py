@@ -1,24 +1,248 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import date
+from functools import cache
 from io import BytesIO
+from pathlib import Path
 from typing import TYPE_CHECKING, Any, Literal, cast
 
-import numpy as np
-import plotly.graph_objects as go
-import requests
 import streamlit as st
 from PIL import Image, ImageDraw
 
 from streamlit_extras import extra
 
 if TYPE_CHECKING:
+    import numpy as np
+    import requests
     from streamlit.elements.plotly_chart import PlotlyState
 
 
+# Remote images are fetched through a shared session and cached both in memory
+# (decoded) and on disk (raw bytes + validators), so reruns don't re-download them.
+_REQUEST_TIMEOUT_SECONDS = 10
+_REVALIDATE_AFTER_SECONDS = 60
+_MEMORY_CACHE_SIZE = 32
+# The disk cache lives in the user's own cache directory, least recently used images
+# are evicted once it holds more than _DISK_CACHE_MAX_BYTES
+_DISK_CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "streamlit_extras" / "image_selector"
+)
+_DISK_CACHE_MAX_BYTES = 256 * 1024 * 1024
+_DISK_CACHE_LOCK = threading.Lock()
+
+
+@dataclass
+class _CachedImage:
+    """A decoded image together with the HTTP validators used to revalidate it."""
+
+    image: Image.Image
+    etag: str | None = None
+    last_modified: str | None = None
+    checked_at: float = 0.0
+
+
+_MEMORY_CACHE: OrderedDict[str, _CachedImage] = OrderedDict()
+_MEMORY_CACHE_LOCK = threading.Lock()
+
+
+def _memory_cache_get(key: str) -> _CachedImage | None:
+    with _MEMORY_CACHE_LOCK:
+        entry = _MEMORY_CACHE.get(key)
+        if entry is not None:
+            _MEMORY_CACHE.move_to_end(key)
+        return entry
+
+
+def _memory_cache_put(key: str, entry: _CachedImage) -> None:
+    with _MEMORY_CACHE_LOCK:
+        _MEMORY_CACHE[key] = entry
+        _MEMORY_CACHE.move_to_end(key)
+        while len(_MEMORY_CACHE) > _MEMORY_CACHE_SIZE:
+            _MEMORY_CACHE.popitem(last=False)
+
+
+@cache
+def _get_session() -> requests.Session:
+    """Lazily create the shared HTTP session used to fetch remote images.
+
+    Returns:
+        A requests session with a pooled adapter mounted for http and https.
+    """
+    # numpy, plotly and requests are only imported once the extra is used, to keep imports fast
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=2)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _decode_image(data: bytes) -> Image.Image:
+    image = Image.open(BytesIO(data))
+    # Force decoding now so the cached image doesn't hold on to the buffer lazily
+    image.load()
+    return image
+
+
+def _disk_cache_paths(url: str) -> tuple[Path, Path]:
+    digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return _DISK_CACHE_DIR / f"{digest}.bin", _DISK_CACHE_DIR / f"{digest}.json"
+
+
+def _ensure_disk_cache_dir() -> bool:
+    """Create the disk cache directory, private to the current user.
+
+    Returns:
+        bool: Whether the directory can be trusted, i.e. it is owned by the current user and
+            nobody else can write to it.
+    """
+    try:
+        _DISK_CACHE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        dir_stat = _DISK_CACHE_DIR.stat()
+    except OSError:
+        return False
+    if not hasattr(os, "getuid"):
+        return True
+    return dir_stat.st_uid == os.getuid() and not dir_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def _evict_disk_cache() -> None:
+    """Remove the least recently used images until the disk cache fits in `_DISK_CACHE_MAX_BYTES`."""
+    entries = []
+    for data_path in _DISK_CACHE_DIR.glob("*.bin"):
+        try:
+            data_stat = data_path.stat()
+        except OSError:
+            continue
+        entries.append((data_stat.st_mtime_ns, data_stat.st_size, data_path))
+    total_bytes = sum(size for _, size, _ in entries)
+    for _, size, data_path in sorted(entries):
+        if total_bytes <= _DISK_CACHE_MAX_BYTES:
+            break
+        data_path.unlink(missing_ok=True)
+        data_path.with_suffix(".json").unlink(missing_ok=True)
+        total_bytes -= size
+
+
+def _read_disk_cache(url: str) -> _CachedImage | None:
+    data_path, meta_path = _disk_cache_paths(url)
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        image = _decode_image(data_path.read_bytes())
+        # The modification time tracks when an image was last used, for eviction
+        os.utime(data_path)
+    except Exception:
+        return None
+    # Entries read from disk are always revalidated before being trusted
+    return _CachedImage(image, etag=meta.get("etag"), last_modified=meta.get("last_modified"))
+
+
+def _write_disk_cache(url: str, content: bytes, etag: str | None, last_modified: str | None) -> None:
+    # Nothing to revalidate against, so there is no point in persisting the image
+    if etag is None and last_modified is None:
+        return
+    if len(content) > _DISK_CACHE_MAX_BYTES or not _ensure_disk_cache_dir():
+        return
+    data_path, meta_path = _disk_cache_paths(url)
+    meta = json.dumps({"etag": etag, "last_modified": last_modified}).encode("utf-8")
+    try:
+        with _DISK_CACHE_LOCK:
+            # Write through temporary files so readers never see a partial entry
+            for path, data in ((meta_path, meta), (data_path, content)):
+                fd, tmp_path = tempfile.mkstemp(dir=_DISK_CACHE_DIR)
+                with os.fdopen(fd, "wb") as tmp_file:
+                    tmp_file.write(data)
+                Path(tmp_path).replace(path)
+            _evict_disk_cache()
+    except OSError:
+        # The disk cache is best-effort, the in-memory cache still applies
+        pass
+
+
+def _fetch_remote_image(url: str) -> Image.Image:
+    """Fetch an image from a URL, reusing cached copies when the server allows it.
+
+    Cached images are served without any request for `_REVALIDATE_AFTER_SECONDS`,
+    after which they are revalidated with `If-None-Match` / `If-Modified-Since`.
+
+    Args:
+        url: The http(s) URL of the image.
+
+    Returns:
+        The decoded image.
+
+    Raises:
+        ValueError: If the image cannot be retrieved from the URL.
+    """
+    entry = _memory_cache_get(url) or _read_disk_cache(url)
+    now = time.monotonic()
+    if entry is not None and entry.checked_at and now - entry.checked_at < _REVALIDATE_AFTER_SECONDS:
+        return entry.image
+
+    headers = {}
+    if entry is not None:
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+    import requests
+
+    try:
+        response = _get_session().get(url, headers=headers, timeout=_REQUEST_TIMEOUT_SECONDS)
+    except requests.RequestException as exc:
+        raise ValueError("Could not retrieve image from URL.") from exc
+
+    if entry is not None and response.status_code == 304:
+        entry.checked_at = now
+        _memory_cache_put(url, entry)
+        return entry.image
+    if response.status_code != 200:
+        raise ValueError("Could not retrieve image from URL.")
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    image = _decode_image(response.content)
+    _memory_cache_put(url, _CachedImage(image, etag=etag, last_modified=last_modified, checked_at=now))
+    _write_disk_cache(url, response.content, etag, last_modified)
+    return image
+
+
+def _open_local_image(path: str) -> Image.Image:
+    """Open a local image, reusing the decoded copy while the file is unchanged.
+
+    Returns:
+        The decoded image.
+    """
+    resolved = Path(path).resolve()
+    stat = resolved.stat()
+    key = f"file://{resolved}:{stat.st_mtime_ns}:{stat.st_size}"
+    entry = _memory_cache_get(key)
+    if entry is None:
+        with Image.open(path) as image:
+            image.load()
+            entry = _CachedImage(image.copy())
+        _memory_cache_put(key, entry)
+    return entry.image
+
+
 def convert_to_pil_image(image: str | np.ndarray | Image.Image) -> Image.Image:
     """Convert an image from various sources to a PIL.Image object.
 
+    URLs and local files are cached, so the returned image may be shared
+    between reruns and should not be modified in place.
+
     Args:
         image (str | np.ndarray | Image.Image): The input image which can be a URL (str)
             pointing to the image, a local file path (str), a NumPy array (np.ndarray),
@@ -30,16 +254,14 @@ def convert_to_pil_image(image: str | np.ndarray | Image.Image) -> Image.Image:
     Raises:
         ValueError: If the input type is not supported or the image cannot be opened.
     """
+    import numpy as np
+
     pil_image: Image.Image
     if isinstance(image, str):
         if image.startswith(("http://", "https://")):
-            response = requests.get(image)
-            if response.status_code == 200:
-                pil_image = Image.open(BytesIO(response.content))
-            else:
-                raise ValueError("Could not retrieve image from URL.")
+            pil_image = _fetch_remote_image(image)
         else:
-            pil_image = Image.open(image)
+            pil_image = _open_local_image(image)
     elif isinstance(image, np.ndarray):
         pil_image = Image.fromarray(image)
     elif isinstance(image, Image.Image):
@@ -75,6 +297,8 @@ def image_selector(
         dict: Selection coordinates
     """
 
+    import plotly.graph_objects as go
+
     pil_image = convert_to_pil_image(image)
 
     fig = go.Figure().add_trace(go.Image(z=pil_image))
@@ -118,6 +342,8 @@ def show_selection(
         selection (PlotlyState): Selection coordinates, output of `image_selector`
     """
 
+    import numpy as np
+
     pil_image = convert_to_pil_image(image)
     image_array = np.array(pil_image)
 
@@ -156,6 +382,8 @@ def show_selection(
 
 
 def example() -> None:
+    import requests
+
     response = requests.get(
         "https://images.pexels.com/photos/45201/kitty-cat-kitten-pet-45201.jpeg?auto=compress&cs=tinysrgb&dpr=1&w=500"
     )
@@ -180,3 +408,117 @@ __author__ = "Arnaud Miribel"
 __created_at__ = date(2024, 8, 1)
 __experimental_playground__ = False
 __stlite__ = True
+
+
+# TESTS ---------------------------------------------------------------------------------
+
+
+def _serve_test_image() -> tuple[Any, list[int]]:
+    """Start a local HTTP server that serves a PNG with an ETag.
+
+    Returns:
+        The running server and the list of status codes it has responded with.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    buffer = BytesIO()
+    Image.new("RGB", (4, 4), "red").save(buffer, format="PNG")
+    body = buffer.getvalue()
+    statuses: list[int] = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.headers.get("If-None-Match") == '"v1"':
+                statuses.append(304)
+                self.send_response(304)
+                self.end_headers()
+                return
+            statuses.append(200)
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", '"v1"')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, statuses
+
+
+def test_remote_image_is_cached_and_revalidated() -> None:
+    global _DISK_CACHE_DIR  # noqa: PLW0603
+    server, statuses = _serve_test_image()
+    original_cache_dir = _DISK_CACHE_DIR
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            _DISK_CACHE_DIR = Path(tmp_dir)
+            url = f"http://127.0.0.1:{server.server_address[1]}/cat.png"
+
+            first = convert_to_pil_image(url)
+            assert first.size == (4, 4)
+            # Reruns within the revalidation window don't hit the server
+            assert convert_to_pil_image(url) is first
+            assert statuses == [200]
+
+            # Once stale, the cached copy is revalidated with its ETag
+            _MEMORY_CACHE[url].checked_at -= _REVALIDATE_AFTER_SECONDS
+            assert convert_to_pil_image(url) is first
+            assert statuses == [200, 304]
+
+            # A fresh process would start from the on-disk copy and only revalidate it
+            _MEMORY_CACHE.pop(url)
+            assert convert_to_pil_image(url).size == (4, 4)
+            assert statuses == [200, 304, 304]
+    finally:
+        _DISK_CACHE_DIR = original_cache_dir
+        server.shutdown()
+        server.server_close()
+
+
+def test_local_image_is_cached_until_modified() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = str(Path(tmp_dir) / "image.png")
+        Image.new("RGB", (2, 2), "blue").save(path)
+        first = convert_to_pil_image(path)
+        assert convert_to_pil_image(path) is first
+
+        Image.new("RGB", (3, 3), "blue").save(path)
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+        assert convert_to_pil_image(path).size == (3, 3)
+
+
+def test_disk_cache_evicts_least_recently_used() -> None:
+    global _DISK_CACHE_DIR, _DISK_CACHE_MAX_BYTES  # noqa: PLW0603
+    original_cache_dir, original_max_bytes = _DISK_CACHE_DIR, _DISK_CACHE_MAX_BYTES
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            _DISK_CACHE_DIR = Path(tmp_dir) / "cache"
+            _DISK_CACHE_MAX_BYTES = 250
+            image = BytesIO()
+            Image.new("RGB", (1, 1)).save(image, format="PNG")
+            content = image.getvalue().ljust(100, b"\0")
+            for url in ("http://a", "http://b"):
+                _write_disk_cache(url, content, '"v1"', None)
+            assert stat.S_IMODE(_DISK_CACHE_DIR.stat().st_mode) == 0o700
+
+            # Reading "a" makes "b" the least recently used image
+            data_path, _ = _disk_cache_paths("http://b")
+            os.utime(data_path, ns=(0, 0))
+            assert _read_disk_cache("http://a") is not None
+            _write_disk_cache("http://c", content, '"v1"', None)
+            assert _read_disk_cache("http://b") is None
+            assert _read_disk_cache("http://a") is not None
+            assert _read_disk_cache("http://c") is not None
+    finally:
+        _DISK_CACHE_DIR, _DISK_CACHE_MAX_BYTES = original_cache_dir, original_max_bytes
+
+
+__tests__ = [
+    test_remote_image_is_cached_and_revalidated,
+    test_disk_cache_evicts_least_recently_used,
+    test_local_image_is_cached_until_modified,
+]
@@ -5,31 +5,23 @@ Uses @microlink/react-json-view for rendering and editing JSON data.
 """
 
 from datetime import date
-from functools import cache
 from typing import Any, TypedDict, cast
 
 import streamlit as st
-import streamlit.components.v2
 
 from streamlit_extras import extra
+from streamlit_extras._component_utils import lazy_component
 
 
 def _on_data_change() -> None:
     """Callback function for when the JSON data changes in the frontend."""
 
 
-@cache
-def _get_component() -> Any:
-    """Lazily initialize the CCv2 component.
-
-    Returns:
-        The component callable.
-    """
-    return streamlit.components.v2.component(
-        "streamlit-extras.json_editor",
-        js="index-*.js",
-        html='<div class="react-root"></div>',
-    )
+_COMPONENT = lazy_component(
+    "streamlit-extras.json_editor",
+    js="index-*.js",
+    html='<div class="react-root"></div>',
+)
 
 
 class JsonEditorState(TypedDict):
@@ -100,10 +92,9 @@ def json_editor(
     else:
         parsed_data = data
 
-    component = _get_component()
     return cast(
         "JsonEditorState",
-        component(
+        _COMPONENT(
             key=key,
             data={
                 "json_data": parsed_data,
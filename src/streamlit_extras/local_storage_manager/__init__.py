@@ -17,17 +17,17 @@ from datetime import (
 from typing import Any
 
 import streamlit as st
-import streamlit.components.v2
 from streamlit.errors import StreamlitAPIException
 
 from streamlit_extras import extra
+from streamlit_extras._component_utils import lazy_component
 
 _MAX_VALUE_SIZE_BYTES = 1_000_000  # 1MB soft limit per value
 _STORAGE_PREFIX = "st_extras_"
 _EXPIRY_WRAPPER_KEY = "__st_expires_at__"
 
 
-_LOCAL_STORAGE_COMPONENT = st.components.v2.component(
+_LOCAL_STORAGE_COMPONENT = lazy_component(
     name="streamlit_extras.local_storage_manager",
     html="<div aria-hidden='true'></div>",
     js="""
@@ -6,32 +6,24 @@ prev/next arrows, and intelligent truncation for large page counts.
 
 from collections.abc import Callable
 from datetime import date
-from functools import cache
 from typing import Any, Literal
 
 import streamlit as st
-import streamlit.components.v2
 import streamlit.errors
 
 from streamlit_extras import extra
+from streamlit_extras._component_utils import lazy_component
 
 
 def _on_page_change() -> None:
     """Callback function for when the page changes in the frontend."""
 
 
-@cache
-def _get_component() -> Any:
-    """Lazily initialize the CCv2 component.
-
-    Returns:
-        The component callable.
-    """
-    return streamlit.components.v2.component(
-        "streamlit-extras.pagination",
-        js="index-*.js",
-        html='<div class="react-root"></div>',
-    )
+_COMPONENT = lazy_component(
+    "streamlit-extras.pagination",
+    js="index-*.js",
+    html='<div class="react-root"></div>',
+)
 
 
 @extra
@@ -100,8 +92,7 @@ def pagination(
 
         callback_fn = wrapped_callback
 
-    component = _get_component()
-    result = component(
+    result = _COMPONENT(
         key=key,
         data={
             "num_pages": num_pages,
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+from datetime import date
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
+from unittest import mock
+
+import streamlit as st
+from streamlit.runtime.scriptrunner_utils.script_run_context import get_script_run_ctx
+
+from streamlit_extras import _profiling, extra
+
+if TYPE_CHECKING:
+    from streamlit_extras._profiling import ExtraProfile
+
+
+def enable_profiling(trace_memory: bool = False) -> None:
+    """Start profiling the calls to all extras, for all sessions.
+
+    Call it at the top of your app, before the extras you want to profile.
+
+    Args:
+        trace_memory (bool, optional): Also record the Python memory allocated by each call,
+            with tracemalloc. Tracing slows down the whole app, not only the extras.
+            Defaults to False.
+    """
+    _profiling.enable(trace_memory=trace_memory)
+
+
+def disable_profiling() -> None:
+    """Stop profiling the calls to extras."""
+    _profiling.disable()
+
+
+def get_extras_profile() -> list[ExtraProfile]:
+    """Return what the extras called so far during this rerun cost, slowest first.
+
+    Calls to the same extra are aggregated: `calls`, `wall_time` (in seconds),
+    `deltas` (messages sent to the frontend) and `payload_bytes` (their serialized size)
+    are summed, `peak_memory_bytes` is the highest of the calls (0 unless memory is traced).
+    Context managers and generators are only measured while they are created.
+
+    Returns:
+        list[ExtraProfile]: The profile of each extra called during this rerun.
+    """
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return []
+    profiles = _profiling.get_run_profile(ctx).values()
+    return sorted(profiles, key=lambda profile: profile.wall_time, reverse=True)
+
+
+@extra
+def profiler_panel(sidebar: bool = True) -> None:
+    """Show what the extras called so far during this rerun cost, in a table.
+
+    Call it at the end of your app, after `enable_profiling`, to find which
+    extras make your page slow.
+
+    Args:
+        sidebar (bool, optional): Show the panel in the sidebar. Defaults to True.
+    """
+    container = st.sidebar if sidebar else st.container()
+    with container.expander("Extras profile", expanded=True):
+        if not _profiling.is_enabled():
+            st.info("Call `enable_profiling()` at the top of your app to profile extras.")
+            return
+        profiles = get_extras_profile()
+        if not profiles:
+            st.info("No extra has been called yet during this rerun.")
+            return
+        st.dataframe(
+            [
+                {
+                    "Extra": profile.name,
+                    "Calls": profile.calls,
+                    "Wall time (ms)": round(profile.wall_time * 1000, 2),
+                    "Peak memory (KiB)": round(profile.peak_memory_bytes / 1024, 1),
+                    "Deltas": profile.deltas,
+                    "Payload (KiB)": round(profile.payload_bytes / 1024, 1),
+                }
+                for profile in profiles
+            ],
+            hide_index=True,
+        )
+
+
+def example() -> None:
+    from streamlit_extras.badges import badge
+    from streamlit_extras.colored_header import colored_header
+
+    # Profiling applies to all sessions, and memory tracing slows down the whole app
+    enable_profiling(trace_memory=True)
+    try:
+        colored_header("Profiled page", description="Each extra call below is profiled", color_name="blue-70")
+        for _ in range(3):
+            badge("pypi", name="streamlit-extras")
+
+        profiler_panel(sidebar=False)
+    finally:
+        disable_profiling()
+
+
+__title__ = "Profiler"
+__desc__ = "Find which extras make your pages slow: wall time, memory, deltas and payload size per extra and rerun."
+__icon__ = "⏱️"
+__examples__ = [example]
+__author__ = "streamlit-extras"
+__created_at__ = date(2026, 10, 19)
+__playground__ = False
+
+
+class _FakeMessage:
+    def ByteSize(self) -> int:  # noqa: N802 - protobuf API
+        return 100
+
+
+def test_profiled_calls() -> None:
+    sent: list[_FakeMessage] = []
+    fake_ctx = SimpleNamespace(cursors={}, _enqueue=sent.append)
+
+    def render(messages: int) -> list[int]:
+        for _ in range(messages):
+            fake_ctx._enqueue(_FakeMessage())
+        return list(range(10_000))
+
+    profiled_render: Any = _profiling.profiled("test.render", render)
+    with (
+        mock.patch("streamlit_extras.profiler.get_script_run_ctx", return_value=fake_ctx),
+        mock.patch(
+            "streamlit.runtime.scriptrunner_utils.script_run_context.get_script_run_ctx",
+            return_value=fake_ctx,
+        ),
+    ):
+        # Calls aren't profiled until profiling is enabled
+        profiled_render(1)
+        assert get_extras_profile() == []
+
+        enable_profiling(trace_memory=True)
+        try:
+            profiled_render(2)
+            profiled_render(1)
+            (profile,) = get_extras_profile()
+        finally:
+            disable_profiling()
+
+        assert profile.name == "test.render"
+        assert profile.calls == 2
+        assert profile.deltas == 3
+        assert profile.payload_bytes == 300
+        assert profile.wall_time > 0
+        assert profile.peak_memory_bytes > 0
+        assert len(sent) == 4
+        # The session's enqueue function is only wrapped while profiled calls run
+        assert fake_ctx._enqueue == sent.append
+
+        # A rerun starts a new profile
+        fake_ctx.cursors = {}
+        assert get_extras_profile() == []
+
+
+__tests__ = [test_profiled_calls]
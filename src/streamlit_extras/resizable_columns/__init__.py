@@ -6,29 +6,25 @@ Column widths persist across reruns via component state.
 
 from collections.abc import Sequence
 from datetime import date
-from functools import cache
-from typing import Any
 
 import streamlit as st
-import streamlit.components.v2
 import streamlit.errors
 from streamlit.delta_generator import DeltaGenerator
 
 from streamlit_extras import extra
+from streamlit_extras._component_utils import lazy_component
 
 
 def _on_widths_change() -> None:
     pass
 
 
-@cache
-def _get_component() -> Any:
-    return streamlit.components.v2.component(
-        "streamlit-extras.resizable_columns",
-        js="index-*.js",
-        html='<div class="react-root"></div>',
-        isolate_styles=False,
-    )
+_COMPONENT = lazy_component(
+    "streamlit-extras.resizable_columns",
+    js="index-*.js",
+    html='<div class="react-root"></div>',
+    isolate_styles=False,
+)
 
 
 @extra
@@ -83,8 +79,7 @@ def resizable_columns(
 
     widths = [float(w) for w in stored_widths] if stored_widths and len(stored_widths) == n else initial_widths
 
-    component = _get_component()
-    component(
+    _COMPONENT(
         key=effective_key,
         data={
             "num_columns": n,
@@ -4,8 +4,6 @@ from collections.abc import Sequence
 from datetime import date
 from typing import TYPE_CHECKING, Literal
 
-import numpy as np
-import pandas as pd
 import streamlit as st
 from streamlit.deprecation_util import show_deprecation_warning
 
@@ -68,6 +66,9 @@ def row(
 
 
 def example() -> None:
+    import numpy as np
+    import pandas as pd
+
     random_df = pd.DataFrame(np.random.randn(20, 3), columns=["a", "b", "c"])
 
     row1 = row(2, vertical_align="center")
@@ -12,11 +12,11 @@ from datetime import date
 from typing import Literal
 
 import streamlit as st
-import streamlit.components.v2
 
 from streamlit_extras import extra
+from streamlit_extras._component_utils import lazy_component
 
-_SCROLL_COMPONENT = st.components.v2.component(
+_SCROLL_COMPONENT = lazy_component(
     name="streamlit_extras.scroll_to_element",
     html="<div aria-hidden='true'></div>",
     js="""
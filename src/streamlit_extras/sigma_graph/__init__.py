@@ -7,15 +7,14 @@ graphs or JSON-serializable node-link dictionaries.
 from __future__ import annotations
 
 from datetime import date
-from functools import cache
 from typing import TYPE_CHECKING, Any, Literal, TypedDict
 
 import streamlit as st
-import streamlit.components.v2
 import streamlit.errors
 from typing_extensions import Required
 
 from streamlit_extras import extra
+from streamlit_extras._component_utils import lazy_component
 
 if TYPE_CHECKING:
     from collections.abc import Callable
@@ -59,18 +58,11 @@ def _on_select() -> None:
     """Default callback for selection events."""
 
 
-@cache
-def _get_component() -> Any:
-    """Lazily initialize the CCv2 component.
-
-    Returns:
-        The component callable.
-    """
-    return streamlit.components.v2.component(
-        "streamlit-extras.sigma_graph",
-        js="index-*.js",
-        html='<div class="sigma-root"></div>',
-    )
+_COMPONENT = lazy_component(
+    "streamlit-extras.sigma_graph",
+    js="index-*.js",
+    html='<div class="sigma-root"></div>',
+)
 
 
 def _networkx_to_node_link(
@@ -358,8 +350,6 @@ def sigma_graph(
                 "id": selection_state.get("id"),
             }
 
-    component = _get_component()
-
     # Build node size config
     if isinstance(node_size, int):
         node_size_config: dict[str, Any] = {"mode": "uniform", "value": node_size}
@@ -368,7 +358,7 @@ def sigma_graph(
     else:
         node_size_config = {"mode": "attribute", "attribute": node_size}
 
-    result = component(
+    result = _COMPONENT(
         key=key,
         data={
             "graph": {
@@ -40,9 +40,9 @@ from datetime import date
 from typing import TYPE_CHECKING, Any, Literal
 
 import streamlit as st
-from streamlit.components.v2 import component
 
 from .. import extra
+from .._component_utils import lazy_component
 
 if TYPE_CHECKING:
     from collections.abc import Callable
@@ -452,7 +452,6 @@ export default function (component) {
     const incoming = String(data.value ?? '');
     if (input.value !== incoming) input.value = incoming;
 
-
     /* ── Leading adornment ──────────────────────────────────────────── */
     leading.innerHTML = '';
     leading.className = 'si-adornment';
@@ -569,7 +568,7 @@ export default function (component) {
 #   • SVG currentColor inherits the Streamlit text color
 #   • no @font-face piercing issue
 # ---------------------------------------------------------------------------
-_specialized_input_component = component(
+_specialized_input_component = lazy_component(
     name="specialized_input",
     css=_COMPONENT_CSS,
     js=_COMPONENT_JS,
@@ -1,15 +1,27 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import inspect
+import json
+import sqlite3
+import tempfile
+import threading
 import time
-from collections.abc import Generator, Sequence
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterable, AsyncIterator, Generator, Iterable, Sequence
 from contextlib import contextmanager
 from contextvars import ContextVar
 from datetime import date
+from functools import cache
+from itertools import starmap
+from pathlib import Path
+from queue import Empty, SimpleQueue
 from typing import TYPE_CHECKING, Any, Literal
 
 import streamlit as st
 from streamlit.errors import StreamlitAPIException
+from streamlit.runtime.scriptrunner_utils.script_run_context import get_script_run_ctx
 from typing_extensions import Required, TypedDict
 
 from .. import extra
@@ -20,13 +32,176 @@ if TYPE_CHECKING:
 
 SpecType = int | Sequence[int | float]
 
+# Streamed responses are re-sent in full on each update, so updates are batched
+_STREAM_UPDATE_INTERVAL_SECONDS = 0.05
+# ... unless this many characters arrived since the last update
+_STREAM_UPDATE_MAX_CHARS = 2048
+_STREAM_END = object()
+# How often the script thread checks for stop and rerun requests while waiting for chunks
+_STREAM_POLL_SECONDS = 0.1
+# How long a stopped iteration waits for its streams to be closed
+_STREAM_CLOSE_TIMEOUT_SECONDS = 1.0
+
 # Context variable to track the active chat container
 _active_chat_container: ContextVar[Any] = ContextVar("active_chat_container", default=None)
 
 
-def _streaming_write(*args: Any, unsafe_allow_html: bool = False, **kwargs: Any) -> list[Any]:
+class _TextStream:
+    """Streams text chunks into a placeholder.
+
+    The text is re-sent in full on every update, so chunks are batched: an update is
+    sent once `update_interval` seconds passed or `max_pending_chars` characters
+    arrived since the previous one.
+    """
+
+    def __init__(
+        self, update_interval: float, *, max_pending_chars: int = _STREAM_UPDATE_MAX_CHARS, **write_kwargs: Any
+    ) -> None:
+        self.update_interval = update_interval
+        self.max_pending_chars = max_pending_chars
+        self.write_kwargs = write_kwargs
+        self._container: DeltaGenerator | None = None
+        self._chunks: list[str] = []
+        self._pending_chars = 0
+        self._last_update = 0.0
+
+    def add(self, chunk: str) -> None:
+        first_text = self._container is None
+        if self._container is None:
+            self._container = st.empty()
+        self._chunks.append(chunk)
+        self._pending_chars += len(chunk)
+        # The first chunk is shown right away, later ones are batched
+        now = time.monotonic()
+        if (
+            first_text
+            or now - self._last_update >= self.update_interval
+            or self._pending_chars >= self.max_pending_chars
+        ):
+            self._last_update = now
+            self._pending_chars = 0
+            self._container.write("".join(self._chunks) + ("" if first_text else " ▌"), **self.write_kwargs)
+
+    def close(self) -> str | None:
+        """Show the complete text without the cursor, and start a new placeholder for the next chunks.
+
+        Returns:
+            The streamed text, or None if nothing was streamed.
+        """
+        if self._container is None or not self._chunks:
+            return None
+        streamed_response = "".join(self._chunks)
+        self._container.write(streamed_response, **self.write_kwargs)
+        self._container = None
+        self._chunks = []
+        self._pending_chars = 0
+        return streamed_response
+
+
+def _write_chunk(stream: _TextStream, chunk: Any, written_content: list[Any], **write_kwargs: Any) -> None:
+    """Write a chunk of a streamed message, text chunks being streamed into the same placeholder."""
+    if isinstance(chunk, str):
+        stream.add(chunk)
+        return
+    if streamed_response := stream.close():
+        written_content.append(streamed_response)
+    if callable(chunk):
+        chunk()
+    else:
+        st.write(chunk, **write_kwargs)
+    written_content.append(chunk)
+
+
+@cache
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """Return the event loop consuming async streams, running in a background thread shared by all sessions."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="stateful_chat_event_loop", daemon=True).start()
+    return loop
+
+
+def _is_async_stream(arg: Any) -> bool:
+    return inspect.isasyncgenfunction(arg) or isinstance(arg, AsyncIterable)
+
+
+async def _iterate_in_thread(iterable: Iterable[Any]) -> AsyncIterator[Any]:
+    # Synchronous streams are read in worker threads, so they don't block the event loop
+    iterator = iter(iterable)
+    while (chunk := await asyncio.to_thread(next, iterator, _STREAM_END)) is not _STREAM_END:
+        yield chunk
+
+
+async def _pump_streams(
+    streams: Sequence[AsyncIterable[Any]], chunks: SimpleQueue[tuple[int, Any]], pumped: threading.Event
+) -> None:
+    async def pump(index: int, stream: AsyncIterable[Any]) -> None:
+        try:
+            async for chunk in stream:
+                chunks.put((index, chunk))
+        finally:
+            chunks.put((index, _STREAM_END))
+
+    try:
+        await asyncio.gather(*starmap(pump, enumerate(streams)))
+    finally:
+        pumped.set()
+
+
+def _iterate_concurrently(streams: Sequence[Any]) -> Generator[tuple[int, Any], None, None]:
+    """Consume streams concurrently on the background event loop.
+
+    Streams can be async iterables, async generator functions, or synchronous
+    iterables and generator functions. The script thread only waits for chunks,
+    and writes them to the UI as they arrive. While waiting, it still handles stop
+    and rerun requests, which cancel the streams.
+
+    Yields:
+        tuple[int, Any]: The index of the stream and its next chunk, in order of arrival.
+    """
+    async_streams = []
+    for stream in streams:
+        if inspect.isasyncgenfunction(stream) or inspect.isgeneratorfunction(stream):
+            stream = stream()
+        async_streams.append(stream if isinstance(stream, AsyncIterable) else _iterate_in_thread(stream))
+
+    chunks: SimpleQueue[tuple[int, Any]] = SimpleQueue()
+    pumped = threading.Event()
+    future = asyncio.run_coroutine_threadsafe(_pump_streams(async_streams, chunks, pumped), _get_event_loop())
+    # Raises when the script run is stopped or rerun, Streamlit commands only check it when they send something
+    yield_check = getattr(get_script_run_ctx(suppress_warning=True), "yield_check", None)
+    running = len(async_streams)
+    try:
+        while running:
+            try:
+                index, chunk = chunks.get(timeout=_STREAM_POLL_SECONDS)
+            except Empty:
+                if yield_check is not None:
+                    yield_check()
+                continue
+            if chunk is _STREAM_END:
+                running -= 1
+            else:
+                yield index, chunk
+        # Raise the first error of a stream, if any
+        future.result()
+    finally:
+        # Stop the streams when the script run is stopped while streaming, and let them clean up.
+        # Synchronous streams are only stopped before their next chunk, their threads can't be interrupted
+        future.cancel()
+        pumped.wait(_STREAM_CLOSE_TIMEOUT_SECONDS)
+
+
+def _streaming_write(
+    *args: Any,
+    unsafe_allow_html: bool = False,
+    update_interval: float = _STREAM_UPDATE_INTERVAL_SECONDS,
+    **kwargs: Any,
+) -> list[Any]:
     """Internal streaming write implementation for stateful chat.
 
+    Streamed text is sent to the frontend every `update_interval` seconds, or sooner
+    when many characters arrive, chunks arriving in between are batched into the next update.
+
     Returns:
         list[Any]: A list of written content items.
     """
@@ -47,46 +222,22 @@ def _streaming_write(*args: Any, unsafe_allow_html: bool = False, **kwargs: Any)
     for arg in args:
         if isinstance(arg, str):
             string_buffer.append(arg)
+        elif _is_async_stream(arg):
+            flush_buffer()
+            stream = _TextStream(update_interval, unsafe_allow_html=unsafe_allow_html, **kwargs)
+            for _, chunk in _iterate_concurrently([arg]):
+                _write_chunk(stream, chunk, written_content, unsafe_allow_html=unsafe_allow_html, **kwargs)
+            if streamed_response := stream.close():
+                written_content.append(streamed_response)
         elif callable(arg) or inspect.isgenerator(arg):
             flush_buffer()
             if inspect.isgeneratorfunction(arg) or inspect.isgenerator(arg):
-                stream_container = None
-                streamed_response = ""
-
-                def flush_stream_response() -> None:
-                    nonlocal streamed_response, stream_container
-                    if streamed_response and stream_container:
-                        stream_container.write(
-                            streamed_response,
-                            unsafe_allow_html=unsafe_allow_html,
-                            **kwargs,
-                        )
-                        written_content.append(streamed_response)
-                        stream_container = None
-                        streamed_response = ""
-
+                stream = _TextStream(update_interval, unsafe_allow_html=unsafe_allow_html, **kwargs)
                 generator = arg() if inspect.isgeneratorfunction(arg) else arg
                 for chunk in generator:
-                    if isinstance(chunk, str):
-                        first_text = False
-                        if not stream_container:
-                            stream_container = st.empty()
-                            first_text = True
-                        streamed_response += chunk
-                        stream_container.write(
-                            streamed_response + ("" if first_text else " ▌"),
-                            unsafe_allow_html=unsafe_allow_html,
-                            **kwargs,
-                        )
-                    elif callable(chunk):
-                        flush_stream_response()
-                        chunk()
-                        written_content.append(chunk)
-                    else:
-                        flush_stream_response()
-                        st.write(chunk, unsafe_allow_html=unsafe_allow_html, **kwargs)
-                        written_content.append(chunk)
-                flush_stream_response()
+                    _write_chunk(stream, chunk, written_content, unsafe_allow_html=unsafe_allow_html, **kwargs)
+                if streamed_response := stream.close():
+                    written_content.append(streamed_response)
             else:
                 return_value = arg()
                 written_content.append(arg)
@@ -101,16 +252,24 @@ def _streaming_write(*args: Any, unsafe_allow_html: bool = False, **kwargs: Any)
     return written_content
 
 
-class ChatMessage(TypedDict):
+class ChatMessage(TypedDict, total=False):
     author: Required[str]
     avatar: Required[str | AtomicImage | None]
     content: Required[list[Any]]
+    # Content prepared for replaying the message, see `_replay_content`
+    replay: list[Any]
 
 
 def _active_dg() -> Any:
     return _active_chat_container.get()
 
 
+def _add_to_history(active_dg: Any, message: ChatMessage) -> None:
+    active_dg.chat_store.append(active_dg.chat_key, message)
+    if active_dg.max_messages is not None:
+        active_dg.chat_store.trim(active_dg.chat_key, active_dg.max_messages)
+
+
 def _display_message(
     name: str,
     *args: Any,
@@ -120,6 +279,285 @@ def _display_message(
         return _streaming_write(*args)
 
 
+def _is_json_serializable(item: Any) -> bool:
+    try:
+        json.dumps(item)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _message_to_record(message: ChatMessage) -> dict[str, Any]:
+    """Convert a message to JSON data, dropping content that can't be serialized (e.g. callables).
+
+    Returns:
+        dict[str, Any]: The message's author, avatar (if it is a string) and serializable content.
+    """
+    avatar = message["avatar"]
+    return {
+        "author": message["author"],
+        "avatar": avatar if isinstance(avatar, str) else None,
+        "content": [item for item in message["content"] if _is_json_serializable(item)],
+    }
+
+
+class ChatHistoryStore(ABC):
+    """Where `chat` keeps the messages of its conversations, identified by the chat's key.
+
+    Only the messages shown are loaded on each rerun, so stores keeping messages
+    outside of the session keep the server memory per session flat, and let
+    conversations be reloaded after a reconnect.
+    """
+
+    @abstractmethod
+    def append(self, key: str, message: ChatMessage) -> None:
+        """Add a message at the end of a conversation."""
+
+    @abstractmethod
+    def count(self, key: str) -> int:
+        """Return the number of messages of a conversation."""
+
+    @abstractmethod
+    def load(self, key: str, start: int, stop: int) -> list[ChatMessage]:
+        """Return the messages of a conversation from index `start` to `stop` (excluded)."""
+
+    def trim(self, key: str, max_messages: int) -> None:  # noqa: B027
+        """Drop the oldest messages of a conversation, keeping the last `max_messages`."""
+
+
+class _SessionStateChatHistoryStore(ChatHistoryStore):
+    """Keeps the messages in session state, as they were added (the default)."""
+
+    def _messages(self, key: str) -> list[ChatMessage]:
+        if key not in st.session_state:
+            st.session_state[key] = []
+        return st.session_state[key]
+
+    def append(self, key: str, message: ChatMessage) -> None:
+        self._messages(key).append(message)
+
+    def count(self, key: str) -> int:
+        return len(self._messages(key))
+
+    def load(self, key: str, start: int, stop: int) -> list[ChatMessage]:
+        return self._messages(key)[start:stop]
+
+    def trim(self, key: str, max_messages: int) -> None:
+        messages = self._messages(key)
+        del messages[: max(0, len(messages) - max_messages)]
+
+
+class MemoryChatHistoryStore(ChatHistoryStore):
+    """Keeps the messages in the server's memory, shared by all sessions using the same chat key.
+
+    Conversations survive reconnects, but not server restarts.
+    """
+
+    def __init__(self) -> None:
+        self._conversations: dict[str, list[ChatMessage]] = {}
+        self._lock = threading.Lock()
+
+    def append(self, key: str, message: ChatMessage) -> None:
+        with self._lock:
+            self._conversations.setdefault(key, []).append(message)
+
+    def count(self, key: str) -> int:
+        with self._lock:
+            return len(self._conversations.get(key, []))
+
+    def load(self, key: str, start: int, stop: int) -> list[ChatMessage]:
+        with self._lock:
+            return self._conversations.get(key, [])[start:stop]
+
+    def trim(self, key: str, max_messages: int) -> None:
+        with self._lock:
+            messages = self._conversations.get(key, [])
+            del messages[: max(0, len(messages) - max_messages)]
+
+
+class SQLiteChatHistoryStore(ChatHistoryStore):
+    """Keeps the messages in a SQLite database. Only JSON serializable content is stored."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = str(path)
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS chat_messages (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "key TEXT NOT NULL, author TEXT NOT NULL, avatar TEXT, content TEXT NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS chat_messages_by_key ON chat_messages (key, id)")
+
+    @contextmanager
+    def _connect(self) -> Generator[sqlite3.Connection, None, None]:
+        # Connections can't be shared between threads, and are cheap to open
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def append(self, key: str, message: ChatMessage) -> None:
+        record = _message_to_record(message)
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO chat_messages (key, author, avatar, content) VALUES (?, ?, ?, ?)",
+                (key, record["author"], record["avatar"], json.dumps(record["content"])),
+            )
+
+    def count(self, key: str) -> int:
+        with self._connect() as connection:
+            (count,) = connection.execute("SELECT COUNT(*) FROM chat_messages WHERE key = ?", (key,)).fetchone()
+        return count
+
+    def load(self, key: str, start: int, stop: int) -> list[ChatMessage]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT author, avatar, content FROM chat_messages WHERE key = ? ORDER BY id LIMIT ? OFFSET ?",
+                (key, max(0, stop - start), start),
+            ).fetchall()
+        return [
+            ChatMessage(author=author, avatar=avatar, content=json.loads(content)) for author, avatar, content in rows
+        ]
+
+    def trim(self, key: str, max_messages: int) -> None:
+        with self._connect() as connection:
+            connection.execute(
+                "DELETE FROM chat_messages WHERE key = ? AND id NOT IN "
+                "(SELECT id FROM chat_messages WHERE key = ? ORDER BY id DESC LIMIT ?)",
+                (key, key, max_messages),
+            )
+
+
+class JSONLChatHistoryStore(ChatHistoryStore):
+    """Keeps each conversation in an append-only JSON Lines file in `directory`.
+
+    The byte offset of each line is indexed, so pages of older messages are read
+    without parsing the whole file. Only JSON serializable content is stored.
+    Trimming a conversation to `max_messages` hides its oldest lines, and only rewrites
+    the file once it holds more than twice as many, so adding a message doesn't rewrite
+    it every time. Hidden lines are only known to this store, other processes may
+    show them until they trim the conversation too.
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Conversation key -> (offsets of its lines, position after the last complete line, file inode)
+        self._offsets: dict[str, tuple[list[int], int, int]] = {}
+        # Conversation key -> number of trimmed lines still in its file
+        self._hidden: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode()).hexdigest()[:32]}.jsonl"
+
+    def _index(self, key: str) -> list[int]:
+        """Return the offsets of the lines of a conversation's file, indexing lines added since the last call.
+
+        Returns:
+            list[int]: The byte offset of each message.
+        """
+        path = self._path(key)
+        if not path.exists():
+            self._offsets.pop(key, None)
+            self._hidden.pop(key, None)
+            return []
+        stat = path.stat()
+        offsets, position, inode = self._offsets.get(key, ([], 0, stat.st_ino))
+        if inode != stat.st_ino or stat.st_size < position:
+            # The file was rewritten, possibly by another process
+            offsets, position = [], 0
+            self._hidden.pop(key, None)
+        if stat.st_size > position:
+            # Lines may have been appended by another process, one may still be partially written
+            with path.open("rb") as file:
+                file.seek(position)
+                for line in file:
+                    if not line.endswith(b"\n"):
+                        break
+                    offsets.append(position)
+                    position += len(line)
+        self._offsets[key] = (offsets, position, stat.st_ino)
+        return offsets
+
+    def _messages(self, key: str) -> list[int]:
+        return self._index(key)[self._hidden.get(key, 0) :]
+
+    def append(self, key: str, message: ChatMessage) -> None:
+        line = json.dumps(_message_to_record(message)).encode() + b"\n"
+        with self._lock, self._path(key).open("ab") as file:
+            file.write(line)
+
+    def count(self, key: str) -> int:
+        with self._lock:
+            return len(self._messages(key))
+
+    def load(self, key: str, start: int, stop: int) -> list[ChatMessage]:
+        with self._lock:
+            offsets = self._messages(key)[start:stop]
+        if not offsets:
+            return []
+        with self._path(key).open("rb") as file:
+            file.seek(offsets[0])
+            records = [json.loads(file.readline()) for _ in offsets]
+        return [
+            ChatMessage(author=record["author"], avatar=record["avatar"], content=record["content"])
+            for record in records
+        ]
+
+    def trim(self, key: str, max_messages: int) -> None:
+        with self._lock:
+            offsets = self._index(key)
+            if len(offsets) <= 2 * max_messages:
+                self._hidden[key] = max(self._hidden.get(key, 0), len(offsets) - max_messages)
+                return
+            # Compact the file in one pass
+            path = self._path(key)
+            end = self._offsets[key][1]
+            with path.open("rb") as file:
+                file.seek(offsets[-max_messages] if max_messages else end)
+                kept = file.read(end - file.tell())
+            # Replace the file at once, so readers never see it half written
+            temporary = path.with_suffix(".jsonl.tmp")
+            temporary.write_bytes(kept)
+            temporary.replace(path)
+            self._offsets.pop(key)
+            self._hidden.pop(key, None)
+
+
+def _replay_content(message: ChatMessage) -> list[Any]:
+    """Return the message's content with consecutive strings pre-joined into one markdown text.
+
+    The result is cached in the message, so replaying it on reruns is a single
+    `st.markdown` call per text block.
+
+    Returns:
+        list[Any]: The content to replay.
+    """
+    if "replay" not in message:
+        replay: list[Any] = []
+        for item in message["content"]:
+            if isinstance(item, str) and replay and isinstance(replay[-1], str):
+                replay[-1] += " " + item
+            else:
+                replay.append(item)
+        message["replay"] = replay
+    return message["replay"]
+
+
+def _replay_message(message: ChatMessage) -> None:
+    with st.chat_message(message["author"], avatar=message["avatar"]):
+        for item in _replay_content(message):
+            if isinstance(item, str):
+                st.markdown(item)
+            elif callable(item):
+                return_value = item()
+                if return_value is not None:
+                    st.write(return_value)
+            else:
+                st.write(item)
+
+
 @extra
 def add_message(
     name: str,
@@ -144,63 +582,148 @@ def add_message(
             the `avatar` parameter of `st.chat_message`. Defaults to None.
         *args (Any):
             The content of the message. This can be any number of elements that are supported by
-            `st.write` as well as generator functions to stream content to the UI.
+            `st.write` as well as generator functions, generators and async iterables (e.g. async
+            generators) to stream content to the UI. Async iterables are consumed on a background
+            event loop.
 
     Raises:
         StreamlitAPIException: If called outside of a `chat` container.
     """
     active_dg = _active_dg()
 
-    if not hasattr(active_dg, "chat_history"):
+    if not hasattr(active_dg, "chat_store"):
         raise StreamlitAPIException("The `add_message` command can only be used inside a `chat` container.")
 
     # Write to the active container (new_messages_container)
     with active_dg:
         displayed_elements = _display_message(name, *args, avatar=avatar)
 
-    active_dg.chat_history.append(
-        ChatMessage(
-            author=name,
-            avatar=avatar,
-            content=displayed_elements,
-        )
-    )
+    _add_to_history(active_dg, ChatMessage(author=name, avatar=avatar, content=displayed_elements))
+
+
+@extra
+def add_concurrent_messages(
+    name: str,
+    *streams: Any,
+    avatar: str | AtomicImage | None = None,
+) -> None:
+    """Adds one chat message per stream, streaming all of them at the same time.
+
+    Use it to show parallel tool calls or to compare the answers of several models.
+    Each stream is shown in its own message as its chunks arrive. This command can
+    only be used inside the `chat` container.
+
+    Args:
+        name (Literal["user", "assistant"] | str):
+            The name of the author of the messages. See `add_message`.
+        *streams (Any):
+            The content of each message: async iterables (e.g. async generators of LLM clients),
+            async generator functions, or synchronous generators and generator functions, which are
+            read in worker threads.
+        avatar (str | AtomicImage | None, optional):
+            The avatar shown next to the messages. Defaults to None.
+
+    Raises:
+        StreamlitAPIException: If called outside of a `chat` container.
+    """
+    active_dg = _active_dg()
+
+    if not hasattr(active_dg, "chat_store"):
+        raise StreamlitAPIException("The `add_concurrent_messages` command can only be used inside a `chat` container.")
+
+    with active_dg:
+        messages = [st.chat_message(name, avatar=avatar) for _ in streams]
+    text_streams = [_TextStream(_STREAM_UPDATE_INTERVAL_SECONDS) for _ in streams]
+    contents: list[list[Any]] = [[] for _ in streams]
+    try:
+        for index, chunk in _iterate_concurrently(streams):
+            with messages[index]:
+                _write_chunk(text_streams[index], chunk, contents[index])
+    finally:
+        for message, text_stream, content in zip(messages, text_streams, contents, strict=True):
+            with message:
+                if streamed_response := text_stream.close():
+                    content.append(streamed_response)
+
+    for content in contents:
+        _add_to_history(active_dg, ChatMessage(author=name, avatar=avatar, content=content))
 
 
 @extra
 @contextmanager
-def chat(key: str = "chat_messages") -> Generator[DeltaGenerator, None, None]:
+def chat(
+    key: str | None = None,
+    window: int | None = None,
+    max_messages: int | None = None,
+    store: ChatHistoryStore | None = None,
+) -> Generator[DeltaGenerator, None, None]:
     """Insert a stateful chat container into your app.
 
     This chat container automatically keeps track of the chat history when you use
     the `add_message` command to add messages to the chat.
 
     Args:
-        key (str, optional): The key that is used to keep track of the chat history in session state.
-            Defaults to "chat_messages".
+        key (str, optional): The key that is used to keep track of the chat history in session state,
+            or in `store`. Required with `store`, as stores are shared by all sessions: use a key unique
+            to each user or conversation, or all users see the same history. Defaults to "chat_messages".
+        window (int, optional): Only show the last `window` messages of the history, with a button
+            to load `window` earlier messages at a time. Keeps reruns fast in long conversations.
+            Defaults to None (show all messages).
+        max_messages (int, optional): Maximum number of messages kept in the chat history. Older
+            messages are dropped. Defaults to None (keep all messages).
+        store (ChatHistoryStore, optional): Where to keep the chat history instead of session state:
+            a `MemoryChatHistoryStore`, `SQLiteChatHistoryStore` or `JSONLChatHistoryStore`, so the
+            conversation identified by `key` can be reloaded after a reconnect. Only the shown messages
+            are loaded. Defaults to None (session state).
 
     Yields:
         DeltaGenerator: The chat container that can be used together with `add_message` to
             automatically keep track of the chat history.
+
+    Raises:
+        StreamlitAPIException: If `store` is passed without a `key`.
     """
 
+    if store is None:
+        store = _SessionStateChatHistoryStore()
+        key = key or "chat_messages"
+    elif key is None:
+        msg = "chat needs a key unique to each user or conversation when a store is passed, as stores are shared."
+        raise StreamlitAPIException(msg)
+
     chat_container = st.container()
+    message_count = store.count(key)
 
-    if key not in st.session_state:
-        st.session_state[key] = []
-    chat_history: list[ChatMessage] = st.session_state[key]
+    shown_key = f"{key}__shown"
+    if window is not None and shown_key not in st.session_state:
+        st.session_state[shown_key] = window
+    shown = message_count if window is None else min(st.session_state[shown_key], message_count)
 
     with chat_container:
+        if shown < message_count:
+
+            def load_earlier() -> None:
+                st.session_state[shown_key] += window
+
+            st.button(
+                f"Load earlier messages ({message_count - shown} more)",
+                key=f"{key}__load_earlier",
+                on_click=load_earlier,
+                type="tertiary",
+            )
+
         # Display existing messages from history
-        for message in chat_history:
-            _display_message(message["author"], *message["content"], avatar=message["avatar"])
+        for message in store.load(key, message_count - shown, message_count):
+            _replay_message(message)
 
         # Create a container for new messages BEFORE yielding
         # This ensures new messages appear above any content (like chat_input)
         # that the user adds in the yielded block
         new_messages_container = st.container()
 
-    new_messages_container.chat_history = chat_history  # type: ignore
+    new_messages_container.chat_store = store  # type: ignore
+    new_messages_container.chat_key = key  # type: ignore
+    new_messages_container.max_messages = max_messages  # type: ignore
 
     # Set the active chat container for add_message to use
     token = _active_chat_container.set(new_messages_container)
@@ -224,12 +747,213 @@ def example() -> None:
             add_message("assistant", "Echo: ", stream_echo, avatar="🦜")
 
 
+def example_concurrent_messages() -> None:
+    with chat(key="my_concurrent_chat"):
+        if prompt := st.chat_input():
+            add_message("user", prompt, avatar="🧑‍💻")
+
+            async def stream_echo(delay: float) -> AsyncIterator[str]:
+                for word in prompt.split():
+                    await asyncio.sleep(delay)
+                    yield word + " "
+
+            add_concurrent_messages("assistant", stream_echo(0.1), stream_echo(0.25), avatar="🦜")
+
+
 __title__ = "Stateful Chat"
 __desc__ = "A chat container that automatically keeps track of the chat history."
 __icon__ = "💬"
 __examples__ = {
     example: [chat, add_message],
+    example_concurrent_messages: [chat, add_message, add_concurrent_messages],
 }
 __author__ = "Lukas Masuch"
 __created_at__ = date(2023, 8, 1)
 __playground__ = False
+
+
+def test_iterate_concurrently() -> None:
+    async def slow() -> AsyncIterator[str]:
+        for chunk in ("a", "b"):
+            await asyncio.sleep(0.05)
+            yield chunk
+
+    def fast() -> Generator[str, None, None]:
+        yield "x"
+        time.sleep(0.02)
+        yield "y"
+
+    # The synchronous stream isn't held up by the slower async one
+    chunks = list(_iterate_concurrently([slow, fast]))
+    assert [chunk for _, chunk in chunks] == ["x", "y", "a", "b"]
+    assert [index for index, _ in chunks] == [1, 1, 0, 0]
+
+    async def failing() -> AsyncIterator[str]:
+        yield "partial"
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    try:
+        list(_iterate_concurrently([failing()]))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Expected the stream's error to be raised")
+
+
+def test_iterate_concurrently_stops() -> None:
+    from types import SimpleNamespace
+    from unittest import mock
+
+    closed = threading.Event()
+
+    async def stalled() -> AsyncIterator[str]:
+        try:
+            yield "first"
+            await asyncio.sleep(60)
+            yield "never"
+        finally:
+            closed.set()
+
+    class StopRunError(Exception):
+        pass
+
+    def yield_check() -> None:
+        raise StopRunError
+
+    fake_ctx = SimpleNamespace(yield_check=yield_check)
+    started = time.monotonic()
+    chunks: list[str] = []
+    with mock.patch("streamlit_extras.stateful_chat.get_script_run_ctx", return_value=fake_ctx):
+        try:
+            chunks.extend(chunk for _, chunk in _iterate_concurrently([stalled]))
+        except StopRunError:
+            pass
+        else:
+            raise AssertionError("Expected the stop request to be raised")
+    # The stop is noticed without waiting for the next chunk, and the stream is closed
+    assert chunks == ["first"]
+    assert time.monotonic() - started < 5
+    assert closed.is_set()
+
+
+def test_text_stream_batching() -> None:
+    from unittest import mock
+
+    def count_writes(chunks: int, update_interval: float, max_pending_chars: int) -> int:
+        placeholder = mock.MagicMock()
+        with mock.patch.object(st, "empty", return_value=placeholder):
+            stream = _TextStream(update_interval, max_pending_chars=max_pending_chars)
+            for _ in range(chunks):
+                stream.add("x")
+            assert stream.close() == "x" * chunks
+        return placeholder.write.call_count
+
+    # The first chunk is shown right away, then the rate is capped until the stream is closed
+    assert count_writes(1000, update_interval=60, max_pending_chars=10_000) == 2
+    # A fast producer still gets an update every `max_pending_chars` characters
+    assert count_writes(1000, update_interval=60, max_pending_chars=100) == 2 + 999 // 100
+    assert count_writes(1000, update_interval=0, max_pending_chars=10_000) == 1001
+
+
+def test_persistent_history_stores() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        stores: list[ChatHistoryStore] = [
+            SQLiteChatHistoryStore(Path(directory) / "chat.db"),
+            JSONLChatHistoryStore(Path(directory) / "chats"),
+        ]
+        for store in stores:
+            for index in range(5):
+                # Callables (e.g. streamed generators) can't be persisted and are dropped
+                store.append("chat", ChatMessage(author="user", avatar=None, content=[f"message {index}", print]))
+            store.append("other chat", ChatMessage(author="assistant", avatar="🦜", content=["hello"]))
+
+            assert store.count("chat") == 5
+            assert store.count("other chat") == 1
+            assert [message["content"] for message in store.load("chat", 3, 5)] == [["message 3"], ["message 4"]]
+            assert store.load("other chat", 0, 1) == [ChatMessage(author="assistant", avatar="🦜", content=["hello"])]
+            assert store.load("missing chat", 0, 10) == []
+
+        # Reopening the stores gives access to the same conversations
+        assert SQLiteChatHistoryStore(Path(directory) / "chat.db").count("chat") == 5
+        assert JSONLChatHistoryStore(Path(directory) / "chats").count("chat") == 5
+
+        for store in stores:
+            store.trim("chat", 3)
+            assert [message["content"] for message in store.load("chat", 0, 5)] == [[f"message {i}"] for i in (2, 3, 4)]
+            store.trim("chat", 2)
+            assert [message["content"] for message in store.load("chat", 0, 5)] == [["message 3"], ["message 4"]]
+            store.append("chat", ChatMessage(author="user", avatar=None, content=["message 5"]))
+            assert store.count("chat") == 3
+
+        # The JSONL file is only rewritten once it holds more than twice the messages to keep
+        jsonl_store = stores[1]
+        assert isinstance(jsonl_store, JSONLChatHistoryStore)
+        jsonl_path = jsonl_store._path("chat")
+        assert len(jsonl_path.read_bytes().splitlines()) == 3
+        jsonl_store.trim("chat", 2)
+        assert len(jsonl_path.read_bytes().splitlines()) == 3
+        assert jsonl_store.count("chat") == 2
+        jsonl_store.trim("chat", 1)
+        assert len(jsonl_path.read_bytes().splitlines()) == 1
+        assert [message["content"] for message in jsonl_store.load("chat", 0, 5)] == [["message 5"]]
+
+        # A line still being written by another process isn't indexed until it's complete
+        jsonl_store = JSONLChatHistoryStore(Path(directory) / "chats")
+        with jsonl_store._path("chat").open("ab") as file:
+            file.write(b'{"author": "user", "avatar": null, "content": ["partial')
+            file.flush()
+            assert jsonl_store.count("chat") == 1
+            file.write(b'"]}\n')
+        assert jsonl_store.count("chat") == 2
+        assert jsonl_store.load("chat", 1, 2)[0]["content"] == ["partial"]
+
+
+def test_chat_window() -> None:
+    from streamlit.testing.v1 import AppTest
+
+    script = """
+import streamlit as st
+from streamlit_extras.stateful_chat import add_message, chat
+
+if "chat_messages" not in st.session_state:
+    st.session_state.chat_messages = [
+        {"author": "user", "avatar": None, "content": [f"Message {index}", "of 7"]} for index in range(7)
+    ]
+with chat(window=3, max_messages=6):
+    if st.button("Send"):
+        add_message("assistant", "Reply")
+"""
+
+    def shown_messages(app: AppTest) -> list[str]:
+        return [message.markdown[0].value for message in app.chat_message]
+
+    app = AppTest.from_string(script).run()
+    assert not app.exception
+    # Only the last messages are shown, consecutive strings being replayed as one markdown text
+    assert shown_messages(app) == ["Message 4 of 7", "Message 5 of 7", "Message 6 of 7"]
+    assert app.button(key="chat_messages__load_earlier").label == "Load earlier messages (4 more)"
+    assert app.session_state.chat_messages[6]["replay"] == ["Message 6 of 7"]
+    assert "replay" not in app.session_state.chat_messages[0]
+
+    app.button(key="chat_messages__load_earlier").click().run()
+    assert shown_messages(app)[0] == "Message 1 of 7"
+    assert len(shown_messages(app)) == 6
+    assert app.button(key="chat_messages__load_earlier").label == "Load earlier messages (1 more)"
+
+    # Adding a message drops the oldest ones beyond max_messages
+    next(button for button in app.button if button.label == "Send").click().run()
+    assert [message["content"] for message in app.session_state.chat_messages] == [
+        *([f"Message {index}", "of 7"] for index in range(2, 7)),
+        ["Reply"],
+    ]
+    assert shown_messages(app)[-1] == "Reply"
+
+
+__tests__ = [
+    test_iterate_concurrently,
+    test_iterate_concurrently_stops,
+    test_text_stream_batching,
+    test_persistent_history_stores,
+    test_chat_window,
+]
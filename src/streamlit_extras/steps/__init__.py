@@ -4,9 +4,9 @@ from contextlib import AbstractContextManager, contextmanager
 from typing import TYPE_CHECKING, Literal
 
 import streamlit as st
-import streamlit.components.v2
 
 from streamlit_extras import extra
+from streamlit_extras._component_utils import lazy_component
 
 if TYPE_CHECKING:
     from collections.abc import Generator, Sequence
@@ -339,7 +339,7 @@ export default function(component) {
 }
 """
 
-_STEPS_COMPONENT = st.components.v2.component(
+_STEPS_COMPONENT = lazy_component(
     name="streamlit_extras.steps",
     html='<div id="stepper-root"></div>',
     css=_CSS,
@@ -5,17 +5,26 @@ Display 3D models (GLTF, GLB, OBJ, STL, PLY, FBX) with interactive orbit control
 
 from __future__ import annotations
 
+import hashlib
+import json
+import shutil
+import struct
+import subprocess  # noqa: S404
+import tempfile
+import threading
+from collections import OrderedDict
 from datetime import date
-from functools import cache
 from io import BufferedReader, BytesIO, RawIOBase
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, cast
+from typing import TYPE_CHECKING, Any, Literal, cast
 
 import streamlit as st
-import streamlit.components.v2
 from streamlit import runtime
+from streamlit.errors import StreamlitAPIException
+from streamlit.runtime.media_file_manager import _get_session_id
 
 from streamlit_extras import extra
+from streamlit_extras._component_utils import lazy_component
 
 if TYPE_CHECKING:
     from collections.abc import Callable
@@ -38,6 +47,20 @@ _MIME_TYPES: dict[str, str] = {
 _SUPPORTED_FORMATS: frozenset[str] = frozenset(_MIME_TYPES.keys())
 
 
+# Media file IDs of the models already passed to the media file manager, keyed by
+# (resolved path, mtime_ns, size) for files or by content digest for in-memory data,
+# and by the conversion options. Reruns serve unchanged models again without reading,
+# hashing or converting them, and no model bytes are kept besides the media file manager's.
+_MAX_CACHED_MEDIA_FILES = 1024
+_MEDIA_FILE_IDS: OrderedDict[tuple[Any, ...], str] = OrderedDict()
+_MEDIA_FILE_IDS_LOCK = threading.Lock()
+
+
+# Formats the optional optimization stage can convert to GLB
+_OPTIMIZABLE_FORMATS: frozenset[str] = frozenset({".glb", ".obj", ".stl", ".ply"})
+_COMPRESSION_SCHEMES: frozenset[str] = frozenset({"draco", "meshopt"})
+
+
 def _get_file_extension(filename: str) -> str:
     """Extract the file extension from a filename or URL.
 
@@ -52,6 +75,45 @@ def _get_file_extension(filename: str) -> str:
     return Path(filename).suffix.lower()
 
 
+def _content_digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _remember_media_file(cache_key: tuple[Any, ...], url: str) -> None:
+    # Media file URLs end with the file ID and the extension of the MIME type
+    file_id = url.rsplit("/", 1)[-1].split(".", 1)[0]
+    with _MEDIA_FILE_IDS_LOCK:
+        _MEDIA_FILE_IDS[cache_key] = file_id
+        _MEDIA_FILE_IDS.move_to_end(cache_key)
+        while len(_MEDIA_FILE_IDS) > _MAX_CACHED_MEDIA_FILES:
+            _MEDIA_FILE_IDS.popitem(last=False)
+
+
+def _reuse_media_file(cache_key: tuple[Any, ...]) -> str | None:
+    """Use a model added to the media file manager by an earlier run at the current element, without its data.
+
+    Returns:
+        The URL of the model, or None if it has to be added again.
+    """
+    with _MEDIA_FILE_IDS_LOCK:
+        file_id = _MEDIA_FILE_IDS.get(cache_key)
+        if file_id is None:
+            return None
+        _MEDIA_FILE_IDS.move_to_end(cache_key)
+    # This relies on private attributes of the media file manager, like `_add_to_media_file_manager`
+    try:
+        coordinates = st._main._get_delta_path_str()
+        media_mgr = runtime.get_instance().media_file_mgr
+        with media_mgr._lock:
+            # Files are removed once no session uses them anymore
+            if file_id not in media_mgr._file_metadata:
+                return None
+            media_mgr._files_by_session_and_coord[_get_session_id()][coordinates] = file_id
+            return media_mgr._storage.get_url(file_id)
+    except Exception:
+        return None
+
+
 def _add_to_media_file_manager(data: bytes, mime_type: str) -> str:
     """Add data to Streamlit's media file manager.
 
@@ -94,25 +156,269 @@ def _add_to_media_file_manager(data: bytes, mime_type: str) -> str:
         return rt.media_file_mgr.add(data, mime_type, coordinates)
 
 
+def _load_scene(data: bytes, ext: str) -> Any:
+    """Load model data into a trimesh scene.
+
+    Returns:
+        The loaded `trimesh.Scene`.
+
+    Raises:
+        StreamlitAPIException: If trimesh is not installed.
+    """
+    try:
+        import trimesh
+    except ImportError as e:
+        raise StreamlitAPIException(
+            "trimesh is required to optimize 3D models. Install it with: pip install trimesh"
+        ) from e
+
+    return trimesh.load(BytesIO(data), file_type=ext.lstrip("."), force="scene")
+
+
+def _decimate_scene(scene: Any, max_triangles: int) -> None:
+    """Decimate the meshes of a scene in place so that it fits the triangle budget.
+
+    Raises:
+        StreamlitAPIException: If fast-simplification is not installed.
+    """
+    meshes = {name: geometry for name, geometry in scene.geometry.items() if hasattr(geometry, "faces")}
+    total = sum(len(mesh.faces) for mesh in meshes.values())
+    if total <= max_triangles:
+        return
+
+    for name, mesh in meshes.items():
+        # Each mesh gets a share of the budget proportional to its share of the triangles
+        face_count = max(1, len(mesh.faces) * max_triangles // total)
+        try:
+            scene.geometry[name] = mesh.simplify_quadric_decimation(face_count=face_count)
+        except ImportError as e:
+            raise StreamlitAPIException(
+                "fast-simplification is required to decimate 3D models. "
+                "Install it with: pip install fast-simplification"
+            ) from e
+
+
+def _write_glb(gltf: dict[str, Any], binary: bytes) -> bytes:
+    """Pack a glTF JSON document and its binary buffer into a GLB container.
+
+    Returns:
+        The GLB file content.
+    """
+    json_chunk = json.dumps(gltf, separators=(",", ":")).encode("utf-8")
+    # Chunks must be 4-byte aligned: JSON is padded with spaces, binary with zeros
+    json_chunk += b" " * (-len(json_chunk) % 4)
+    binary += b"\0" * (-len(binary) % 4)
+    length = 12 + 8 + len(json_chunk) + 8 + len(binary)
+    return b"".join(
+        [
+            struct.pack("<4sII", b"glTF", 2, length),
+            struct.pack("<I4s", len(json_chunk), b"JSON"),
+            json_chunk,
+            struct.pack("<I4s", len(binary), b"BIN\0"),
+            binary,
+        ]
+    )
+
+
+def _encode_draco_glb(scene: Any) -> bytes:
+    """Flatten a scene into a single Draco-compressed mesh (KHR_draco_mesh_compression).
+
+    Only geometry and normals are kept, materials and textures are dropped.
+
+    Returns:
+        The GLB file content.
+
+    Raises:
+        StreamlitAPIException: If DracoPy is not installed.
+    """
+    try:
+        import DracoPy
+    except ImportError as e:
+        raise StreamlitAPIException(
+            "DracoPy is required for Draco compression. Install it with: pip install DracoPy"
+        ) from e
+
+    mesh = scene.to_mesh()
+    encoded = DracoPy.encode(mesh.vertices, mesh.faces, normals=mesh.vertex_normals)
+
+    # The decoder may reorder and deduplicate vertices, so the accessors
+    # must describe the decoded mesh, not the one that was encoded
+    decoded = DracoPy.decode(encoded)
+    attribute_ids = {attribute["attribute_type"]: attribute["unique_id"] for attribute in decoded.attributes}
+    points = decoded.points
+
+    extension = "KHR_draco_mesh_compression"
+    gltf = {
+        "asset": {"version": "2.0", "generator": "streamlit-extras"},
+        "extensionsUsed": [extension],
+        "extensionsRequired": [extension],
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": [{"mesh": 0}],
+        "materials": [{"pbrMetallicRoughness": {"metallicFactor": 0.0, "roughnessFactor": 0.8}}],
+        "meshes": [
+            {
+                "primitives": [
+                    {
+                        "attributes": {"POSITION": 0, "NORMAL": 1},
+                        "indices": 2,
+                        "material": 0,
+                        "extensions": {
+                            # Draco attribute types: 0 = position, 1 = normal
+                            extension: {
+                                "bufferView": 0,
+                                "attributes": {"POSITION": attribute_ids[0], "NORMAL": attribute_ids[1]},
+                            }
+                        },
+                    }
+                ]
+            }
+        ],
+        "accessors": [
+            {
+                "componentType": 5126,
+                "count": len(points),
+                "type": "VEC3",
+                "min": points.min(axis=0).tolist(),
+                "max": points.max(axis=0).tolist(),
+            },
+            {"componentType": 5126, "count": len(points), "type": "VEC3"},
+            {"componentType": 5125, "count": decoded.faces.size, "type": "SCALAR"},
+        ],
+        "bufferViews": [{"buffer": 0, "byteOffset": 0, "byteLength": len(encoded)}],
+        "buffers": [{"byteLength": len(encoded) + (-len(encoded) % 4)}],
+    }
+    return _write_glb(gltf, encoded)
+
+
+def _compress_meshopt(glb: bytes) -> bytes:
+    """Compress a GLB with EXT_meshopt_compression using the `gltfpack` command line tool.
+
+    Returns:
+        The compressed GLB file content.
+
+    Raises:
+        StreamlitAPIException: If gltfpack is not installed or fails.
+    """
+    gltfpack = shutil.which("gltfpack")
+    if gltfpack is None:
+        raise StreamlitAPIException(
+            "The gltfpack command line tool is required for meshopt compression. "
+            "Install it with: npm install -g gltfpack"
+        )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = Path(tmp_dir) / "input.glb"
+        output_path = Path(tmp_dir) / "output.glb"
+        input_path.write_bytes(glb)
+        result = subprocess.run(  # noqa: S603
+            [gltfpack, "-i", str(input_path), "-o", str(output_path), "-cc"],
+            capture_output=True,
+            check=False,
+        )
+        if result.returncode != 0:
+            raise StreamlitAPIException(f"gltfpack failed: {result.stderr.decode(errors='replace')}")
+        return output_path.read_bytes()
+
+
+def _optimize_model(
+    data: bytes,
+    ext: str,
+    *,
+    max_triangles: int | None = None,
+    compression: Literal["draco", "meshopt"] | None = None,
+) -> bytes:
+    """Convert a model to GLB, optionally decimating and compressing it.
+
+    Args:
+        data: The model content.
+        ext: The model format extension.
+        max_triangles: Target triangle budget for quadric decimation.
+        compression: Mesh compression scheme, "draco" or "meshopt".
+
+    Returns:
+        The optimized GLB file content.
+
+    Raises:
+        ValueError: If the format or options are not supported.
+    """
+    if ext not in _OPTIMIZABLE_FORMATS:
+        supported = ", ".join(sorted(_OPTIMIZABLE_FORMATS))
+        raise ValueError(f"Cannot optimize '{ext}' models. Supported formats are: {supported}")
+    if compression is not None and compression not in _COMPRESSION_SCHEMES:
+        raise ValueError(f"Unsupported compression: '{compression}'. Use 'draco' or 'meshopt'.")
+    if max_triangles is not None and max_triangles < 1:
+        raise ValueError("max_triangles must be a positive integer.")
+
+    scene = _load_scene(data, ext)
+    if max_triangles is not None:
+        _decimate_scene(scene, max_triangles)
+
+    if compression == "draco":
+        glb = _encode_draco_glb(scene)
+    else:
+        glb = scene.export(file_type="glb")
+        if compression == "meshopt":
+            glb = _compress_meshopt(glb)
+    return glb
+
+
+def _read_source(
+    source: bytes | BytesIO | RawIOBase | BufferedReader,
+    file_format: str | None = None,
+) -> tuple[bytes, str]:
+    """Read an in-memory model source.
+
+    Args:
+        source: The 3D model source (bytes or file-like object).
+        file_format: Explicit format override (e.g., ".glb", ".stl").
+
+    Returns:
+        Tuple of (data, format_extension).
+
+    Raises:
+        TypeError: If the source type is not supported.
+    """
+    # Handle BytesIO and other IO objects
+    if isinstance(source, (BytesIO, RawIOBase, BufferedReader)):
+        data = source.getvalue() if isinstance(source, BytesIO) else source.read()
+        # Use explicit format or default to GLB for binary data
+        return data, file_format or ".glb"
+
+    # Handle raw bytes
+    if isinstance(source, bytes):
+        # Use explicit format or default to GLB for raw bytes
+        return source, file_format or ".glb"
+
+    msg = f"Unsupported source type: {type(source)}"
+    raise TypeError(msg)
+
+
 def _process_source(
     source: str | Path | bytes | BytesIO | RawIOBase | BufferedReader,
     file_format: str | None = None,
+    *,
+    max_triangles: int | None = None,
+    compression: Literal["draco", "meshopt"] | None = None,
 ) -> tuple[str, str]:
     """Process the source and return (url, format).
 
     For URLs, returns the URL directly.
     For local files and bytes, uploads to Streamlit's media file manager.
+    Files that haven't changed since the last run aren't read, nor is identical
+    content converted again, as long as the media file manager still has the model.
 
     Args:
         source: The 3D model source.
         file_format: Explicit format override (e.g., ".glb", ".stl").
             Required for bytes/BytesIO inputs with non-GLB formats.
+        max_triangles: If set, local models are converted to GLB and decimated
+            to at most this many triangles before being uploaded.
+        compression: If set, local models are converted to a GLB compressed
+            with this mesh compression scheme before being uploaded.
 
     Returns:
         Tuple of (url, format_extension).
-
-    Raises:
-        TypeError: If the source type is not supported.
     """
     # Handle URL strings
     if isinstance(source, str):
@@ -123,51 +429,39 @@ def _process_source(
         # Treat as file path
         source = Path(source)
 
-    # Handle Path objects
+    optimize = max_triangles is not None or compression is not None
+    data: bytes | None = None
     if isinstance(source, Path):
+        resolved = source.resolve()
+        stat = resolved.stat()
         ext = file_format or source.suffix.lower()
-        data = Path(source).read_bytes()
-        mime_type = _MIME_TYPES.get(ext, "application/octet-stream")
-        url = _add_to_media_file_manager(data, mime_type)
-        return url, ext
+        cache_key: tuple[Any, ...] = (str(resolved), stat.st_mtime_ns, stat.st_size)
+    else:
+        data, ext = _read_source(source, file_format)
+        cache_key = (_content_digest(data),)
+    cache_key += (ext, max_triangles, compression)
+    final_ext = ".glb" if optimize else ext
 
-    # Handle BytesIO and other IO objects
-    if isinstance(source, (BytesIO, RawIOBase, BufferedReader)):
-        # Use isinstance check to satisfy both type checkers (noqa for ruff SIM108)
-        if isinstance(source, BytesIO):  # noqa: SIM108
-            data = source.getvalue()
-        else:
-            data = source.read()
-        # Use explicit format or default to GLB for binary data
-        ext = file_format or ".glb"
-        mime_type = _MIME_TYPES.get(ext, "application/octet-stream")
-        url = _add_to_media_file_manager(data, mime_type)
-        return url, ext
+    url = _reuse_media_file(cache_key)
+    if url is not None:
+        return url, final_ext
 
-    # Handle raw bytes
-    if isinstance(source, bytes):
-        # Use explicit format or default to GLB for raw bytes
-        ext = file_format or ".glb"
-        mime_type = _MIME_TYPES.get(ext, "application/octet-stream")
-        url = _add_to_media_file_manager(source, mime_type)
-        return url, ext
+    if data is None:
+        data = resolved.read_bytes()
+    if optimize:
+        data = _optimize_model(data, ext, max_triangles=max_triangles, compression=compression)
 
-    msg = f"Unsupported source type: {type(source)}"
-    raise TypeError(msg)
+    mime_type = _MIME_TYPES.get(final_ext, "application/octet-stream")
+    url = _add_to_media_file_manager(data, mime_type)
+    _remember_media_file(cache_key, url)
+    return url, final_ext
 
 
-@cache
-def _get_component() -> Any:
-    """Lazily initialize the CCv2 component.
-
-    Returns:
-        The component callable.
-    """
-    return streamlit.components.v2.component(
-        "streamlit-extras.three_viewer",
-        js="index-*.js",
-        html='<div class="three-root"></div>',
-    )
+_COMPONENT = lazy_component(
+    "streamlit-extras.three_viewer",
+    js="index-*.js",
+    html='<div class="three-root"></div>',
+)
 
 
 @extra
@@ -176,6 +470,8 @@ def three_viewer(
     *,
     file_format: str | None = None,
     height: int = 400,
+    max_triangles: int | None = None,
+    compression: Literal["draco", "meshopt"] | None = None,
     key: str | None = None,
 ) -> DeltaGenerator:
     """Display a 3D model using Three.js with interactive orbit controls.
@@ -192,6 +488,13 @@ def three_viewer(
             Required for bytes/BytesIO inputs with non-GLB formats.
             If not provided, the format is inferred from the source.
         height: Height of the viewer in pixels.
+        max_triangles: If set, the model is converted to GLB and decimated on the
+            server to at most this many triangles. Requires `trimesh` and
+            `fast-simplification`. Not applied to URL sources.
+        compression: If set, the model is converted to a compressed GLB on the
+            server. "draco" requires `trimesh` and `DracoPy` (geometry only),
+            "meshopt" requires `trimesh` and the `gltfpack` command line tool.
+            Not applied to URL sources.
         key: Unique key for this component instance.
 
     Returns:
@@ -203,6 +506,7 @@ def three_viewer(
         three_viewer("model.glb")
         three_viewer("https://example.com/model.gltf", height=600)
         three_viewer(stl_bytes, file_format=".stl")
+        three_viewer("large_part.stl", max_triangles=200_000, compression="draco")
         ```
     """
     # Normalize format if provided
@@ -212,10 +516,15 @@ def three_viewer(
         if not normalized_format.startswith("."):
             normalized_format = "." + normalized_format
 
-    url, detected_format = _process_source(source, normalized_format)
+    url, detected_format = _process_source(
+        source,
+        normalized_format,
+        max_triangles=max_triangles,
+        compression=compression,
+    )
 
-    # Use normalized format if provided, otherwise use detected format
-    final_format = normalized_format or detected_format
+    # The detected format already honors the override, and is GLB for optimized models
+    final_format = detected_format
 
     # Validate the format
     if final_format and final_format not in _SUPPORTED_FORMATS:
@@ -224,8 +533,7 @@ def three_viewer(
         # Return empty component to avoid frontend crash
         return st.empty()
 
-    component = _get_component()
-    return component(
+    return _COMPONENT(
         key=key,
         data={
             "url": url,
@@ -300,9 +608,93 @@ def _test_supported_formats() -> None:
     assert ".fbx" in _SUPPORTED_FORMATS
 
 
+def _test_unchanged_file_not_read_again() -> None:
+    """Test that unchanged files are served again without being read, and changed files are read."""
+    import os
+    import tempfile
+    from types import SimpleNamespace
+    from unittest import mock
+
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+    media_mgr = MediaFileManager(MemoryMediaFileStorage("/media"))
+    with (
+        tempfile.TemporaryDirectory() as tmp_dir,
+        mock.patch.object(runtime, "get_instance", return_value=SimpleNamespace(media_file_mgr=media_mgr)),
+    ):
+        path = Path(tmp_dir) / "model.stl"
+        path.write_bytes(b"solid a")
+        url, ext = _process_source(path)
+        assert ext == ".stl"
+        with mock.patch.object(Path, "read_bytes", side_effect=AssertionError("The file was read again")):
+            assert _process_source(str(path)) == (url, ".stl")
+
+        path.write_bytes(b"solid b")
+        os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 1_000_000_000))
+        changed_url, _ = _process_source(path)
+        assert changed_url != url
+
+        # Models removed from the media file manager are added again
+        media_mgr.clear_session_refs("dontcare")
+        media_mgr.remove_orphaned_files()
+        assert _process_source(path)[0] == changed_url
+        assert media_mgr._file_metadata
+
+
+def _test_write_glb() -> None:
+    """Test that GLB containers have a valid header and aligned chunks."""
+    glb = _write_glb({"asset": {"version": "2.0"}}, b"abc")
+    magic, version, length = struct.unpack("<4sII", glb[:12])
+    assert (magic, version, length) == (b"glTF", 2, len(glb))
+    json_length, json_type = struct.unpack("<I4s", glb[12:20])
+    assert json_type == b"JSON"
+    assert json_length % 4 == 0
+    assert json.loads(glb[20 : 20 + json_length]) == {"asset": {"version": "2.0"}}
+    bin_length, bin_type = struct.unpack("<I4s", glb[20 + json_length : 28 + json_length])
+    assert (bin_length, bin_type) == (4, b"BIN\0")
+
+
+def _test_optimize_model_validation() -> None:
+    """Test that unsupported formats and options are rejected before any processing."""
+
+    def rejects(ext: str, **options: Any) -> bool:
+        try:
+            _optimize_model(b"", ext, **options)
+        except ValueError:
+            return True
+        return False
+
+    assert rejects(".fbx")
+    assert rejects(".stl", compression="zip")
+    assert rejects(".stl", max_triangles=0)
+
+
+def _test_optimize_model() -> None:
+    """Test STL to GLB conversion with decimation, if trimesh is installed."""
+    try:
+        import trimesh
+    except ImportError:
+        return
+
+    stl = trimesh.creation.icosphere(subdivisions=4).export(file_type="stl")
+    try:
+        glb = _optimize_model(stl, ".stl", max_triangles=500)
+    except StreamlitAPIException:
+        # fast-simplification is not installed
+        return
+    assert glb[:4] == b"glTF"
+    mesh: Any = trimesh.load(BytesIO(glb), file_type="glb", force="mesh")
+    assert len(mesh.faces) <= 500
+
+
 __tests__ = [
     _test_get_file_extension_basic,
     _test_get_file_extension_urls,
     _test_get_file_extension_no_extension,
     _test_supported_formats,
+    _test_unchanged_file_not_read_again,
+    _test_write_glb,
+    _test_optimize_model_validation,
+    _test_optimize_model,
 ]
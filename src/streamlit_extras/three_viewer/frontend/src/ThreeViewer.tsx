@@ -5,6 +5,8 @@
 import { CSSProperties, FC, ReactElement, useEffect, useRef, useState } from "react";
 import * as THREE from "three";
 import { OrbitControls } from "three/addons/controls/OrbitControls.js";
+import { MeshoptDecoder } from "three/addons/libs/meshopt_decoder.module.js";
+import { DRACOLoader } from "three/addons/loaders/DRACOLoader.js";
 import { GLTFLoader } from "three/addons/loaders/GLTFLoader.js";
 import { OBJLoader } from "three/addons/loaders/OBJLoader.js";
 import { STLLoader } from "three/addons/loaders/STLLoader.js";
@@ -83,6 +85,23 @@ function disposeMaterial(material: THREE.Material): void {
   material.dispose();
 }
 
+// The Draco decoder is copied next to the bundle at build time (see vite.config.ts), and
+// only fetched when a model actually uses KHR_draco_mesh_compression
+const DRACO_DECODER_DIR = "draco/";
+
+let dracoLoader: DRACOLoader | null = null;
+
+/**
+ * Get the shared Draco loader, so the decoder is only initialized once.
+ */
+function getDracoLoader(): DRACOLoader {
+  if (!dracoLoader) {
+    dracoLoader = new DRACOLoader();
+    dracoLoader.setDecoderPath(new URL(DRACO_DECODER_DIR, import.meta.url).href);
+  }
+  return dracoLoader;
+}
+
 /**
  * Load a 3D model based on its format.
  */
@@ -96,6 +115,9 @@ async function loadModel(
     case "gltf":
     case "glb": {
       const loader = new GLTFLoader();
+      // Support models compressed by the server-side optimization stage
+      loader.setDRACOLoader(getDracoLoader());
+      loader.setMeshoptDecoder(MeshoptDecoder);
       const gltf = await loader.loadAsync(url);
       return gltf.scene;
     }
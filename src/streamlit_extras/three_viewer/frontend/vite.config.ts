@@ -1,6 +1,28 @@
 import react from "@vitejs/plugin-react";
+import { cpSync } from "node:fs";
+import { join } from "node:path";
 import process from "node:process";
-import { defineConfig, UserConfig } from "vite";
+import { fileURLToPath } from "node:url";
+import { defineConfig, Plugin, UserConfig } from "vite";
+
+/**
+ * Copy the Draco decoder shipped with three.js next to the bundle, so compressed
+ * models also load in offline or CSP-restricted deployments (no CDN at runtime).
+ */
+function copyDracoDecoder(): Plugin {
+  return {
+    name: "copy-draco-decoder",
+    writeBundle(options) {
+      cpSync(
+        fileURLToPath(
+          new URL("./node_modules/three/examples/jsm/libs/draco/gltf/", import.meta.url),
+        ),
+        join(options.dir ?? "build", "draco"),
+        { recursive: true },
+      );
+    },
+  };
+}
 
 /**
  * Vite configuration for Streamlit Custom Component v2 development using React.
@@ -13,7 +35,7 @@ export default defineConfig(() => {
 
   return {
     base: "./",
-    plugins: [react()],
+    plugins: [react(), copyDracoDecoder()],
     define: {
       // We are building in library mode, we need to define the NODE_ENV
       // variable to prevent issues when executing the JS.
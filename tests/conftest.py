@@ -0,0 +1,17 @@
+import pytest
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config: pytest.Config) -> None:
+    # Benchmarks are slow, they only run with `--benchmark-only` (see test_benchmarks.py)
+    if config.pluginmanager.hasplugin("benchmark"):
+        config.option.benchmark_skip = True
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    if config.pluginmanager.hasplugin("benchmark"):
+        return
+    skip = pytest.mark.skip(reason="Benchmarks need pytest-benchmark")
+    for item in items:
+        if "benchmark" in getattr(item, "fixturenames", ()):
+            item.add_marker(skip)
@@ -0,0 +1,178 @@
+"""Performance benchmarks of extras at realistic data sizes, with pytest-benchmark.
+
+Each scenario times the import of an extra, its first render and a rerun with AppTest.
+Benchmarks are skipped by the default test run (see conftest.py), and without pytest-benchmark.
+Run them with:
+
+    pytest tests/test_benchmarks.py --benchmark-only --benchmark-save=baseline
+
+and compare a change against the saved JSON baseline, failing on regressions, with:
+
+    pytest tests/test_benchmarks.py --benchmark-only --benchmark-compare --benchmark-compare-fail=median:30%
+"""
+
+import sys
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import cache
+from importlib import import_module
+from pathlib import Path
+from typing import Any
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import streamlit_extras
+
+APP_TIMEOUT_SECONDS = 120
+
+
+@dataclass(frozen=True)
+class Scenario:
+    extra: str
+    # Script rendering the extra, reading its input from `st.session_state.data`
+    script: str
+    # Builds the input, called once per session
+    data: Callable[[], Any] | None = None
+    # Whether the extra needs its frontend to be built
+    frontend: bool = False
+
+
+@cache
+def dataframe_1m_rows() -> Any:
+    from streamlit_extras.dataframe_explorer import generate_fake_dataframe
+
+    return generate_fake_dataframe(size=1_000_000, cols="dfci", seed=1)
+
+
+@cache
+def graph_50k_edges() -> dict[str, Any]:
+    nodes = 10_000
+    return {
+        "nodes": [{"id": str(node), "label": f"Node {node}"} for node in range(nodes)],
+        "edges": [{"source": str(edge % nodes), "target": str(edge * 7 % nodes)} for edge in range(50_000)],
+    }
+
+
+@cache
+def chat_1k_messages() -> list[dict[str, Any]]:
+    return [
+        {
+            "author": "user" if message % 2 else "assistant",
+            "avatar": None,
+            "content": [f"Message {message}: " + "lorem ipsum " * 20],
+        }
+        for message in range(1_000)
+    ]
+
+
+SCENARIOS = [
+    Scenario(
+        "dataframe_explorer",
+        """
+import streamlit as st
+from streamlit_extras.dataframe_explorer import dataframe_explorer
+
+dataframe_explorer(st.session_state.data)
+""",
+        data=dataframe_1m_rows,
+    ),
+    Scenario(
+        "sigma_graph",
+        """
+import streamlit as st
+from streamlit_extras.sigma_graph import sigma_graph
+
+sigma_graph(st.session_state.data)
+""",
+        data=graph_50k_edges,
+        frontend=True,
+    ),
+    Scenario(
+        "stateful_chat",
+        """
+import streamlit as st
+from streamlit_extras.stateful_chat import chat
+
+if "chat_messages" not in st.session_state:
+    st.session_state.chat_messages = list(st.session_state.data)
+
+with chat():
+    pass
+""",
+        data=chat_1k_messages,
+    ),
+    Scenario(
+        "capture",
+        """
+import streamlit as st
+from streamlit_extras.capture import stdout
+
+with stdout(st.empty().code, terminator="", interval=0.1, max_lines=1_000):
+    for line in range(10_000):
+        print(f"Line {line}")
+""",
+    ),
+]
+
+
+def skip_without_frontend(scenario: Scenario) -> None:
+    build_dir = Path(streamlit_extras.__file__).parent / scenario.extra / "frontend" / "build"
+    if scenario.frontend and not build_dir.is_dir():
+        pytest.skip(f"The frontend of {scenario.extra} is not built")
+
+
+def new_app(scenario: Scenario) -> AppTest:
+    app = AppTest.from_string(scenario.script, default_timeout=APP_TIMEOUT_SECONDS)
+    if scenario.data is not None:
+        app.session_state["data"] = scenario.data()
+    return app
+
+
+def run_app(app: AppTest) -> AppTest:
+    app.run()
+    assert not app.exception, app.exception
+    return app
+
+
+def forget_extras() -> None:
+    # Import the extra cold, with the package and its helpers, Streamlit itself stays imported
+    for name in [name for name in sys.modules if name == "streamlit_extras" or name.startswith("streamlit_extras.")]:
+        del sys.modules[name]
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS, ids=lambda scenario: scenario.extra)
+def test_import(benchmark: Any, scenario: Scenario):
+    module = f"streamlit_extras.{scenario.extra}"
+    benchmark.group = scenario.extra
+    benchmark.pedantic(
+        import_module,
+        args=(module,),
+        setup=forget_extras,
+        rounds=20,
+        warmup_rounds=1,
+    )
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS, ids=lambda scenario: scenario.extra)
+def test_first_render(benchmark: Any, scenario: Scenario):
+    skip_without_frontend(scenario)
+    benchmark.group = scenario.extra
+    benchmark.pedantic(
+        run_app,
+        setup=lambda: ((new_app(scenario),), {}),
+        rounds=5,
+        warmup_rounds=1,
+    )
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS, ids=lambda scenario: scenario.extra)
+def test_rerun(benchmark: Any, scenario: Scenario):
+    skip_without_frontend(scenario)
+    benchmark.group = scenario.extra
+    benchmark.pedantic(
+        run_app,
+        setup=lambda: ((run_app(new_app(scenario)),), {}),
+        rounds=5,
+        warmup_rounds=1,
+    )
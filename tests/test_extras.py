@@ -1,9 +1,17 @@
+import inspect
+import os
 import pkgutil
+import subprocess
+import sys
+import time
+import types
 from importlib import import_module
+from pathlib import Path
 
 import pytest
 
 import streamlit_extras
+from streamlit_extras._component_utils import LazyComponent, get_registration_times, minify_asset
 
 
 def get_extras() -> list[str]:
@@ -63,3 +71,157 @@ def test_extra_tests(extra: str):
     if hasattr(mod, "__tests__"):
         for test in mod.__tests__:
             test()
+
+
+def _decorate_at_depth(depth: int, funcs: list) -> float:
+    if depth:
+        return _decorate_at_depth(depth - 1, funcs)
+    start = time.perf_counter()
+    for func in funcs:
+        streamlit_extras.extra(func)
+    return (time.perf_counter() - start) / len(funcs)
+
+
+def test_extra_decorator_import_time(monkeypatch):
+    module = types.ModuleType("streamlit_extras._decorated")
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+
+    def stack_walk(*args, **kwargs):
+        raise AssertionError("@extra must not walk the stack")
+
+    monkeypatch.setattr(inspect, "stack", stack_walk)
+
+    funcs = []
+    for index in range(200):
+
+        def func():
+            pass
+
+        func.__name__ = f"func_{index}"
+        func.__module__ = module.__name__
+        funcs.append(func)
+
+    # Extras are imported from deep stacks (e.g. Streamlit's script runner), which made
+    # each stack walk cost tens of milliseconds. Decorating must stay independent of it.
+    mean_seconds = _decorate_at_depth(100, funcs)
+    assert module.__funcs__ == funcs
+    assert mean_seconds < 0.001, f"@extra took {mean_seconds * 1000:.2f}ms per function"
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    package_dir = str(Path(streamlit_extras.__file__).parents[1])
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [package_dir, os.environ.get("PYTHONPATH")]))}
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env, check=True)
+
+
+# Slow dependencies (e.g. pandas alone takes ~0.5s) must be imported where they're used
+DEFERRED_MODULES = {"altair", "numpy", "pandas", "requests"}
+# Loose cold import budget of each extra, as a share of the time taken to import Streamlit
+# in the same interpreter, so it holds on slow or busy machines
+IMPORT_TIME_BUDGET_STREAMLIT_SHARE = 0.5
+
+
+def cold_import(module: str) -> tuple[float, float, set[str]]:
+    """Import `module` in a fresh interpreter after Streamlit, with `python -X importtime`.
+
+    Returns:
+        tuple[float, float, set[str]]: The time taken to import Streamlit and then `module` (in seconds),
+            and the modules imported after Streamlit.
+    """
+    result = run_python("-X", "importtime", "-c", f"import streamlit; import {module}")
+    streamlit_seconds = 0.0
+    seconds = 0.0
+    imported: set[str] = set()
+    after_streamlit = False
+    # Lines look like "import time: <self us> | <cumulative us> | <module name indented by depth>"
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        is_top_level = not name.startswith("  ")
+        if after_streamlit:
+            imported.add(name.strip())
+            if is_top_level:
+                seconds += int(cumulative) / 1e6
+        elif is_top_level and name.strip() == "streamlit":
+            streamlit_seconds = int(cumulative) / 1e6
+            after_streamlit = True
+    return streamlit_seconds, seconds, imported
+
+
+@pytest.mark.parametrize("extra", get_extras())
+def test_extra_import_time(extra: str):
+    streamlit_seconds, seconds, imported = cold_import(f"streamlit_extras.{extra}")
+    eagerly_imported = DEFERRED_MODULES & imported
+    assert not eagerly_imported, f"{extra} imports {sorted(eagerly_imported)} at import time"
+    assert seconds < IMPORT_TIME_BUDGET_STREAMLIT_SHARE * streamlit_seconds, (
+        f"Importing {extra} took {seconds * 1000:.0f}ms, Streamlit {streamlit_seconds * 1000:.0f}ms"
+    )
+
+
+def test_components_register_on_first_use():
+    registrations = []
+    component = LazyComponent(
+        "streamlit_extras._lazy_test", lambda: registrations.append(1) or (lambda **kwargs: kwargs)
+    )
+    assert not component.registered
+    assert not registrations
+
+    assert component(key="a") == {"key": "a"}
+    assert component(key="b") == {"key": "b"}
+    assert registrations == [1]
+    assert component.registered
+    assert "streamlit_extras._lazy_test" in get_registration_times()
+
+
+def test_importing_extras_registers_no_component():
+    # Record registrations in a fresh interpreter, while importing every extra
+    script = "\n".join(
+        [
+            "import streamlit.components.v2",
+            "registered = []",
+            "streamlit.components.v2.component = lambda *args, **kwargs: registered.append(args or kwargs)",
+            *(f"import streamlit_extras.{extra}" for extra in get_extras()),
+            "print(registered)",
+        ]
+    )
+    assert run_python("-c", script).stdout.strip() == "[]"
+
+
+def test_minify_asset():
+    js = """export default function (component) {
+        // Comments are dropped, strings are kept as-is
+        const url = "https://example.com/*"; /* block
+        comment */
+        const quote = '// not a comment';
+        return () => {};
+    }
+    """
+    assert minify_asset(js, "js") == (
+        "export default function (component) {\n"
+        'const url = "https://example.com/*";\n'
+        "const quote = '// not a comment';\n"
+        "return () => {};\n}"
+    )
+    # Template literals, regex literals and divisions need a real parser, so the source is kept as-is
+    for unparsed in (
+        "const link = `${user}'s //x.com`;\nconst html = '';\n",
+        "const pattern = /'/; // comment\nconst quote = '';\n",
+        "const ratio = a / b; // comment\nconst quote = '';\n",
+    ):
+        assert minify_asset(unparsed, "js") == unparsed
+
+    css = """
+    /* Theme */
+    .root, .item {
+        font-family: "Source Sans /* Pro */";
+        color: var(--st-text-color, #333);
+    }
+    .root .item:hover { opacity: 0.5; }
+    """
+    assert minify_asset(css, "css") == (
+        '.root,.item{font-family: "Source Sans /* Pro */";color: var(--st-text-color,#333);}\n'
+        ".root .item:hover{opacity: 0.5;}"
+    )
+    # Streamlit would take single-line content for a file path
+    assert minify_asset("a {\n  color: red;\n}\n", "css") == "a {\n  color: red;\n}\n"